@@ -39,34 +39,27 @@ def demonstrate_text_filtering():
     """Show text support filtering."""
     print("📝 Text Support Filtering Examples\n")
     
-    try:
-        import fontTools
-        fonttools_available = True
-    except ImportError:
-        fonttools_available = False
-        print("⚠️  fonttools not available - text filtering examples will be limited")
-    
-    if fonttools_available:
-        # Basic character sets
-        test_cases = [
-            ("Basic ASCII", "ABCabc123"),
-            ("Accented characters", "àáâãäåæçèéêë"),
-            ("German", "äöü ß ÄÖÜ"),
-            ("French", "àâäçéèêëïîôùûüÿ"),
-            ("Spanish", "áéíñóúü ¡¿"),
-            ("Symbols", "©®™€£¥"),
-            ("Math", "±×÷≠≤≥∞"),
-            ("Emojis", "🌷😀🎨"),
-        ]
-        
-        for name, text in test_cases:
-            fonts = fontsearch.find_fonts(text=text, max_results=5)
-            print(f"   {name} ('{text}'): {len(fonts)} fonts")
-            if fonts:
-                print(f"     Examples: {', '.join(font.name for font in fonts[:3])}")
-        print()
-    else:
-        print("   Install fonttools for text filtering: pip install fonttools\n")
+    # Basic character sets
+    test_cases = [
+        ("Basic ASCII", "ABCabc123"),
+        ("Accented characters", "àáâãäåæçèéêë"),
+        ("German", "äöü ß ÄÖÜ"),
+        ("French", "àâäçéèêëïîôùûüÿ"),
+        ("Spanish", "áéíñóúü ¡¿"),
+        ("Symbols", "©®™€£¥"),
+        ("Math", "±×÷≠≤≥∞"),
+        ("Emojis", "🌷😀🎨"),
+    ]
+    
+    # All texts answered in one pass over the font coverage
+    results = fontsearch.find_fonts_batch([text for _, text in test_cases], max_results=5)
+    
+    for name, text in test_cases:
+        fonts = results[text]
+        print(f"   {name} ('{text}'): {len(fonts)} fonts")
+        if fonts:
+            print(f"     Examples: {', '.join(font.name for font in fonts[:3])}")
+    print()
 
 
 def demonstrate_random_sampling():
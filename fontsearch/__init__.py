@@ -8,11 +8,25 @@ on Windows, macOS, and Linux systems with minimal dependencies.
 from .core import (
     get_fonts,
     get_font_files,
+    scan_font_inventory,
     find_fonts,
+    find_fonts_batch,
+    query_cache_info,
+    clear_query_cache,
+    TextFilter,
+    iter_fonts,
     check_font_supports_text,
+    text_coverage,
+    plan_fallback,
+    itemize,
+    Itemizer,
+    TextRun,
     FontInfo,
     FontType
 )
+from .scan import ScanDiff
+from .previews import preview_cache_info, clear_preview_cache
+from .thumbnails import thumbnail_store_info, clear_thumbnail_store
 
 # GUI components (optional - requires tkinter)
 try:
@@ -29,10 +43,26 @@ __email__ = "michel.weinachter@example.com"
 __all__ = [
     "get_fonts",
     "get_font_files", 
+    "scan_font_inventory",
     "find_fonts",
+    "find_fonts_batch",
+    "query_cache_info",
+    "clear_query_cache",
+    "TextFilter",
+    "iter_fonts",
     "check_font_supports_text",
+    "text_coverage",
+    "plan_fallback",
+    "itemize",
+    "Itemizer",
+    "TextRun",
     "FontInfo",
-    "FontType"
+    "FontType",
+    "ScanDiff",
+    "preview_cache_info",
+    "clear_preview_cache",
+    "thumbnail_store_info",
+    "clear_thumbnail_store"
 ]
 
 # Add GUI components if available
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Background work for the Tk interfaces.
+
+The first text query has to read the coverage of every installed font,
+which can take seconds on a large system. BackgroundFilter runs queries on
+a worker thread so the window stays responsive, and PreviewRenderer
+rasterizes font previews on a small thread pool. Both hand their results
+back to the Tk thread by polling with after(): Tk widgets must only be
+touched from the thread running the main loop.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .core import TextFilter, FontType, FontInfo
+from .previews import PreviewCache, PreviewKey, get_preview_cache, image_bytes
+
+# Budget mémoire par défaut des aperçus rendus par anticipation
+DEFAULT_PREFETCH_BYTES = 16 * 1024 * 1024
+
+
+class FilterCancelled(Exception):
+    """Raised inside the worker when the filter is closed mid-indexing."""
+
+
+class BackgroundFilter:
+    """
+    Answer text filter queries on a worker thread.
+
+    Only the latest submitted text is ever computed: a query submitted while
+    another is pending replaces it, and a result that arrives after a newer
+    submit is dropped. Indexing the fonts (the slow part) is shared by all
+    queries, so it is never restarted when the text changes.
+
+    Args:
+        widget: Any Tk widget, used to schedule polling with after().
+        on_result: Called on the Tk thread as on_result(text, fonts).
+        on_progress: Called on the Tk thread as on_progress(checked, total)
+                     while the font coverage is being indexed.
+        on_error: Called on the Tk thread as on_error(text, exception).
+        types: Font types to include (see TextFilter).
+        jobs: Worker processes used to index fonts (see TextFilter).
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget,
+                 on_result: Callable[[str, List[FontInfo]], None],
+                 on_progress: Optional[Callable[[int, int], None]] = None,
+                 on_error: Optional[Callable[[str, Exception], None]] = None,
+                 types: Optional[List[FontType]] = None,
+                 jobs: Optional[int] = None):
+        self.widget = widget
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.types = types
+        self.jobs = jobs
+
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[int, str]] = None
+        self._latest_id = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._text_filter: Optional[TextFilter] = None
+
+        # Échanges worker -> thread Tk, lus par _poll()
+        self._outcome: Optional[tuple] = None
+        self._progress: Optional[Tuple[int, int]] = None
+        self._reported_progress: Optional[Tuple[int, int]] = None
+        self._poll_timer = None
+
+    @property
+    def busy(self) -> bool:
+        """True while the latest submitted query has not been delivered."""
+        return self._poll_timer is not None
+
+    def submit(self, text: str) -> None:
+        """Filter fonts for a text, superseding any query still in flight."""
+        with self._cond:
+            if self._closed:
+                return
+            self._latest_id += 1
+            self._pending = (self._latest_id, text)
+            self._cond.notify()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fontsearch-filter", daemon=True)
+            self._thread.start()
+        if self._poll_timer is None:
+            self._poll_timer = self.widget.after(self.POLL_MS, self._poll)
+
+    def cancel(self) -> None:
+        """Forget the pending query; its result will not be delivered."""
+        with self._cond:
+            self._latest_id += 1
+            self._pending = None
+        self._stop_polling()
+
+    def close(self) -> None:
+        """Stop the worker thread, aborting the indexing if it is running."""
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
+        self._stop_polling()
+
+    def _stop_polling(self) -> None:
+        if self._poll_timer is not None:
+            try:
+                self.widget.after_cancel(self._poll_timer)
+            except Exception:
+                pass
+            self._poll_timer = None
+
+    def _report_progress(self, checked: int, total: int) -> None:
+        """Progress callback, run on the worker thread."""
+        if self._closed:
+            raise FilterCancelled()
+        self._progress = (checked, total)
+
+    def _run(self) -> None:
+        """Worker thread: compute the latest pending query, forever."""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                request_id, text = self._pending
+                self._pending = None
+
+            try:
+                if self._text_filter is None:
+                    self._text_filter = TextFilter(types=self.types, jobs=self.jobs,
+                                                   progress=self._report_progress)
+                outcome = (request_id, text, self._text_filter.update(text), None)
+            except FilterCancelled:
+                return
+            except Exception as e:
+                outcome = (request_id, text, None, e)
+            with self._cond:
+                self._outcome = outcome
+
+    def _poll(self) -> None:
+        """Deliver progress and results on the Tk thread."""
+        self._poll_timer = None
+
+        progress = self._progress
+        if progress is not None and progress != self._reported_progress:
+            self._reported_progress = progress
+            if self.on_progress is not None:
+                self.on_progress(*progress)
+
+        with self._cond:
+            outcome, self._outcome = self._outcome, None
+        if outcome is not None:
+            request_id, text, fonts, error = outcome
+            if request_id == self._latest_id:
+                if error is None:
+                    self.on_result(text, fonts)
+                elif self.on_error is not None:
+                    self.on_error(text, error)
+                return
+
+        if not self._closed:
+            try:
+                self._poll_timer = self.widget.after(self.POLL_MS, self._poll)
+            except Exception:
+                # Le widget a été détruit
+                self.close()
+
+
+class _RenderJob:
+    """A preview waiting for (or being rendered by) a worker."""
+
+    __slots__ = ("token", "key", "render", "on_done", "cancelled", "image")
+
+    def __init__(self, token, key, render, on_done):
+        self.token = token
+        self.key = key
+        self.render = render
+        self.on_done = on_done
+        self.cancelled = False
+        self.image = None
+
+
+class PreviewRenderer:
+    """
+    Render font previews on a pool of worker threads.
+
+    Each request is attached to a token, typically the row widget that will
+    show the preview: a new request for the same token cancels the previous
+    one, so a recycled row never receives the preview of the font it showed
+    before. Requests are served by priority (lowest first), then in order.
+    Rendered images go through the shared preview cache; Pillow releases the
+    GIL while FreeType rasterizes, so the workers really run in parallel.
+
+    prefetch() renders previews that are not shown yet (rows next to the
+    visible ones) into the cache when the workers have nothing else to do.
+    The memory taken by a prefetch batch is bounded by prefetch_bytes, so
+    speculative renders cannot push the visible previews out of the cache.
+
+    Args:
+        widget: Any Tk widget, used to schedule polling with after().
+        workers: Number of rendering threads (default: up to 4).
+        cache: Preview cache to use (default: the shared one).
+        prefetch_bytes: Memory budget of a prefetch batch (default: 16 MB,
+                        at most half the cache); 0 disables prefetching.
+    """
+
+    POLL_MS = 30
+    # Priorité des rendus anticipés : après toutes les demandes visibles
+    PREFETCH_PRIORITY = 100
+
+    def __init__(self, widget, workers: Optional[int] = None,
+                 cache: Optional[PreviewCache] = None,
+                 prefetch_bytes: Optional[int] = None):
+        self.widget = widget
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.cache = cache if cache is not None else get_preview_cache()
+        if prefetch_bytes is None:
+            prefetch_bytes = min(DEFAULT_PREFETCH_BYTES, self.cache.max_bytes // 2)
+        self.prefetch_bytes = prefetch_bytes
+
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, _RenderJob]] = []
+        self._sequence = itertools.count()
+        self._jobs: Dict[Hashable, _RenderJob] = {}  # token -> dernière demande
+        self._finished: List[_RenderJob] = []
+        self._prefetching: List[_RenderJob] = []
+        self._prefetch_spent = 0
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self._poll_timer = None
+
+    @property
+    def pending(self) -> int:
+        """Number of requested previews not delivered yet."""
+        return len(self._jobs)
+
+    def request(self, token: Hashable, key: Optional[PreviewKey],
+                render: Callable[[], Any], on_done: Callable[[Any], None],
+                priority: int = 0) -> None:
+        """
+        Ask for a preview. on_done(image) is called on the Tk thread, right
+        away if the preview is cached. render() runs on a worker thread and
+        must not touch Tk; image is whatever it returned (None for none).
+        """
+        self.cancel(token)
+        if key is not None:
+            found, image = self.cache.lookup(key)
+            if found:
+                on_done(image)
+                return
+
+        job = _RenderJob(token, key, render, on_done)
+        with self._cond:
+            if self._closed:
+                return
+            self._jobs[token] = job
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self._cond.notify()
+
+        self._start_worker()
+        if self._poll_timer is None:
+            self._poll_timer = self.widget.after(self.POLL_MS, self._poll)
+
+    def prefetch(self, jobs: Iterable[Tuple[Optional[PreviewKey], Callable[[], Any]]]) -> None:
+        """
+        Render previews ahead of need into the cache, given as (key, render)
+        pairs in order of preference. They are served after every request()
+        and only until the batch has used prefetch_bytes of memory. A new
+        call replaces the previous batch.
+        """
+        # Inutile d'anticiper un aperçu déjà en cache ou impossible à mettre en cache
+        batch = [_RenderJob(None, key, render, None) for key, render in jobs
+                 if key is not None and key not in self.cache]
+        with self._cond:
+            for job in self._prefetching:
+                job.cancelled = True
+            self._prefetching = []
+            self._prefetch_spent = 0
+            if self._closed or self.prefetch_bytes <= 0 or not batch:
+                return
+            for job in batch:
+                heapq.heappush(self._queue, (self.PREFETCH_PRIORITY, next(self._sequence), job))
+            self._prefetching = batch
+            self._cond.notify(len(batch))
+
+        while len(self._threads) < min(self.workers, len(batch)):
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        """Start one more rendering thread, up to the number of workers."""
+        if len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name="fontsearch-render", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def cancel(self, token: Hashable) -> None:
+        """Forget the preview requested for a token, e.g. a row scrolled away."""
+        with self._cond:
+            job = self._jobs.pop(token, None)
+            if job is not None:
+                job.cancelled = True
+
+    def cancel_all(self) -> None:
+        """Forget every pending preview."""
+        with self._cond:
+            for job in itertools.chain(self._jobs.values(), self._prefetching):
+                job.cancelled = True
+            self._jobs.clear()
+            self._prefetching = []
+            self._queue.clear()
+
+    def close(self) -> None:
+        """Stop the worker threads."""
+        self.cancel_all()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._poll_timer is not None:
+            try:
+                self.widget.after_cancel(self._poll_timer)
+            except Exception:
+                pass
+            self._poll_timer = None
+
+    def _run(self) -> None:
+        """Worker thread: render queued previews, best priority first."""
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                if job.cancelled:
+                    continue
+                prefetched = job.on_done is None
+                if prefetched and self._prefetch_spent >= self.prefetch_bytes:
+                    # Budget épuisé : le reste du lot est abandonné
+                    job.cancelled = True
+                    continue
+
+            if prefetched and job.key in self.cache:
+                continue
+            try:
+                job.image = self.cache.get_or_render(job.key, job.render)
+            except Exception:
+                job.image = None
+            with self._cond:
+                if prefetched:
+                    if not job.cancelled:
+                        self._prefetch_spent += image_bytes(job.image)
+                elif not job.cancelled:
+                    self._finished.append(job)
+
+    def _poll(self) -> None:
+        """Deliver finished previews on the Tk thread."""
+        self._poll_timer = None
+        with self._cond:
+            finished, self._finished = self._finished, []
+            delivered = []
+            for job in finished:
+                if self._jobs.get(job.token) is job:
+                    del self._jobs[job.token]
+                    delivered.append(job)
+
+        for job in delivered:
+            job.on_done(job.image)
+
+        if self._jobs and not self._closed:
+            try:
+                self._poll_timer = self.widget.after(self.POLL_MS, self._poll)
+            except Exception:
+                # Le widget a été détruit
+                self.close()
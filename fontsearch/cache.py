@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Persistent on-disk caches.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+# Bump when the layout of any cache file changes; older files are ignored.
+CACHE_VERSION = 3
+
+
+def cache_enabled() -> bool:
+    """Return False when caching is disabled with FONTSEARCH_NO_CACHE."""
+    return os.environ.get("FONTSEARCH_NO_CACHE", "") in ("", "0")
+
+
+def get_cache_dir() -> Path:
+    """
+    Return the directory holding FontSearch caches.
+
+    FONTSEARCH_CACHE_DIR takes precedence; otherwise the platform cache
+    location is used ($XDG_CACHE_HOME/fontsearch on Linux).
+    """
+    override = os.environ.get("FONTSEARCH_CACHE_DIR")
+    if override:
+        return Path(override)
+
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData/Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library/Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "fontsearch"
+
+
+def load_cache(name: str) -> Optional[Dict[str, Any]]:
+    """Load a cache file, or None if it is missing, corrupt or outdated."""
+    if not cache_enabled():
+        return None
+
+    try:
+        with open(get_cache_dir() / name, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return None
+    return data
+
+
+def save_cache(name: str, data: Dict[str, Any]) -> bool:
+    """
+    Atomically write a cache file.
+
+    Failures (read-only home, full disk...) are not fatal: the cache is
+    simply not updated and False is returned.
+    """
+    if not cache_enabled():
+        return False
+
+    cache_dir = get_cache_dir()
+    payload = dict(data, version=CACHE_VERSION)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(cache_dir), prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, cache_dir / name)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+def directory_mtimes(font_dirs: List[Path]) -> Dict[str, int]:
+    """
+    Return {directory: st_mtime_ns} for the font directories and all their
+    subdirectories.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed in it, so this is enough to detect installed/removed fonts
+    without stat-ing every font file.
+    """
+    mtimes = {}
+    for font_dir in font_dirs:
+        for dirpath, _dirnames, _filenames in os.walk(str(font_dir)):
+            try:
+                mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                pass
+    return mtimes
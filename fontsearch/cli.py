@@ -22,9 +22,10 @@ import sys
 import argparse
 import logging
 import warnings
-from typing import List, Optional
+from typing import List, Optional, Iterable
 
-from .core import find_fonts, FontType, FontInfo
+from .core import find_fonts, iter_fonts, find_fonts_batch, get_font_files, FontType, FontInfo
+from .coverage import get_coverage_index
 
 
 def suppress_warnings():
@@ -48,25 +49,62 @@ def suppress_warnings():
 suppress_warnings()
 
 
-def print_font_list(fonts: List[FontInfo], show_paths: bool = False) -> None:
-    """Print a formatted list of fonts."""
-    if not fonts:
+def _print_font_row(i: int, font: FontInfo, show_paths: bool) -> None:
+    """Print one numbered font entry."""
+    coverage_info = f" [{font.coverage:.0%}]" if font.coverage is not None else ""
+    if show_paths:
+        print(f"{i:4d}. {font.name}{coverage_info}")
+        print(f"      Path: {font.path}")
+        if font.font_type:
+            print(f"      Type: {font.font_type.name}")
+    else:
+        type_info = f" ({font.font_type.name})" if font.font_type else ""
+        print(f"{i:4d}. {font.name}{type_info}{coverage_info}")
+
+
+def print_font_list(fonts: Iterable[FontInfo], show_paths: bool = False) -> None:
+    """
+    Print a formatted list of fonts.
+    
+    A list is printed with its count as a header. Any other iterable (such as
+    iter_fonts()) is streamed: each font is printed as soon as it is produced
+    and the count comes last.
+    """
+    if isinstance(fonts, list):
+        if not fonts:
+            print("No fonts found matching the criteria.")
+            return
+        
+        print(f"{'=' * 60}")
+        print(f" {len(fonts)} fonts found")
+        print(f"{'=' * 60}")
+        
+        for i, font in enumerate(fonts, 1):
+            _print_font_row(i, font, show_paths)
+        return
+    
+    count = 0
+    for count, font in enumerate(fonts, 1):
+        if count == 1:
+            print(f"{'=' * 60}")
+        _print_font_row(count, font, show_paths)
+    
+    if count == 0:
         print("No fonts found matching the criteria.")
         return
     
     print(f"{'=' * 60}")
-    print(f" {len(fonts)} fonts found")
-    print(f"{'=' * 60}")
-    
-    for i, font in enumerate(fonts, 1):
-        if show_paths:
-            print(f"{i:4d}. {font.name}")
-            print(f"      Path: {font.path}")
-            if font.font_type:
-                print(f"      Type: {font.font_type.name}")
-        else:
-            type_info = f" ({font.font_type.name})" if font.font_type else ""
-            print(f"{i:4d}. {font.name}{type_info}")
+    print(f" {count} fonts found")
+
+
+def read_text_queries(path: str) -> List[str]:
+    """Read one text query per line from a file ('-' for stdin), skipping blank lines."""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line for line in lines if line.strip()]
 
 
 def parse_font_types(type_str: str) -> List[FontType]:
@@ -82,8 +120,15 @@ def parse_font_types(type_str: str) -> List[FontType]:
     return types
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """Main CLI entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['render']:
+        # Sous-commande avec ses propres options
+        from .render import main as render_main
+        render_main(argv[1:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="FontSearch - Discover and analyze system fonts",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -96,13 +141,37 @@ Examples:
   fontsearch --text "🌷😀"             # Fonts supporting emojis
   fontsearch --types TTF,OTF           # Only TrueType and OpenType fonts
   fontsearch --random --max 10        # 10 random fonts
+  fontsearch --random --max 10 --seed 1  # Same 10 random fonts on every run
   fontsearch --text "äöü ß" --paths   # German fonts with file paths
+  fontsearch --text-file labels.txt    # Fonts for each line of labels.txt
+  fontsearch --text "Hi Привет 你好" --sort coverage  # Closest fonts first
+  fontsearch --rebuild-cache --jobs 0  # Rescan fonts and rebuild the caches on all CPUs
+  fontsearch render --out previews     # Render a PNG preview of every font (see render --help)
         """
     )
     
     parser.add_argument(
         '--text', '-t',
-        help='Filter fonts that support this text (requires fonttools)'
+        help='Filter fonts that support this text'
+    )
+    
+    parser.add_argument(
+        '--text-file', '-f',
+        metavar='FILE',
+        help="Answer one text query per line of FILE ('-' for stdin)"
+    )
+    
+    parser.add_argument(
+        '--min-coverage',
+        type=float,
+        metavar='RATIO',
+        help='Keep fonts covering at least this fraction of the text characters (0-1)'
+    )
+    
+    parser.add_argument(
+        '--sort',
+        choices=['coverage'],
+        help='Rank fonts by the fraction of the text characters they cover'
     )
     
     parser.add_argument(
@@ -116,6 +185,12 @@ Examples:
         help='Return results in random order'
     )
     
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed for reproducible --random samples'
+    )
+    
     parser.add_argument(
         '--max', '-m',
         type=int,
@@ -146,13 +221,34 @@ Examples:
         help='Launch internationalized GUI (supports 10 languages)'
     )
     
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        help='Worker processes used to index font coverage (0 = one per CPU)'
+    )
+    
+    parser.add_argument(
+        '--rebuild-cache',
+        action='store_true',
+        help='Rescan installed fonts, rebuild the font caches and exit'
+    )
+    
     parser.add_argument(
         '--version', '-v',
         action='version',
         version='FontSearch 1.1.0'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if args.rebuild_cache:
+        font_files = get_font_files(refresh=True)
+        index = get_coverage_index()
+        index.invalidate(font_files.values())
+        index.build(font_files.values(), jobs=args.jobs)
+        index.save()
+        print(f"Font cache rebuilt: {len(font_files)} fonts")
+        return
     
     # Launch GUI if requested
     if args.gui:
@@ -200,22 +296,45 @@ Examples:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
     
-    # Check for fonttools if text filtering is requested
-    if args.text:
+    if args.text_file:
+        if args.text or args.random:
+            parser.error("--text-file cannot be combined with --text or --random")
         try:
-            import fontTools
-        except ImportError:
-            print("Warning: fonttools not installed. Text filtering may not work properly.", 
-                  file=sys.stderr)
-            print("Install with: pip install fonttools", file=sys.stderr)
+            queries = read_text_queries(args.text_file)
+            results = find_fonts_batch(queries, types=types, max_results=args.max, jobs=args.jobs)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        
+        for text, fonts in results.items():
+            print(f"\nText: {text}")
+            print_font_list(fonts, show_paths=args.paths)
+        return
     
     try:
-        # Find fonts
-        fonts = find_fonts(
+        if args.text is not None and (args.min_coverage is not None or args.sort):
+            # Ranking needs every score before the first row
+            fonts = find_fonts(
+                text=args.text,
+                types=types,
+                random_order=args.random,
+                max_results=args.max,
+                jobs=args.jobs,
+                seed=args.seed,
+                min_coverage=args.min_coverage,
+                sort=args.sort
+            )
+            print_font_list(fonts, show_paths=args.paths)
+            return
+        
+        # Find fonts (streamed as they are found)
+        fonts = iter_fonts(
             text=args.text,
             types=types,
+            max_results=args.max,
+            jobs=args.jobs,
             random_order=args.random,
-            max_results=args.max
+            seed=args.seed
         )
         
         # Print results
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Minimal cmap reader (standard library only).
+
+Reads just the table directory and the 'cmap' table of an sfnt font
+(TrueType, OpenType/CFF) or of the first font of a collection (TTC/OTC),
+through mmap, and returns the mapped codepoints as ranges. Glyph names are
+never built, which makes this much cheaper than fontTools'
+TTFont.getBestCmap() when only coverage matters.
+
+Supported subtable formats: 0, 4, 6, 12 and 13, plus format 14 (Unicode
+variation sequences) whose variation selectors are reported as covered.
+The glyph IDs of given codepoints can be looked up the same way.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import mmap
+import struct
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict, Iterable
+
+# Same preference order as fontTools' getBestCmap()
+CMAP_PREFERENCES = ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0))
+
+# Unicode Variation Sequences subtable
+UVS_ENCODING = (0, 5)
+
+SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"OTTO", b"true")
+
+
+class CmapError(ValueError):
+    """The file is not an sfnt font or its cmap cannot be parsed."""
+
+
+def read_table_directory(data, font_number: int = 0) -> Dict[bytes, Tuple[int, int]]:
+    """
+    Return {tag: (offset, length)} for the tables of an sfnt or TTC font.
+
+    Args:
+        data: Buffer holding the whole font file (bytes or mmap).
+        font_number: Index of the font inside a collection.
+    """
+    try:
+        base = 0
+        if data[:4] == b"ttcf":
+            num_fonts = struct.unpack_from(">I", data, 8)[0]
+            if not 0 <= font_number < num_fonts:
+                raise CmapError(f"Font collection has no font #{font_number}")
+            base = struct.unpack_from(">I", data, 12 + 4 * font_number)[0]
+
+        if data[base:base + 4] not in SFNT_VERSIONS:
+            raise CmapError("Not an sfnt font")
+
+        num_tables = struct.unpack_from(">H", data, base + 4)[0]
+        tables = {}
+        for i in range(num_tables):
+            record = base + 12 + 16 * i
+            tag, _checksum, offset, length = struct.unpack_from(">4sIII", data, record)
+            tables[tag] = (offset, length)
+        return tables
+    except struct.error as e:
+        raise CmapError(f"Truncated table directory: {e}")
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort and merge half-open ranges that touch or overlap."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _codes_to_ranges(codes) -> List[Tuple[int, int]]:
+    """Turn an increasing sequence of codepoints into half-open ranges."""
+    ranges = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code:
+            ranges[-1] = (ranges[-1][0], code + 1)
+        else:
+            ranges.append((code, code + 1))
+    return ranges
+
+
+def _format0_ranges(data, offset: int) -> List[Tuple[int, int]]:
+    glyphs = data[offset + 6:offset + 6 + 256]
+    return _codes_to_ranges(code for code, gid in enumerate(glyphs) if gid)
+
+
+def _format4_ranges(data, offset: int) -> List[Tuple[int, int]]:
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + 2 * seg_count + 2
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+
+    end_codes = struct.unpack_from(f">{seg_count}H", data, ends_at)
+    start_codes = struct.unpack_from(f">{seg_count}H", data, starts_at)
+    deltas = struct.unpack_from(f">{seg_count}H", data, deltas_at)
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_at)
+
+    ranges = []
+    for i in range(seg_count):
+        start, end = start_codes[i], end_codes[i]
+        if start > end:
+            continue
+        delta, range_offset = deltas[i], range_offsets[i]
+        if range_offset == 0:
+            # Glyph = (code + delta) mod 65536 ; seul un code peut tomber sur .notdef
+            notdef = (-delta) & 0xFFFF
+            if start <= notdef <= end:
+                if start < notdef:
+                    ranges.append((start, notdef))
+                if notdef < end:
+                    ranges.append((notdef + 1, end + 1))
+            else:
+                ranges.append((start, end + 1))
+        else:
+            glyphs_at = range_offsets_at + 2 * i + range_offset
+            count = end - start + 1
+            if glyphs_at + 2 * count > len(data):
+                count = max(0, (len(data) - glyphs_at) // 2)
+            glyphs = struct.unpack_from(f">{count}H", data, glyphs_at)
+            ranges.extend(_codes_to_ranges(
+                start + j for j, gid in enumerate(glyphs)
+                if gid and (gid + delta) & 0xFFFF
+            ))
+    return ranges
+
+
+def _format6_ranges(data, offset: int) -> List[Tuple[int, int]]:
+    first_code, count = struct.unpack_from(">HH", data, offset + 6)
+    glyphs = struct.unpack_from(f">{count}H", data, offset + 10)
+    return _codes_to_ranges(first_code + j for j, gid in enumerate(glyphs) if gid)
+
+
+def _format12_ranges(data, offset: int, constant_glyph: bool = False) -> List[Tuple[int, int]]:
+    num_groups = struct.unpack_from(">I", data, offset + 12)[0]
+    ranges = []
+    for start, end, glyph in struct.iter_unpack(">III", data[offset + 16:offset + 16 + 12 * num_groups]):
+        if start > end or end > 0x10FFFF:
+            continue
+        if glyph == 0:
+            if constant_glyph:
+                # Format 13 : toute la plage pointe vers le même glyphe
+                continue
+            start += 1
+        if start <= end:
+            ranges.append((start, end + 1))
+    return ranges
+
+
+def _format14_selectors(data, offset: int) -> List[Tuple[int, int]]:
+    num_records = struct.unpack_from(">I", data, offset + 6)[0]
+    selectors = []
+    for i in range(num_records):
+        record = offset + 10 + 11 * i
+        selector = int.from_bytes(data[record:record + 3], "big")
+        default_uvs, non_default_uvs = struct.unpack_from(">II", data, record + 3)
+        if default_uvs or non_default_uvs:
+            selectors.append(selector)
+    return _codes_to_ranges(sorted(selectors))
+
+
+def _subtable_ranges(data, offset: int) -> List[Tuple[int, int]]:
+    fmt = struct.unpack_from(">H", data, offset)[0]
+    if fmt == 0:
+        return _format0_ranges(data, offset)
+    elif fmt == 4:
+        return _format4_ranges(data, offset)
+    elif fmt == 6:
+        return _format6_ranges(data, offset)
+    elif fmt == 12:
+        return _format12_ranges(data, offset)
+    elif fmt == 13:
+        return _format12_ranges(data, offset, constant_glyph=True)
+    raise CmapError(f"Unsupported cmap subtable format {fmt}")
+
+
+def _format0_glyph(data, offset: int, code: int) -> int:
+    return data[offset + 6 + code] if code < 256 else 0
+
+
+def _format4_glyph(data, offset: int, code: int) -> int:
+    if code > 0xFFFF:
+        return 0
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    end_codes = struct.unpack_from(f">{seg_count}H", data, ends_at)
+    i = bisect.bisect_left(end_codes, code)
+    if i == seg_count:
+        return 0
+    starts_at = ends_at + 2 * seg_count + 2
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+    start = struct.unpack_from(">H", data, starts_at + 2 * i)[0]
+    if code < start:
+        return 0
+    delta = struct.unpack_from(">H", data, deltas_at + 2 * i)[0]
+    range_offset = struct.unpack_from(">H", data, range_offsets_at + 2 * i)[0]
+    if range_offset == 0:
+        return (code + delta) & 0xFFFF
+    glyph = struct.unpack_from(">H", data, range_offsets_at + 2 * i + range_offset + 2 * (code - start))[0]
+    return (glyph + delta) & 0xFFFF if glyph else 0
+
+
+def _format6_glyph(data, offset: int, code: int) -> int:
+    first_code, count = struct.unpack_from(">HH", data, offset + 6)
+    if not first_code <= code < first_code + count:
+        return 0
+    return struct.unpack_from(">H", data, offset + 10 + 2 * (code - first_code))[0]
+
+
+def _format12_glyph(data, offset: int, code: int, constant_glyph: bool = False) -> int:
+    num_groups = struct.unpack_from(">I", data, offset + 12)[0]
+    # Recherche dichotomique dans les groupes, triés par code de début
+    low, high = 0, num_groups
+    while low < high:
+        middle = (low + high) // 2
+        start, end, glyph = struct.unpack_from(">III", data, offset + 16 + 12 * middle)
+        if code < start:
+            high = middle
+        elif code > end:
+            low = middle + 1
+        else:
+            return glyph if constant_glyph else glyph + code - start
+    return 0
+
+
+def _subtable_glyph(data, offset: int, code: int) -> int:
+    fmt = struct.unpack_from(">H", data, offset)[0]
+    if fmt == 0:
+        return _format0_glyph(data, offset, code)
+    elif fmt == 4:
+        return _format4_glyph(data, offset, code)
+    elif fmt == 6:
+        return _format6_glyph(data, offset, code)
+    elif fmt == 12:
+        return _format12_glyph(data, offset, code)
+    elif fmt == 13:
+        return _format12_glyph(data, offset, code, constant_glyph=True)
+    raise CmapError(f"Unsupported cmap subtable format {fmt}")
+
+
+def _cmap_subtables(data, font_number: int) -> Optional[Dict[Tuple[int, int], int]]:
+    """Return {(platform, encoding): offset} of the cmap subtables, or None without cmap."""
+    tables = read_table_directory(data, font_number)
+    if b"cmap" not in tables:
+        return None
+    cmap_offset, cmap_length = tables[b"cmap"]
+    try:
+        num_subtables = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+        subtables = {}
+        for i in range(num_subtables):
+            platform, encoding, offset = struct.unpack_from(">HHI", data, cmap_offset + 4 + 8 * i)
+            subtables.setdefault((platform, encoding), cmap_offset + offset)
+    except struct.error as e:
+        raise CmapError(f"Truncated cmap table: {e}")
+    return subtables
+
+
+def parse_glyph_ids(data, codepoints: Iterable[int], font_number: int = 0) -> Dict[int, int]:
+    """
+    Return {codepoint: glyph ID} for the codepoints mapped by the best cmap
+    subtable; unmapped codepoints are left out.
+    """
+    subtables = _cmap_subtables(data, font_number)
+    if subtables is None:
+        return {}
+    for key in CMAP_PREFERENCES:
+        if key in subtables:
+            offset = subtables[key]
+            break
+    else:
+        return {}
+
+    glyphs = {}
+    try:
+        for code in codepoints:
+            glyph = _subtable_glyph(data, offset, code)
+            if glyph:
+                glyphs[code] = glyph
+    except struct.error as e:
+        raise CmapError(f"Truncated cmap table: {e}")
+    return glyphs
+
+
+def parse_cmap_ranges(data, font_number: int = 0) -> Optional[List[Tuple[int, int]]]:
+    """
+    Return the codepoints mapped by the best cmap subtable as sorted,
+    merged half-open ranges [(start, end), ...].
+
+    Returns None when the font has no Unicode cmap subtable.
+    """
+    subtables = _cmap_subtables(data, font_number)
+    if subtables is None:
+        return None
+
+    try:
+        for key in CMAP_PREFERENCES:
+            if key in subtables:
+                ranges = _subtable_ranges(data, subtables[key])
+                break
+        else:
+            return None
+
+        if UVS_ENCODING in subtables:
+            uvs_offset = subtables[UVS_ENCODING]
+            if struct.unpack_from(">H", data, uvs_offset)[0] == 14:
+                ranges.extend(_format14_selectors(data, uvs_offset))
+    except struct.error as e:
+        raise CmapError(f"Truncated cmap table: {e}")
+
+    return _merge_ranges(ranges)
+
+
+def read_cmap_ranges(font_path: Path, font_number: int = 0) -> Optional[List[Tuple[int, int]]]:
+    """
+    Read the mapped codepoint ranges of a font file via mmap.
+
+    Returns None when the font has no Unicode cmap. Raises CmapError if the
+    file is not a readable sfnt font and OSError if it cannot be opened.
+    """
+    with open(font_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise CmapError("Empty file")
+        try:
+            return parse_cmap_ranges(data, font_number)
+        finally:
+            data.close()
+
+
+def read_glyph_ids(font_path: Path, codepoints: Iterable[int], font_number: int = 0) -> Dict[int, int]:
+    """
+    Look up the glyph IDs of codepoints in a font file via mmap, without
+    reading the rest of the cmap.
+
+    Raises CmapError if the file is not a readable sfnt font and OSError if
+    it cannot be opened.
+    """
+    with open(font_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise CmapError("Empty file")
+        try:
+            return parse_glyph_ids(data, codepoints, font_number)
+        finally:
+            data.close()
@@ -19,17 +19,28 @@ You should have received a copy of the GNU Lesser General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
 import subprocess
 import sys
 import re
+import time
+import unicodedata
+import math
 import random as _random
 import logging
-import warnings
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List, Dict, Set
-from dataclasses import dataclass
+from typing import Any, Optional, List, Dict, Set, Tuple, Iterator, Union, NamedTuple, Callable
+from dataclasses import dataclass, field
 from enum import Enum
 
+from .cache import load_cache, save_cache, directory_mtimes
+from .scan import FileSignature, ScanDiff, file_signature, snapshot_font_dirs, diff_snapshots
+from .query import QueryCache, CacheInfo
+from .segmentation import grapheme_clusters, break_class, OTHER, CONTROL, LF
+from .coverage import (get_coverage_index, get_codepoint_index, peek_codepoint_index,
+                       ids_to_bits, bits_to_ids, bounds_contain, invalidate_coverage)
+
 # Suppress fonttools warnings about font file inconsistencies
 logging.getLogger("fontTools.ttLib.tables._p_o_s_t").setLevel(logging.ERROR)
 logging.getLogger("fontTools.ttLib.tables.DefaultTable").setLevel(logging.ERROR)
@@ -86,6 +97,7 @@ class FontInfo:
     name: str
     path: Path
     font_type: Optional[FontType] = None
+    coverage: Optional[float] = field(default=None, compare=False)
     
     def __post_init__(self):
         if self.font_type is None and self.path:
@@ -168,12 +180,32 @@ def deduplicate_fonts(fonts: Dict[str, Path]) -> Dict[str, Path]:
     return result
 
 
+def get_font_dirs() -> List[Path]:
+    """Retourne les dossiers de polices standards de la plateforme courante."""
+    if sys.platform == "win32":
+        return [
+            Path("C:/Windows/Fonts"),
+            Path(os.environ.get("LOCALAPPDATA", "")) / "Microsoft/Windows/Fonts",
+        ]
+    elif sys.platform == "darwin":
+        return [
+            Path("/System/Library/Fonts"),
+            Path("/Library/Fonts"),
+            Path.home() / "Library/Fonts",
+        ]
+    else:
+        return [
+            Path("/usr/share/fonts"),
+            Path("/usr/local/share/fonts"),
+            Path.home() / ".fonts",
+            Path.home() / ".local/share/fonts",
+        ]
+
+
 def get_font_files_windows() -> Dict[str, Path]:
     """Récupère les polices avec leurs chemins via le registre Windows."""
-    import os
     fonts = {}
-    system_fonts_dir = Path("C:/Windows/Fonts")
-    user_fonts_dir = Path(os.environ.get("LOCALAPPDATA", "")) / "Microsoft/Windows/Fonts"
+    system_fonts_dir, user_fonts_dir = get_font_dirs()
 
     try:
         import winreg
@@ -232,13 +264,8 @@ def get_font_files_windows() -> Dict[str, Path]:
 def get_font_files_macos() -> Dict[str, Path]:
     """Récupère les polices avec leurs chemins sur macOS."""
     fonts = {}
-    font_dirs = [
-        Path("/System/Library/Fonts"),
-        Path("/Library/Fonts"),
-        Path.home() / "Library/Fonts",
-    ]
 
-    for font_dir in font_dirs:
+    for font_dir in get_font_dirs():
         if font_dir.exists():
             for ext in ["*.ttf", "*.otf", "*.ttc"]:
                 for f in font_dir.glob(ext):
@@ -247,35 +274,53 @@ def get_font_files_macos() -> Dict[str, Path]:
     return fonts
 
 
+def _fontconfig_font_files(paths: Optional[List[Path]] = None) -> List[Tuple[str, Path]]:
+    """
+    Interroge fontconfig : fc-list pour toutes les polices, ou fc-scan pour
+    analyser uniquement les fichiers donnés.
+    """
+    fmt = "--format=%{family}|%{file}\n"
+    if paths is None:
+        commands = [["fc-list", fmt]]
+    else:
+        paths = [str(p) for p in paths]
+        commands = [["fc-scan", fmt] + paths[i:i + 500] for i in range(0, len(paths), 500)]
+
+    pairs = []
+    for command in commands:
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+        except Exception:
+            continue
+        # fc-scan renvoie un code non nul si un des fichiers n'est pas une police
+        if result.returncode != 0 and paths is None:
+            continue
+        for line in result.stdout.strip().split("\n"):
+            if "|" in line:
+                family, filepath = line.split("|", 1)
+                family = family.split(",")[0].strip()
+                if family and Path(filepath).exists():
+                    pairs.append((family, Path(filepath)))
+    return pairs
+
+
+def _stem_font_files(paths: List[Path], recursive: bool = True) -> List[Tuple[str, Path]]:
+    """Nomme les polices d'après leur nom de fichier (mode sans fontconfig)."""
+    font_dirs = set(get_font_dirs())
+    return [
+        (path.stem, path) for path in paths
+        if path.suffix in (".ttf", ".otf", ".ttc") and (recursive or path.parent in font_dirs)
+    ]
+
+
 def get_font_files_linux() -> Dict[str, Path]:
     """Récupère les polices avec leurs chemins sur Linux."""
-    fonts = {}
-
     # Utiliser fc-list pour obtenir les chemins
-    try:
-        result = subprocess.run(
-            ["fc-list", "--format=%{family}|%{file}\n"],
-            capture_output=True, text=True, timeout=30
-        )
-        if result.returncode == 0:
-            for line in result.stdout.strip().split("\n"):
-                if "|" in line:
-                    family, filepath = line.split("|", 1)
-                    family = family.split(",")[0].strip()
-                    if family and Path(filepath).exists():
-                        fonts[family] = Path(filepath)
-    except Exception:
-        pass
+    fonts = dict(_fontconfig_font_files())
 
     # Fallback : parcourir les dossiers
     if not fonts:
-        font_dirs = [
-            Path("/usr/share/fonts"),
-            Path("/usr/local/share/fonts"),
-            Path.home() / ".fonts",
-            Path.home() / ".local/share/fonts",
-        ]
-        for font_dir in font_dirs:
+        for font_dir in get_font_dirs():
             if font_dir.exists():
                 for ext in ["**/*.ttf", "**/*.otf", "**/*.ttc"]:
                     for f in font_dir.glob(ext):
@@ -284,16 +329,138 @@ def get_font_files_linux() -> Dict[str, Path]:
     return fonts
 
 
-def get_font_files() -> Dict[str, Path]:
-    """Retourne un dict {nom: chemin} des polices, dédupliqué."""
+INVENTORY_CACHE = "inventory.json"
+
+# Jeton de l'inventaire courant : change à chaque modification des polices installées
+_inventory_generation: Optional[str] = None
+
+# Dernier inventaire, gardé en mémoire quand il n'a pas pu être écrit sur
+# disque (FONTSEARCH_NO_CACHE, cache en lecture seule)
+_inventory_memory: Optional[Dict[str, Any]] = None
+
+
+def _scan_font_files() -> Tuple[Dict[str, Path], str]:
+    """
+    Interroge le système (fc-list, registre, dossiers) sans cache.
+
+    Retourne les polices non dédupliquées et leur source : "registry",
+    "fontconfig" ou "files" (noms tirés des noms de fichiers).
+    """
     if sys.platform == "win32":
-        fonts = get_font_files_windows()
+        return get_font_files_windows(), "registry"
     elif sys.platform == "darwin":
-        fonts = get_font_files_macos()
+        return get_font_files_macos(), "files"
+
+    fonts = dict(_fontconfig_font_files())
+    if fonts:
+        return fonts, "fontconfig"
+    return get_font_files_linux(), "files"
+
+
+def _read_font_names(paths: List[Path], source: str) -> List[Tuple[str, Path]]:
+    """Lit les noms de polices des fichiers donnés, selon la source de l'inventaire."""
+    if not paths:
+        return []
+    if source == "fontconfig":
+        return _fontconfig_font_files(paths)
+    return _stem_font_files(paths, recursive=sys.platform != "darwin")
+
+
+def scan_font_inventory(refresh: bool = False) -> Tuple[Dict[str, Path], ScanDiff]:
+    """
+    Met à jour l'inventaire des polices et retourne ({nom: chemin}, diff).
+
+    Si les dates de modification des dossiers de polices et les signatures
+    des fichiers connus n'ont pas changé, l'inventaire en cache est
+    retourné tel quel avec un diff vide. Sinon,
+    les fichiers sont comparés au dernier instantané (taille, mtime, inode)
+    et seuls les fichiers ajoutés ou modifiés sont réanalysés ; les fichiers
+    supprimés sont retirés. Le diff permet aux caches dérivés (couverture
+    des caractères, aperçus...) d'invalider précisément leurs entrées.
+
+    Args:
+        refresh: Si True, ignore le cache et réinterroge tout le système.
+                 Le diff est alors calculé par rapport au dernier instantané.
+    """
+    font_dirs = get_font_dirs()
+    dirs = directory_mtimes(font_dirs)
+
+    global _inventory_generation, _inventory_memory
+    cached = load_cache(INVENTORY_CACHE)
+    if cached is None:
+        cached = _inventory_memory
+    if cached is not None and cached.get("platform") != sys.platform:
+        cached = None
+
+    # Un fichier réécrit sur place ne change pas la date du dossier :
+    # les signatures des fichiers connus sont aussi vérifiées
+    if (cached is not None and not refresh and cached.get("dirs") == dirs
+            and all(file_signature(path) == FileSignature(*sig)
+                    for path, sig in cached["files"].items())):
+        fonts = {name: Path(path) for name, path in cached["fonts"].items()}
+        _inventory_generation = cached.get("generation")
+        return fonts, ScanDiff()
+
+    old_snapshot = {}
+    if cached is not None:
+        old_snapshot = {path: FileSignature(*sig) for path, sig in cached["files"].items()}
+
+    if cached is not None and not refresh and cached["source"] != "registry":
+        # Mise à jour incrémentale : ne réanalyser que ce qui a changé
+        source = cached["source"]
+        pairs = [(name, Path(path)) for name, path in cached["pairs"]]
+        snapshot = snapshot_font_dirs(font_dirs, extra_files=[str(p) for _, p in pairs])
+        diff = diff_snapshots(old_snapshot, snapshot)
+        stale = set(diff.stale)
+        pairs = [(name, path) for name, path in pairs if path not in stale]
+        pairs.extend(_read_font_names(diff.added + diff.changed, source))
     else:
-        fonts = get_font_files_linux()
+        raw, source = _scan_font_files()
+        pairs = list(raw.items())
+        snapshot = snapshot_font_dirs(font_dirs, extra_files=[str(p) for p in raw.values()])
+        diff = diff_snapshots(old_snapshot, snapshot)
 
-    return deduplicate_fonts(fonts)
+    fonts = deduplicate_fonts(dict(pairs))
+    invalidate_coverage(diff.stale)
+    if diff.stale:
+        _itemizers.clear()
+    _inventory_generation = f"{time.time_ns():x}.{os.getpid()}"
+    inventory = {
+        "platform": sys.platform,
+        "generation": _inventory_generation,
+        "source": source,
+        "dirs": dirs,
+        "files": {path: list(sig) for path, sig in snapshot.items()},
+        "pairs": [[name, str(path)] for name, path in pairs],
+        "fonts": {name: str(path) for name, path in fonts.items()},
+    }
+    # Sans cache disque, l'inventaire (et donc sa génération) reste en mémoire
+    _inventory_memory = None if save_cache(INVENTORY_CACHE, inventory) else inventory
+    return fonts, diff
+
+
+def get_font_files(refresh: bool = False) -> Dict[str, Path]:
+    """
+    Retourne un dict {nom: chemin} des polices, dédupliqué.
+
+    L'inventaire est mis en cache sur disque (voir fontsearch.cache) et
+    mis à jour de façon incrémentale quand les dossiers de polices changent
+    (voir scan_font_inventory).
+
+    Args:
+        refresh: Si True, ignore le cache et réinterroge le système.
+    """
+    fonts, _diff = scan_font_inventory(refresh=refresh)
+    return fonts
+
+
+def inventory_generation() -> Optional[str]:
+    """
+    Retourne le jeton de l'inventaire lu par le dernier appel à
+    get_font_files() : il change dès que les polices installées changent,
+    ce qui permet aux caches en mémoire de savoir qu'ils sont périmés.
+    """
+    return _inventory_generation
 
 
 def get_fonts() -> List[str]:
@@ -305,55 +472,225 @@ def check_font_supports_text(font_path: Path, text: str) -> bool:
     """
     Vérifie si une police contient tous les glyphes pour le texte donné.
     
-    Nécessite fonttools (optionnel). Si non disponible, retourne True.
+    La couverture de chaque police est lue une seule fois (lecteur de cmap
+    natif, sans fonttools) puis conservée dans l'index persistant
+    (voir fontsearch.coverage).
     """
-    try:
-        from fontTools.ttLib import TTFont
-        # Suppress fonttools warnings for this session
-        logging.getLogger("fontTools.ttLib.tables._p_o_s_t").setLevel(logging.ERROR)
-        logging.getLogger("fontTools.ttLib.tables.DefaultTable").setLevel(logging.ERROR)
-    except ImportError:
-        return True  # Si fonttools n'est pas disponible, on ne peut pas vérifier
+    index = get_coverage_index()
+    supported = index.supports(font_path, {ord(char) for char in text})
+    index.save()
+    return supported
 
-    # Ignorer les fichiers non supportés
-    if font_path.suffix.lower() not in (".ttf", ".otf", ".ttc"):
-        return False
 
+def text_coverage(font: Union[FontInfo, Path], text: str) -> float:
+    """
+    Retourne la fraction des caractères (distincts) du texte que la police
+    contient, entre 0.0 et 1.0.
+    
+    Contrairement à check_font_supports_text(), une police à qui il ne
+    manque qu'un caractère obtient un score proche de 1.
+    
+    Args:
+        font: FontInfo ou chemin du fichier de police.
+        text: Texte à tester. Un texte vide est entièrement couvert.
+    """
+    font_path = font.path if isinstance(font, FontInfo) else Path(font)
+    codepoints = {ord(char) for char in text}
+    if not codepoints:
+        return 1.0
+    
+    index = get_coverage_index()
+    bounds = index.get(font_path)
+    index.save()
+    if bounds is None:
+        return 0.0
+    return sum(bounds_contain(bounds, cp) for cp in codepoints) / len(codepoints)
+
+
+def _find_fonts_by_coverage(
+    text: str,
+    types: Optional[List[FontType]],
+    min_coverage: Optional[float],
+    sort: Optional[str],
+    random_order: bool,
+    max_results: Optional[int],
+    jobs: Optional[int],
+    seed: Optional[int]
+) -> List[FontInfo]:
+    """Filtre et classe les polices selon la fraction du texte couverte (voir find_fonts)."""
+    font_files = list(get_font_files().items())
+    index = get_codepoint_index([path for _, path in font_files], jobs=jobs)
+    
+    codepoints = {ord(char) for char in text}
+    total = len(codepoints)
+    if min_coverage is None:
+        # Sans seuil, le classement garde toute police couvrant au moins un caractère
+        min_count = 1 if total else 0
+    else:
+        # Tolérance pour les flottants : 0.9 * 10 ne doit pas exiger 10 caractères
+        min_count = max(0, math.ceil(min_coverage * total - 1e-9))
+    
+    counts = index.coverage_counts(codepoints, min_count)
+    matches = [
+        (font_id, count) for font_id, count in counts.items()
+        if types is None or FontType.from_extension(font_files[font_id][1].suffix) in types
+    ]
+    
+    if sort == "coverage":
+        matches.sort(key=lambda match: -match[1])
+    elif random_order:
+        _random.Random(seed).shuffle(matches)
+    
+    if max_results is not None and max_results > 0:
+        matches = matches[:max_results]
+    
+    fonts = []
+    for font_id, count in matches:
+        name, path = font_files[font_id]
+        fonts.append(FontInfo(name=name, path=path, coverage=count / total if total else 1.0))
+    return fonts
+
+
+def iter_fonts(
+    text: Optional[str] = None,
+    types: Optional[List[FontType]] = None,
+    max_results: Optional[int] = None,
+    jobs: Optional[int] = None,
+    random_order: bool = False,
+    seed: Optional[int] = None
+) -> Iterator[FontInfo]:
+    """
+    Générateur : produit les polices installées au fur et à mesure qu'elles
+    passent les filtres, et s'arrête dès que max_results polices ont été
+    trouvées.
+    
+    Si l'index inversé des caractères est déjà construit (ou si jobs est
+    donné), il est utilisé directement. Sinon, avec max_results, la
+    couverture des polices est lue une par une, seulement jusqu'à obtenir
+    assez de résultats.
+    
+    Avec random_order, les polices sont examinées dans un ordre aléatoire :
+    les max_results premières polices compatibles forment un échantillon
+    uniforme, obtenu sans examiner le reste de la bibliothèque.
+    
+    Args:
+        text: Texte optionnel pour filtrer les polices qui supportent ces caractères.
+        types: Liste des types de polices à inclure (TTF, OTF, etc.).
+               Si None, tous les types sont inclus.
+        max_results: Nombre maximum de polices à produire. Si None, toutes.
+        jobs: Nombre de processus pour lire la couverture des polices pas encore
+              indexées. None ou 1 : séquentiel, 0 : un processus par CPU.
+        random_order: Si True, produit les polices dans un ordre aléatoire.
+        seed: Graine du tirage aléatoire, pour un échantillon reproductible.
+    
+    Examples:
+        >>> # Afficher les 5 premières polices emoji dès qu'elles sont trouvées
+        >>> for font in iter_fonts(text="🌷", max_results=5):
+        ...     print(font.name)
+    """
+    return _iter_fonts(
+        list(get_font_files().items()), text, types, max_results, jobs, random_order, seed
+    )
+
+
+def _iter_fonts(
+    font_files: List[Tuple[str, Path]],
+    text: Optional[str],
+    types: Optional[List[FontType]],
+    max_results: Optional[int],
+    jobs: Optional[int],
+    random_order: bool,
+    seed: Optional[int]
+) -> Iterator[FontInfo]:
+    """Générateur de iter_fonts() sur un inventaire déjà lu."""
+    if max_results is not None and max_results <= 0:
+        max_results = None
+    
+    # Ordre d'examen des polices (identifiants de l'index inversé)
+    order = range(len(font_files))
+    if random_order:
+        order = list(order)
+        _random.Random(seed).shuffle(order)
+    candidates = (font_files[font_id] for font_id in order)
+    
+    if text is not None:
+        codepoints = {ord(char) for char in text}
+        all_paths = [path for _, path in font_files]
+        index = peek_codepoint_index(all_paths)
+        if index is None and (max_results is None or jobs is not None):
+            index = get_codepoint_index(all_paths, jobs=jobs)
+        
+        if index is not None:
+            # Intersection des bitsets de l'index inversé
+            matches = index.query(codepoints)
+            if random_order:
+                matching = set(bits_to_ids(matches))
+                candidates = [font_files[font_id] for font_id in order if font_id in matching]
+            else:
+                candidates = [font_files[font_id] for font_id in bits_to_ids(matches)]
+        else:
+            # Lecture paresseuse : seulement les polices nécessaires
+            coverage = get_coverage_index()
+            candidates = (
+                (name, path) for name, path in candidates
+                if (types is None or FontType.from_extension(path.suffix) in types)
+                and coverage.supports(path, codepoints)
+            )
+    
     try:
-        # Suppress warnings during font loading
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            font = TTFont(str(font_path), fontNumber=0)
-            cmap = font.getBestCmap()
-            font.close()
-
-        if cmap is None:
-            return False
-
-        for char in text:
-            if ord(char) not in cmap:
-                return False
-        return True
-    except Exception:
-        return False
+        found = 0
+        for name, path in candidates:
+            # Filtrer par type si spécifié
+            if types is not None:
+                font_type = FontType.from_extension(path.suffix)
+                if font_type not in types:
+                    continue
+            
+            yield FontInfo(name=name, path=path)
+            found += 1
+            if max_results is not None and found >= max_results:
+                return
+    finally:
+        if text is not None and index is None:
+            coverage.save()
 
 
 def find_fonts(
     text: Optional[str] = None,
     types: Optional[List[FontType]] = None,
     random_order: bool = False,
-    max_results: Optional[int] = None
+    max_results: Optional[int] = None,
+    jobs: Optional[int] = None,
+    seed: Optional[int] = None,
+    min_coverage: Optional[float] = None,
+    sort: Optional[str] = None
 ) -> List[FontInfo]:
     """
     Trouve les polices installées avec filtrage avancé.
     
+    Par défaut, le filtre texte est tout ou rien : une police est retenue
+    seulement si elle contient tous les caractères. Avec min_coverage ou
+    sort="coverage", les polices sont évaluées sur la fraction des
+    caractères couverts (renseignée dans FontInfo.coverage), calculée pour
+    toutes les polices en une passe sur l'index inversé.
+    
     Args:
         text: Texte optionnel pour filtrer les polices qui supportent ces caractères.
-              Nécessite fonttools pour fonctionner.
         types: Liste des types de polices à inclure (TTF, OTF, etc.).
                Si None, tous les types sont inclus.
         random_order: Si True, retourne les résultats dans un ordre aléatoire.
+                      Avec max_results, la recherche s'arrête dès que
+                      l'échantillon est complet.
         max_results: Nombre maximum de polices à retourner. Si None, retourne toutes.
+        jobs: Nombre de processus pour lire la couverture des polices pas encore
+              indexées. None ou 1 : séquentiel, 0 : un processus par CPU.
+        seed: Graine du tirage aléatoire (avec random_order), pour des
+              échantillons reproductibles.
+        min_coverage: Fraction minimale (0.0 à 1.0) des caractères distincts
+                      du texte que la police doit contenir.
+        sort: "coverage" pour classer les polices de la mieux à la moins bien
+              couverte. Sans min_coverage, toute police couvrant au moins un
+              caractère est alors retenue.
     
     Returns:
         Liste de FontInfo avec les polices trouvées.
@@ -371,32 +708,451 @@ def find_fonts(
         >>> # 10 polices aléatoires
         >>> random_fonts = find_fonts(random_order=True, max_results=10)
         
+        >>> # Le même échantillon à chaque appel
+        >>> sample = find_fonts(random_order=True, max_results=10, seed=42)
+        
         >>> # Polices OTF supportant les caractères allemands
         >>> german_fonts = find_fonts(text="äöü ß", types=[FontType.OTF])
+        
+        >>> # Texte multi-écritures : les polices les plus proches d'abord
+        >>> best = find_fonts(text="Hello Привет 你好", min_coverage=0.5, sort="coverage")
+    """
+    if sort not in (None, "coverage"):
+        raise ValueError(f"Unknown sort order '{sort}'. Valid orders: coverage")
+    
+    if text is not None and (min_coverage is not None or sort is not None):
+        return _find_fonts_by_coverage(
+            text, types, min_coverage, sort, random_order, max_results, jobs, seed
+        )
+    
+    if random_order:
+        return list(iter_fonts(
+            text=text,
+            types=types,
+            max_results=max_results,
+            jobs=jobs,
+            random_order=True,
+            seed=seed
+        ))
+    
+    # Requête normalisée : l'ordre et la répétition des caractères ou des types
+    # ne changent pas le résultat
+    if max_results is not None and max_results <= 0:
+        max_results = None
+    font_files = list(get_font_files().items())
+    key = (
+        frozenset(map(ord, text)) if text is not None else None,
+        frozenset(types) if types is not None else None,
+        max_results,
+    )
+    fonts = _query_cache.get(key, _inventory_generation)
+    if fonts is None:
+        fonts = list(_iter_fonts(font_files, text, types, max_results, jobs, False, None))
+        _query_cache.put(key, fonts, _inventory_generation)
+    return list(fonts)
+
+
+_query_cache = QueryCache(maxsize=256)
+
+
+class TextFilter:
+    """
+    Filtre texte incrémental, pour filtrer à chaque frappe dans une interface.
+    
+    Quand le nouveau texte contient tous les caractères d'un texte déjà
+    filtré (typiquement "abc" puis "abcd"), le résultat ne peut que
+    rétrécir : le bitset précédent est simplement intersecté avec ceux des
+    nouveaux caractères. Les bitsets des derniers jeux de caractères sont
+    gardés, si bien qu'un retour arrière ne coûte rien, et les bitsets par
+    caractère sont mémorisés par l'index inversé.
+    
+    L'inventaire est lu à la construction et à chaque appel de reset(), et
+    relu automatiquement quand sa génération change (polices installées ou
+    supprimées, voir inventory_generation()) : les résultats mémorisés ne
+    survivent pas à l'ancien jeu de polices.
+    
+    Args:
+        types: Types de polices à inclure. Si None, tous les types.
+        jobs: Nombre de processus pour indexer les polices pas encore lues.
+        progress: Appelé avec (polices vérifiées, total) pendant l'indexation.
+    
+    Examples:
+        >>> text_filter = TextFilter()
+        >>> for text in ("a", "ab", "abc", "ab"):
+        ...     print(text, len(text_filter.update(text)))
+    """
+    
+    HISTORY_SIZE = 64
+    
+    def __init__(self, types: Optional[List[FontType]] = None, jobs: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.types = types
+        self.jobs = jobs
+        self.progress = progress
+        self.reset()
+    
+    def reset(self) -> None:
+        """Relit l'inventaire et oublie les résultats mémorisés."""
+        font_files = list(get_font_files().items())
+        self._generation = _inventory_generation
+        self.fonts = [FontInfo(name=name, path=path) for name, path in font_files]
+        self._index = get_codepoint_index(
+            [path for _, path in font_files], jobs=self.jobs, progress=self.progress
+        )
+        self._allowed = self._index.query(())
+        if self.types is not None:
+            self._allowed &= ids_to_bits(
+                (font_id for font_id, font in enumerate(self.fonts) if font.font_type in self.types),
+                len(self.fonts)
+            )
+        self._history: "OrderedDict[frozenset, int]" = OrderedDict()
+        self._history[frozenset()] = self._allowed
+        self.hits = self.refinements = 0
+    
+    def bits(self, text: str) -> int:
+        """Retourne le bitset (identifiants dans self.fonts) des polices couvrant le texte."""
+        if _inventory_generation != self._generation:
+            # L'inventaire a changé depuis la construction de l'historique
+            self.reset()
+        codepoints = frozenset(map(ord, text))
+        bits = self._history.get(codepoints)
+        if bits is not None:
+            self._history.move_to_end(codepoints)
+            self.hits += 1
+            return bits
+        
+        # Partir du plus grand jeu de caractères déjà filtré inclus dans le nouveau
+        base = max((known for known in self._history if known <= codepoints), key=len)
+        bits = self._history[base]
+        for cp in codepoints - base:
+            if not bits:
+                break
+            bits &= self._index.fonts_for(cp)
+        self.refinements += 1
+        
+        self._history[codepoints] = bits
+        if len(self._history) > self.HISTORY_SIZE:
+            # Ne jamais évincer le jeu vide, point de départ de tout calcul
+            oldest = next(known for known in self._history if known)
+            del self._history[oldest]
+        return bits
+    
+    def update(self, text: str) -> List[FontInfo]:
+        """Retourne les polices (ordre de l'inventaire) qui couvrent tout le texte."""
+        return [self.fonts[font_id] for font_id in bits_to_ids(self.bits(text))]
+
+
+def query_cache_info() -> CacheInfo:
+    """
+    Statistiques du cache des résultats de find_fonts() : succès, échecs,
+    évictions LRU, invalidations (changement de l'inventaire) et taille.
     """
-    font_files = get_font_files()
-    results = []
+    return _query_cache.info()
+
+
+def clear_query_cache() -> None:
+    """Vide le cache des résultats de find_fonts() et remet ses statistiques à zéro."""
+    _query_cache.clear()
+
+
+def find_fonts_batch(
+    texts: List[str],
+    types: Optional[List[FontType]] = None,
+    max_results: Optional[int] = None,
+    jobs: Optional[int] = None
+) -> Dict[str, List[FontInfo]]:
+    """
+    Trouve les polices supportant chacun des textes, en une seule passe.
+    
+    La couverture de chaque police est chargée une seule fois dans l'index
+    inversé, puis toutes les requêtes sont résolues par intersection de
+    bitsets : c'est bien plus rapide que d'appeler find_fonts() en boucle.
+    
+    Args:
+        texts: Textes à tester (les doublons ne sont résolus qu'une fois).
+        types: Liste des types de polices à inclure (TTF, OTF, etc.).
+               Si None, tous les types sont inclus.
+        max_results: Nombre maximum de polices par texte. Si None, toutes.
+        jobs: Nombre de processus pour lire la couverture des polices pas encore
+              indexées. None ou 1 : séquentiel, 0 : un processus par CPU.
     
-    for name, path in font_files.items():
-        # Filtrer par type si spécifié
+    Returns:
+        Dictionnaire {texte: liste de FontInfo}.
+    
+    Examples:
+        >>> results = find_fonts_batch(["Hello", "äöü ß", "Привет"])
+        >>> for text, fonts in results.items():
+        ...     print(text, len(fonts))
+    """
+    if max_results is not None and max_results <= 0:
+        max_results = None
+
+    font_files = list(get_font_files().items())
+    index = get_codepoint_index([path for _, path in font_files], jobs=jobs)
+    
+    # Filtre par type calculé une fois, sous forme de bitset
+    allowed = None
+    if types is not None:
+        allowed = ids_to_bits(
+            (font_id for font_id, (_, path) in enumerate(font_files)
+             if FontType.from_extension(path.suffix) in types),
+            len(font_files)
+        )
+    
+    results = {}
+    for text in texts:
+        if text in results:
+            continue
+        
+        matches = index.query(ord(char) for char in text)
+        if allowed is not None:
+            matches &= allowed
+        
+        fonts = []
+        for font_id in bits_to_ids(matches):
+            name, path = font_files[font_id]
+            fonts.append(FontInfo(name=name, path=path))
+            if max_results is not None and len(fonts) >= max_results:
+                break
+        results[text] = fonts
+    
+    return results
+
+
+def _is_ignorable(cp: int) -> bool:
+    """Caractères de format invisibles (ZWJ, tags...) et sélecteurs de variante."""
+    return (
+        0xFE00 <= cp <= 0xFE0F
+        or 0xE0100 <= cp <= 0xE01EF
+        or unicodedata.category(chr(cp)) == "Cf"
+    )
+
+
+def _resolve_font(font: Union[FontInfo, Path, str], font_files: Dict[str, Path]) -> Optional[FontInfo]:
+    """Convertit un nom de police, un chemin ou un FontInfo en FontInfo."""
+    if isinstance(font, FontInfo):
+        return font
+    if isinstance(font, str) and font in font_files:
+        return FontInfo(name=font, path=font_files[font])
+    path = Path(font)
+    if path.is_file():
+        return FontInfo(name=path.stem, path=path)
+    return None
+
+
+def plan_fallback(
+    text: str,
+    preferred: Optional[List[Union[FontInfo, Path, str]]] = None,
+    types: Optional[List[FontType]] = None,
+    jobs: Optional[int] = None
+) -> List[FontInfo]:
+    """
+    Calcule une courte chaîne de polices de repli couvrant tout le texte.
+    
+    Les polices préférées sont prises dans l'ordre, chacune seulement si elle
+    apporte au moins un caractère manquant (comme une pile font-family CSS).
+    Les caractères restants sont couverts par recouvrement glouton : à chaque
+    étape, la police installée couvrant le plus de caractères manquants est
+    ajoutée. Les comptes sont obtenus en une passe sur l'index inversé, sans
+    relire les polices.
+    
+    Args:
+        text: Texte à couvrir. Les caractères de format invisibles (ZWJ...) et
+              les sélecteurs de variante ne sont pas exigés.
+        preferred: Polices à essayer en premier (noms, chemins ou FontInfo).
+                   Les noms inconnus sont ignorés.
+        types: Types de polices installées utilisables pour compléter la chaîne.
+        jobs: Nombre de processus pour lire la couverture des polices pas encore
+              indexées. None ou 1 : séquentiel, 0 : un processus par CPU.
+    
+    Returns:
+        Liste ordonnée de FontInfo ; coverage donne la fraction des caractères
+        du texte attribués à chaque police. Les caractères qu'aucune police ne
+        contient sont laissés de côté (voir text_coverage()).
+    
+    Examples:
+        >>> chain = plan_fallback("Hello Привет 你好 🌷", preferred=["DejaVuSans"])
+        >>> [font.name for font in chain]
+    """
+    font_files = dict(get_font_files())
+    installed = list(font_files.items())
+    index = get_codepoint_index([path for _, path in installed], jobs=jobs)
+    coverage = get_coverage_index()
+    
+    remaining = {ord(char) for char in text if not _is_ignorable(ord(char))}
+    total = len(remaining)
+    plan = []
+    
+    for font in preferred or ():
+        if not remaining:
+            break
+        info = _resolve_font(font, font_files)
+        bounds = coverage.get(info.path) if info is not None else None
+        if bounds is None:
+            continue
+        covered = {cp for cp in remaining if bounds_contain(bounds, cp)}
+        if covered:
+            remaining -= covered
+            plan.append(FontInfo(name=info.name, path=info.path, coverage=len(covered) / total))
+    coverage.save()
+    
+    while remaining:
+        counts = index.coverage_counts(remaining)
         if types is not None:
-            font_type = FontType.from_extension(path.suffix)
-            if font_type not in types:
-                continue
+            counts = {
+                font_id: count for font_id, count in counts.items()
+                if FontType.from_extension(installed[font_id][1].suffix) in types
+            }
+        if not counts:
+            break
         
-        # Filtrer par texte si spécifié
-        if text is not None:
-            if not check_font_supports_text(path, text):
+        # À égalité, la première police de l'inventaire l'emporte
+        font_id = max(counts, key=counts.get)
+        bit = 1 << font_id
+        remaining = {cp for cp in remaining if not index.fonts_for(cp) & bit}
+        name, path = installed[font_id]
+        plan.append(FontInfo(name=name, path=path, coverage=counts[font_id] / total))
+    
+    return plan
+
+
+class TextRun(NamedTuple):
+    """Portion text[start:end] à afficher avec une police (None : aucune ne convient)."""
+    start: int
+    end: int
+    font: Optional[FontInfo]
+
+
+# Valeur de _font_index() pour un cluster sans caractère visible
+_INHERIT = -1
+
+
+class Itemizer:
+    """
+    Découpe des textes en segments par police, pour une liste de polices
+    fixe (voir itemize()).
+    
+    La couverture des polices est chargée une fois à la construction, et la
+    police choisie pour chaque cluster de graphèmes est mémorisée : découper
+    de nombreuses lignes avec les mêmes polices ne coûte presque qu'un
+    parcours des clusters.
+    """
+    
+    CLUSTER_CACHE_SIZE = 4096
+    
+    def __init__(self, fonts: List[Union[FontInfo, Path, str]]):
+        font_files = get_font_files() if any(isinstance(f, str) for f in fonts) else {}
+        resolved = (_resolve_font(font, font_files) for font in fonts)
+        self.fonts = [font for font in resolved if font is not None]
+        
+        coverage = get_coverage_index()
+        self._bounds = [coverage.get(font.path) for font in self.fonts]
+        coverage.save()
+        self._clusters: Dict[str, Optional[int]] = {}
+    
+    def _font_index(self, cluster: str) -> Optional[int]:
+        """Indice de la première police couvrant le cluster, None si aucune."""
+        choice = self._clusters.get(cluster, _INHERIT - 1)
+        if choice != _INHERIT - 1:
+            return choice
+        
+        codepoints = [ord(char) for char in cluster if not _is_ignorable(ord(char))]
+        if not codepoints:
+            choice = _INHERIT
+        else:
+            choice = next(
+                (i for i, bounds in enumerate(self._bounds)
+                 if bounds is not None and all(bounds_contain(bounds, cp) for cp in codepoints)),
+                None
+            )
+            if choice is None and len(codepoints) > 1:
+                # Comme les navigateurs : à défaut, une police qui a au moins le caractère de base
+                choice = next(
+                    (i for i, bounds in enumerate(self._bounds)
+                     if bounds is not None and bounds_contain(bounds, codepoints[0])),
+                    None
+                )
+        
+        if len(self._clusters) >= self.CLUSTER_CACHE_SIZE:
+            self._clusters.clear()
+        self._clusters[cluster] = choice
+        return choice
+    
+    def itemize(self, text: str) -> List[TextRun]:
+        """Découpe le texte en segments (voir itemize())."""
+        distinct = set(text)
+        if all(break_class(ord(char)) in (OTHER, CONTROL, LF) for char in distinct):
+            # Aucun caractère ne se combine : un cluster par caractère
+            choices = {char: self._font_index(char) for char in distinct}
+            used = set(choices.values()) - {_INHERIT}
+            if len(used) <= 1:
+                return [TextRun(0, len(text), self._font(used.pop() if used else _INHERIT))] if text else []
+            clusters = ((i, i + 1, choices[char]) for i, char in enumerate(text))
+        else:
+            clusters = (
+                (start, end, self._font_index(text[start:end]))
+                for start, end in grapheme_clusters(text)
+            )
+        
+        runs = []
+        run_start = 0
+        run_font = _INHERIT
+        for start, end, choice in clusters:
+            if choice == _INHERIT or choice == run_font:
                 continue
+            if run_font != _INHERIT:
+                runs.append(TextRun(run_start, start, self._font(run_font)))
+                run_start = start
+            run_font = choice
         
-        results.append(FontInfo(name=name, path=path))
+        if text:
+            runs.append(TextRun(run_start, len(text), self._font(run_font)))
+        return runs
     
-    # Ordre aléatoire si demandé
-    if random_order:
-        _random.shuffle(results)
+    def _font(self, choice: Optional[int]) -> Optional[FontInfo]:
+        return None if choice is None or choice == _INHERIT else self.fonts[choice]
+
+
+_itemizers: Dict[Tuple[Path, ...], Itemizer] = {}
+_MAX_ITEMIZERS = 16
+
+
+def itemize(text: str, fonts: List[Union[FontInfo, Path, str]]) -> List[TextRun]:
+    """
+    Découpe un texte en segments (start, end, police), chaque segment
+    utilisant la première police de la liste qui couvre ses caractères,
+    comme le repli de polices d'un navigateur.
     
-    # Limiter le nombre de résultats
-    if max_results is not None and max_results > 0:
-        results = results[:max_results]
+    Le découpage se fait par clusters de graphèmes : une séquence emoji ZWJ,
+    un drapeau ou une lettre suivie de diacritiques ne sont jamais coupés.
+    Si aucune police ne couvre un cluster entier, la première qui contient
+    son caractère de base est utilisée, sinon le segment a pour police None.
+    Les caractères invisibles (ZWJ isolé, sélecteurs de variante...) restent
+    dans le segment qui les entoure.
     
-    return results
\ No newline at end of file
+    Les Itemizer des listes de polices récemment utilisées sont conservés,
+    ce qui rend les appels répétés très rapides.
+    
+    Args:
+        text: Texte à découper.
+        fonts: Polices par ordre de préférence (FontInfo, chemins ou noms de
+               polices installées ; les noms inconnus sont ignorés).
+    
+    Returns:
+        Liste de TextRun(start, end, font) couvrant tout le texte.
+    
+    Examples:
+        >>> fonts = plan_fallback("Hello 你好 🌷")
+        >>> for start, end, font in itemize("Hello 你好 🌷", fonts):
+        ...     print(repr("Hello 你好 🌷"[start:end]), font and font.name)
+    """
+    key = tuple(
+        font.path if isinstance(font, FontInfo) else font if isinstance(font, str) else Path(font)
+        for font in fonts
+    )
+    itemizer = _itemizers.get(key)
+    if itemizer is None:
+        if len(_itemizers) >= _MAX_ITEMIZERS:
+            _itemizers.clear()
+        itemizer = _itemizers[key] = Itemizer(fonts)
+    return itemizer.itemize(text)
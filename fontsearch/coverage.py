@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Persistent codepoint coverage index.
+
+For every font file the index stores the codepoints mapped by its cmap as a
+flat sorted list of range boundaries [start0, end0 + 1, start1, end1 + 1, ...].
+A codepoint is supported when bisect_right(bounds, cp) is odd, so checking a
+text against a font is a handful of bisections instead of a full TTFont load.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import logging
+import warnings
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple, Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import load_cache, save_cache
+from .cmap import CmapError, read_cmap_ranges
+from .scan import FileSignature, file_signature
+
+COVERAGE_CACHE = "coverage.json"
+
+# Extensions whose cmap can be read
+SUPPORTED_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# Below this many unindexed fonts, starting a process pool costs more than it saves
+PARALLEL_MIN_FONTS = 16
+
+# Each worker receives about this many chunks, so that one huge font
+# (a CJK collection, say) does not leave the other workers idle
+CHUNKS_PER_WORKER = 4
+
+
+def codepoints_to_bounds(codepoints: Iterable[int]) -> List[int]:
+    """Compress codepoints into a flat list of [start, end + 1) boundaries."""
+    bounds = []
+    for cp in sorted(set(codepoints)):
+        if bounds and bounds[-1] == cp:
+            bounds[-1] = cp + 1
+        else:
+            bounds.extend((cp, cp + 1))
+    return bounds
+
+
+def bounds_contain(bounds: List[int], cp: int) -> bool:
+    """Return True if the codepoint lies within one of the ranges."""
+    return bisect_right(bounds, cp) & 1 == 1
+
+
+def _read_cmap_bounds_fonttools(font_path: Path) -> Optional[List[int]]:
+    """Fallback for fonts the native reader cannot parse (requires fonttools)."""
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        return None
+    logging.getLogger("fontTools.ttLib.tables._p_o_s_t").setLevel(logging.ERROR)
+    logging.getLogger("fontTools.ttLib.tables.DefaultTable").setLevel(logging.ERROR)
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            font = TTFont(str(font_path), fontNumber=0, lazy=True)
+            try:
+                cmap = font.getBestCmap()
+                notdef = font.getGlyphOrder()[0]
+            finally:
+                font.close()
+    except Exception:
+        return None
+
+    if cmap is None:
+        return None
+    return codepoints_to_bounds(cp for cp, name in cmap.items() if name != notdef)
+
+
+def read_cmap_bounds(font_path: Path) -> Optional[List[int]]:
+    """
+    Read the codepoints mapped by a font's best cmap.
+
+    Uses the standard-library reader from fontsearch.cmap, falling back to
+    fonttools (if installed) for fonts it cannot parse. Returns None if the
+    file cannot be read or has no Unicode cmap.
+    """
+    if font_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+        return None
+
+    try:
+        ranges = read_cmap_ranges(font_path)
+    except CmapError:
+        return _read_cmap_bounds_fonttools(font_path)
+    except OSError:
+        return None
+
+    if ranges is None:
+        return None
+    return [bound for start_end in ranges for bound in start_end]
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Translate a jobs= argument into a worker count (0 means all CPUs)."""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def chunk_by_size(files: List[Tuple[str, FileSignature]], count: int) -> List[List[str]]:
+    """
+    Split files into about `count` chunks of similar total size.
+
+    Files are taken largest first, so the biggest fonts are submitted first
+    and each sits in a chunk of its own.
+    """
+    files = sorted(files, key=lambda item: item[1].size, reverse=True)
+    budget = max(sum(sig.size for _, sig in files) / max(count, 1), 1)
+    chunks, current, current_size = [], [], 0
+    for key, signature in files:
+        if current and current_size + signature.size > budget:
+            chunks.append(current)
+            current, current_size = [], 0
+        current.append(key)
+        current_size += signature.size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _read_cmap_chunk(paths: List[str]) -> List[Tuple[str, Optional[List[int]]]]:
+    """Worker entry point: read the coverage of a chunk of fonts."""
+    return [(path, read_cmap_bounds(Path(path))) for path in paths]
+
+
+class CoverageIndex:
+    """
+    Persistent {font path: codepoint coverage} index.
+
+    Entries are validated against the file signature (size, mtime, inode)
+    the first time they are used in a process, and can be evicted explicitly
+    from a ScanDiff with invalidate().
+    """
+
+    def __init__(self, cache_name: str = COVERAGE_CACHE):
+        self.cache_name = cache_name
+        self._lock = threading.RLock()
+        self._entries: Dict[str, tuple] = {}  # path -> (FileSignature, bounds or None)
+        self._verified = set()
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        data = load_cache(self.cache_name)
+        if data is None:
+            return
+        for path, (signature, bounds) in data.get("fonts", {}).items():
+            self._entries[path] = (FileSignature(*signature), bounds)
+
+    def save(self) -> None:
+        """Write the index to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            fonts = {
+                path: [list(signature), bounds]
+                for path, (signature, bounds) in self._entries.items()
+            }
+            self._dirty = False
+        save_cache(self.cache_name, {"fonts": fonts})
+
+    def invalidate(self, paths: Iterable[Path]) -> None:
+        """Evict entries for changed or removed font files."""
+        with self._lock:
+            for path in paths:
+                if self._entries.pop(str(path), None) is not None:
+                    self._dirty = True
+                self._verified.discard(str(path))
+
+    def _lookup(self, key: str) -> Tuple[bool, Optional[List[int]], Optional[FileSignature]]:
+        """Return (found, bounds, signature) for a path without reading its cmap."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and key in self._verified:
+                return True, entry[1], entry[0]
+
+        signature = file_signature(key)
+        if entry is not None and entry[0] == signature:
+            with self._lock:
+                self._verified.add(key)
+            return True, entry[1], signature
+        return False, None, signature
+
+    def _store(self, key: str, signature: Optional[FileSignature],
+               bounds: Optional[List[int]]) -> None:
+        with self._lock:
+            if signature is not None:
+                self._entries[key] = (signature, bounds)
+                self._verified.add(key)
+                self._dirty = True
+
+    def get(self, font_path: Path) -> Optional[List[int]]:
+        """
+        Return the coverage bounds of a font, reading its cmap if needed.
+
+        Returns None if the font cannot be read.
+        """
+        key = str(font_path)
+        found, bounds, signature = self._lookup(key)
+        if not found:
+            bounds = read_cmap_bounds(font_path)
+            self._store(key, signature, bounds)
+        return bounds
+
+    def build(self, font_paths: Iterable[Path], jobs: Optional[int] = None,
+              progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Index every font that is not indexed yet.
+
+        Args:
+            font_paths: Fonts to index.
+            jobs: Number of worker processes. None or 1 reads the fonts in
+                  this process, 0 uses one worker per CPU.
+            progress: Called as progress(checked, total) while fonts are
+                      read. An exception raised by the callback aborts the
+                      build; fonts read so far stay indexed.
+        """
+        font_paths = list(font_paths)
+        missing = []
+        for path in font_paths:
+            key = str(path)
+            found, _bounds, signature = self._lookup(key)
+            if not found and signature is not None:
+                missing.append((key, signature))
+
+        total = len(font_paths)
+        checked = total - len(missing)
+        if progress is not None:
+            progress(checked, total)
+
+        workers = resolve_jobs(jobs)
+        if workers <= 1 or len(missing) < PARALLEL_MIN_FONTS:
+            for key, signature in missing:
+                self._store(key, signature, read_cmap_bounds(Path(key)))
+                checked += 1
+                if progress is not None:
+                    progress(checked, total)
+            return
+
+        signatures = dict(missing)
+        chunks = chunk_by_size(missing, workers * CHUNKS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = [executor.submit(_read_cmap_chunk, chunk) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    results = future.result()
+                    for key, bounds in results:
+                        self._store(key, signatures[key], bounds)
+                    checked += len(results)
+                    if progress is not None:
+                        progress(checked, total)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def supports(self, font_path: Path, codepoints: Iterable[int]) -> bool:
+        """Return True if the font maps every codepoint."""
+        bounds = self.get(font_path)
+        if bounds is None:
+            return False
+        return all(bounds_contain(bounds, cp) for cp in codepoints)
+
+
+def ids_to_bits(ids: Iterable[int], size: int) -> int:
+    """Build a font-ID bitset (an int) from a collection of IDs."""
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def bits_to_ids(bits: int) -> Iterator[int]:
+    """Yield the IDs set in a bitset, in increasing order."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (offset << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class CodepointIndex:
+    """
+    Inverted index: codepoint -> bitset of the fonts that map it.
+
+    Font IDs are positions in the font list given at construction. The
+    codepoint space is split into 256-codepoint blocks; for each block the
+    index keeps the bitset of fonts covering the whole block and the IDs of
+    fonts covering part of it. The bitset of a codepoint is computed once
+    from its block and memoized, so a text query is an intersection of one
+    bitset per distinct character.
+    """
+
+    BLOCK_BITS = 8
+    CODEPOINT_CACHE_SIZE = 4096
+
+    def __init__(self, font_paths: List[Path], coverage: Optional[CoverageIndex] = None,
+                 jobs: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        coverage = coverage or get_coverage_index()
+        try:
+            coverage.build(font_paths, jobs=jobs, progress=progress)
+        except BaseException:
+            # Garder ce qui a déjà été lu pour la prochaine fois
+            coverage.save()
+            raise
+        self.paths = list(font_paths)
+        self.size = len(self.paths)
+        self._bounds: List[Optional[List[int]]] = []
+        self._blocks: Dict[int, tuple] = {}  # block -> (full bitset, [partial IDs])
+        self._codepoints: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        readable = []
+        full_ids: Dict[int, List[int]] = {}
+        partial_ids: Dict[int, List[int]] = {}
+
+        for font_id, path in enumerate(self.paths):
+            bounds = coverage.get(path)
+            self._bounds.append(bounds)
+            if bounds is None:
+                continue
+            readable.append(font_id)
+            self._add_font_blocks(font_id, bounds, full_ids, partial_ids)
+        coverage.save()
+
+        for block in set(full_ids) | set(partial_ids):
+            self._blocks[block] = (
+                ids_to_bits(full_ids.get(block, ()), self.size),
+                partial_ids.get(block, []),
+            )
+        self._readable = ids_to_bits(readable, self.size)
+
+    def _add_font_blocks(self, font_id: int, bounds: List[int],
+                         full_ids: Dict[int, List[int]],
+                         partial_ids: Dict[int, List[int]]) -> None:
+        """Record which blocks a font covers fully or partially."""
+        shift = self.BLOCK_BITS
+        partial = set()
+        for start, end in zip(bounds[0::2], bounds[1::2]):
+            for block in range(start >> shift, ((end - 1) >> shift) + 1):
+                if start <= block << shift and (block + 1) << shift <= end:
+                    full_ids.setdefault(block, []).append(font_id)
+                else:
+                    # Un bloc peut être touché par plusieurs plages disjointes
+                    partial.add(block)
+        for block in sorted(partial):
+            partial_ids.setdefault(block, []).append(font_id)
+
+    def fonts_for(self, cp: int) -> int:
+        """Return the bitset of fonts that map a codepoint."""
+        with self._lock:
+            bits = self._codepoints.get(cp)
+            if bits is not None:
+                self._codepoints.move_to_end(cp)
+                return bits
+
+        entry = self._blocks.get(cp >> self.BLOCK_BITS)
+        bits = 0
+        if entry is not None:
+            full, partial = entry
+            hits = [i for i in partial if bounds_contain(self._bounds[i], cp)]
+            bits = full | ids_to_bits(hits, self.size)
+
+        with self._lock:
+            self._codepoints[cp] = bits
+            if len(self._codepoints) > self.CODEPOINT_CACHE_SIZE:
+                self._codepoints.popitem(last=False)
+        return bits
+
+    def query(self, codepoints: Iterable[int]) -> int:
+        """Return the bitset of fonts that map every codepoint."""
+        bits = self._readable
+        for cp in set(codepoints):
+            bits &= self.fonts_for(cp)
+            if not bits:
+                break
+        return bits
+
+    def count_planes(self, codepoints: Iterable[int]) -> List[int]:
+        """
+        Count, for every font at once, how many of the codepoints it maps.
+
+        The counts are bit-sliced: bit b of a font's count is the font's bit
+        in planes[b]. Each codepoint bitset is added to all counters with a
+        ripple-carry over the planes, so the cost does not depend on the
+        number of fonts.
+        """
+        planes: List[int] = []
+        for cp in set(codepoints):
+            carry = self.fonts_for(cp)
+            for b, plane in enumerate(planes):
+                if not carry:
+                    break
+                planes[b] = plane ^ carry
+                carry &= plane
+            if carry:
+                planes.append(carry)
+        return planes
+
+    def coverage_counts(self, codepoints: Iterable[int], min_count: int = 1) -> Dict[int, int]:
+        """
+        Return {font ID: number of codepoints mapped} for the readable fonts
+        mapping at least min_count of the (distinct) codepoints.
+        """
+        planes = self.count_planes(codepoints)
+        if min_count.bit_length() > len(planes):
+            return {}
+
+        # Comparaison bit à bit count >= min_count, du bit de poids fort au plus faible
+        all_fonts = (1 << self.size) - 1
+        greater, equal = 0, all_fonts
+        for b in range(len(planes) - 1, -1, -1):
+            plane = planes[b]
+            if min_count >> b & 1:
+                equal &= plane
+            else:
+                greater |= equal & plane
+                equal &= all_fonts ^ plane
+        selected = (greater | equal) & self._readable
+
+        return {
+            font_id: sum((plane >> font_id & 1) << b for b, plane in enumerate(planes))
+            for font_id in bits_to_ids(selected)
+        }
+
+
+_index: Optional[CoverageIndex] = None
+_index_lock = threading.Lock()
+_codepoint_index: Optional[CodepointIndex] = None
+
+
+def get_coverage_index() -> CoverageIndex:
+    """Return the process-wide coverage index, loading it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CoverageIndex()
+        return _index
+
+
+def peek_codepoint_index(font_paths: List[Path]) -> Optional[CodepointIndex]:
+    """Return the inverted index if it is already built for this font list."""
+    index = _codepoint_index
+    if index is not None and index.paths == font_paths:
+        return index
+    return None
+
+
+def get_codepoint_index(font_paths: List[Path], jobs: Optional[int] = None,
+                        progress: Optional[Callable[[int, int], None]] = None) -> CodepointIndex:
+    """
+    Return the inverted index for a font list, rebuilding it only when the
+    list differs from the one it was built for.
+
+    Args:
+        font_paths: Fonts to index, in font-ID order.
+        jobs: Worker processes used to read unindexed fonts (see CoverageIndex.build).
+        progress: Called as progress(checked, total) while fonts are read.
+    """
+    global _codepoint_index
+    index = _codepoint_index
+    if index is None or index.paths != font_paths:
+        index = CodepointIndex(font_paths, jobs=jobs, progress=progress)
+        _codepoint_index = index
+    elif progress is not None:
+        progress(index.size, index.size)
+    return index
+
+
+def invalidate_coverage(paths: Iterable[Path]) -> None:
+    """Evict stale fonts from the coverage indexes if they are loaded."""
+    global _codepoint_index
+    paths = list(paths)
+    if _index is not None and paths:
+        _index.invalidate(paths)
+        _index.save()
+        _codepoint_index = None
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Pool of loaded Pillow fonts.
+
+ImageFont.truetype() opens and parses the font file through FreeType on
+every call. Previews of the same fonts are rendered over and over (each
+text change re-renders the visible rows), so loaded FreeTypeFont objects
+are kept in a bounded LRU pool keyed by (path, face index, size). A loaded
+face keeps its font file mapped in memory or open, depending on the
+platform, so the pool size is also capped from the file descriptor limit.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Optional, Tuple, Union
+
+try:
+    from PIL import ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+DEFAULT_MAX_FONTS = 128
+
+# Part des descripteurs de fichiers du processus réservée au pool
+FD_SHARE = 4
+
+
+class FontPoolInfo(NamedTuple):
+    """Statistics of a FontPool."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+def default_max_fonts() -> int:
+    """
+    Pool size: DEFAULT_MAX_FONTS, lowered to a quarter of the soft limit on
+    open files where that limit is small (macOS defaults to 256).
+    """
+    try:
+        import resource
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit == resource.RLIM_INFINITY:
+            return DEFAULT_MAX_FONTS
+    except (ImportError, OSError, ValueError):
+        # Windows : pas de module resource, limite CRT de 512 fichiers
+        soft_limit = 512
+    return max(8, min(DEFAULT_MAX_FONTS, soft_limit // FD_SHARE))
+
+
+class FontPool:
+    """
+    Thread-safe LRU pool of loaded FreeTypeFont objects.
+
+    A FreeType face must not be used by two threads at once: use() hands out
+    a font together with a lock held for the duration of the block.
+
+    Args:
+        max_fonts: Maximum number of loaded fonts (open files). Defaults to
+                   default_max_fonts().
+    """
+
+    def __init__(self, max_fonts: Optional[int] = None):
+        self.max_fonts = max_fonts if max_fonts is not None else default_max_fonts()
+        self._fonts: "OrderedDict[Tuple, Tuple[Any, threading.Lock]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def _entry(self, font_path: Union[str, Path], size: int, index: int) -> Tuple[Any, threading.Lock]:
+        path = str(font_path)
+        # La date de modification évite de resservir une police remplacée sur disque
+        key = (path, os.stat(path).st_mtime_ns, index, size)
+        with self._lock:
+            entry = self._fonts.get(key)
+            if entry is not None:
+                self._fonts.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        if not PIL_AVAILABLE:
+            raise ImportError("Pillow is required to load fonts")
+        # Chargement hors du verrou : le parsing FreeType peut être long
+        entry = (ImageFont.truetype(path, size, index=index), threading.Lock())
+        with self._lock:
+            entry = self._fonts.setdefault(key, entry)
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self.max_fonts:
+                self._fonts.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    def get(self, font_path: Union[str, Path], size: int, index: int = 0):
+        """
+        Return the loaded font for (path, size, face index), loading it on
+        first use. Raises OSError if the file cannot be loaded.
+        """
+        return self._entry(font_path, size, index)[0]
+
+    @contextmanager
+    def use(self, font_path: Union[str, Path], size: int, index: int = 0) -> Iterator[Any]:
+        """Like get(), holding the font's lock while the block runs."""
+        font, lock = self._entry(font_path, size, index)
+        with lock:
+            yield font
+
+    def clear(self) -> None:
+        """Release every loaded font and reset the statistics."""
+        with self._lock:
+            self._fonts.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> FontPoolInfo:
+        """Return hit/miss/eviction statistics."""
+        with self._lock:
+            return FontPoolInfo(self._hits, self._misses, self._evictions,
+                                len(self._fonts), self.max_fonts)
+
+
+_font_pool: Optional[FontPool] = None
+_font_pool_lock = threading.Lock()
+
+
+def get_font_pool() -> FontPool:
+    """Return the font pool shared by the GUIs and the renderer."""
+    global _font_pool
+    with _font_pool_lock:
+        if _font_pool is None:
+            _font_pool = FontPool()
+        return _font_pool
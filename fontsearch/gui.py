@@ -5,11 +5,15 @@ GUI font viewer using FontSearch as backend.
 
 import sys
 import tkinter as tk
-from tkinter import ttk, font as tkfont
+from tkinter import ttk
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Union, List, Callable, Tuple
 
 from . import find_fonts, FontType, FontInfo
+from .background import BackgroundFilter, PreviewRenderer
+from .virtual_list import VirtualList
+from .previews import PreviewKey, preview_key
+from .render import render_preview
 from .i18n import _, set_language, get_available_languages, get_current_language
 
 # Forcer UTF-8 pour la sortie console Windows
@@ -23,7 +27,7 @@ if sys.platform == "win32":
 
 # Optionnel : pour le rendu correct des polices
 try:
-    from PIL import Image, ImageDraw, ImageFont, ImageTk
+    from PIL import ImageTk
     PIL_AVAILABLE = True
     PhotoImageType = ImageTk.PhotoImage
 except ImportError:
@@ -35,8 +39,7 @@ class FontViewerApp:
     """Interface graphique pour visualiser les polices utilisant FontSearch."""
 
     DEFAULT_TEXT = "AaBbCc 0123 àéïöü ÆŒß"
-    ITEMS_PER_PAGE = 20
-    DEBOUNCE_MS = 2000
+    ROW_HEIGHT = 64
 
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -54,14 +57,16 @@ class FontViewerApp:
         self.font_names = sorted(self.font_files.keys())
         self.filtered_fonts = self.font_names.copy()
 
-        # Pagination
-        self.current_page = 0
-
-        # Timer pour debounce
-        self._debounce_timer = None
+        # Filtre texte incrémental, exécuté dans un thread pour ne pas figer la fenêtre
+        self._background_filter = BackgroundFilter(
+            self.root,
+            on_result=self._on_filter_result,
+            on_progress=self._on_filter_progress,
+            on_error=self._on_filter_error
+        )
 
-        # Cache pour les images PIL
-        self._images = []
+        # Rendu des aperçus dans un pool de threads, livrés ligne par ligne
+        self._preview_renderer = PreviewRenderer(self.root)
 
         # Variables
         self.sample_text = tk.StringVar(value=self.DEFAULT_TEXT)
@@ -134,57 +139,26 @@ class FontViewerApp:
         self.info_label = ttk.Label(main_frame, text="", font=("Segoe UI", 10))
         self.info_label.pack(fill=tk.X, pady=(0, 5))
 
-        # Zone scrollable pour les polices
-        container = ttk.Frame(main_frame)
-        container.pack(fill=tk.BOTH, expand=True)
-
-        self.canvas = tk.Canvas(container, bg="#ffffff", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(container, orient=tk.VERTICAL, command=self.canvas.yview)
-
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Ajuster la largeur du frame interne
-        self.canvas.bind("<Configure>", self._on_canvas_configure)
-
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Liste virtualisée : seules les lignes visibles ont des widgets
+        self.font_list = VirtualList(
+            main_frame,
+            row_height=self.ROW_HEIGHT,
+            create_row=self._create_row,
+            update_row=self._update_row,
+            release_row=self._preview_renderer.cancel,
+            prefetch_rows=self._prefetch_rows,
+            background="#ffffff"
+        )
+        self.font_list.pack(fill=tk.BOTH, expand=True)
 
         # Scroll avec la molette
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
-        self.canvas.bind_all("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
-
-        # Barre de navigation (pagination)
-        nav_frame = ttk.Frame(main_frame)
-        nav_frame.pack(fill=tk.X, pady=(10, 0))
-
-        self.btn_first = ttk.Button(nav_frame, text="⏮ Début", command=self._go_first, width=10)
-        self.btn_first.pack(side=tk.LEFT, padx=2)
-
-        self.btn_prev = ttk.Button(nav_frame, text="◀ Précédent", command=self._go_prev, width=12)
-        self.btn_prev.pack(side=tk.LEFT, padx=2)
-
-        self.page_label = ttk.Label(nav_frame, text="", font=("Segoe UI", 10))
-        self.page_label.pack(side=tk.LEFT, expand=True)
-
-        # Ordre corrigé : Fin à droite, puis Suivant
-        self.btn_last = ttk.Button(nav_frame, text="Fin ⏭", command=self._go_last, width=10)
-        self.btn_last.pack(side=tk.RIGHT, padx=2)
-
-        self.btn_next = ttk.Button(nav_frame, text="Suivant ▶", command=self._go_next, width=12)
-        self.btn_next.pack(side=tk.RIGHT, padx=2)
-
-    def _on_canvas_configure(self, event):
-        """Ajuste la largeur du contenu scrollable."""
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        self.font_list.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.font_list.bind_all("<Button-4>", lambda e: self.font_list.yview_scroll(-1, "units"))
+        self.font_list.bind_all("<Button-5>", lambda e: self.font_list.yview_scroll(1, "units"))
 
     def _on_mousewheel(self, event):
         """Gère le scroll molette."""
-        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        self.font_list.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
     def _on_font_selected(self, font_name: str):
         """Handle font selection and exit gracefully."""
@@ -203,319 +177,237 @@ class FontViewerApp:
         return self.selected_font
 
     def _on_text_change(self):
-        """Appelé quand le texte change - avec temporisation."""
-        if self._debounce_timer is not None:
-            self.root.after_cancel(self._debounce_timer)
-
-        if not self.filter_glyphs.get():
-            self.current_page = 0
-            self._refresh_list()
-        else:
-            self._debounce_timer = self.root.after(self.DEBOUNCE_MS, self._do_filtered_refresh)
-
-    def _do_filtered_refresh(self):
-        """Effectue le rafraîchissement avec filtre après la temporisation."""
-        self._debounce_timer = None
-        self._apply_filter()
-        self.current_page = 0
-        self._refresh_list()
+        """Appelé quand le texte change : le filtre incrémental suit chaque frappe."""
+        if self.filter_glyphs.get() and self._apply_filter():
+            # La liste sera rafraîchie à l'arrivée du résultat
+            self._refresh_info()
+            return
+        self._refresh_list(keep_position=True)
 
     def _on_ligature_change(self):
         """Appelé quand les options de ligatures changent."""
-        if self._debounce_timer is not None:
-            self.root.after_cancel(self._debounce_timer)
-            self._debounce_timer = None
-
-        self.current_page = 0
-        self._refresh_list()
+        self.font_list.refresh()
 
     def _on_filter_change(self):
         """Appelé quand la checkbox change."""
-        if self._debounce_timer is not None:
-            self.root.after_cancel(self._debounce_timer)
-            self._debounce_timer = None
-
-        self._apply_filter()
-        self.current_page = 0
-        self._refresh_list()
-
-    def _apply_filter(self):
-        """Applique le filtre de glyphes en utilisant FontSearch."""
-        if not self.filter_glyphs.get():
-            self.filtered_fonts = self.font_names.copy()
+        if self._apply_filter():
+            self._refresh_info()
             return
+        self._refresh_list()
 
+    def _apply_filter(self) -> bool:
+        """
+        Applique le filtre de glyphes. Retourne True si le filtrage a été lancé
+        en arrière-plan : le résultat arrive alors dans _on_filter_result.
+        """
         text = self.sample_text.get()
-        if not text:
+        if not self.filter_glyphs.get() or not text:
+            self._background_filter.cancel()
             self.filtered_fonts = self.font_names.copy()
-            return
+            return False
 
-        try:
-            # Utiliser FontSearch pour le filtrage
-            compatible_fonts = find_fonts(text=text)
-            self.filtered_fonts = [font.name for font in compatible_fonts if font.name in self.font_names]
-        except Exception as e:
-            print(f"Erreur FontSearch: {e}")
-            self.filtered_fonts = self.font_names.copy()
-
-    def _total_pages(self):
-        """Retourne le nombre total de pages."""
-        return max(1, (len(self.filtered_fonts) + self.ITEMS_PER_PAGE - 1) // self.ITEMS_PER_PAGE)
+        # Utiliser FontSearch pour le filtrage (affinage incrémental, dans un thread)
+        self._background_filter.submit(text)
+        return True
 
-    def _go_first(self):
-        """Va à la première page."""
-        self.current_page = 0
+    def _on_filter_result(self, text: str, compatible_fonts: List[FontInfo]):
+        """Reçoit le résultat du filtre dans le thread Tk."""
+        self.filtered_fonts = [font.name for font in compatible_fonts if font.name in self.font_names]
         self._refresh_list()
 
-    def _go_prev(self):
-        """Va à la page précédente."""
-        if self.current_page > 0:
-            self.current_page -= 1
-            self._refresh_list()
-
-    def _go_next(self):
-        """Va à la page suivante."""
-        if self.current_page < self._total_pages() - 1:
-            self.current_page += 1
-            self._refresh_list()
-
-    def _go_last(self):
-        """Va à la dernière page."""
-        self.current_page = self._total_pages() - 1
-        self._refresh_list()
+    def _on_filter_progress(self, checked: int, total: int):
+        """Affiche l'avancement de l'analyse des polices."""
+        if checked < total:
+            self.info_label.config(text=f"FontSearch: analyse des polices... {checked} / {total}")
 
-    def _refresh_list(self):
-        """Rafraîchit la liste des polices affichées."""
-        # Supprimer les anciens widgets et vider le cache d'images
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        self._images.clear()
+    def _on_filter_error(self, text: str, error: Exception):
+        """Affiche toutes les polices si le filtrage échoue."""
+        print(f"Erreur FontSearch: {error}")
+        self.filtered_fonts = self.font_names.copy()
+        self._refresh_list()
 
-        text = self.sample_text.get() or self.DEFAULT_TEXT
+    def _refresh_info(self):
+        """Met à jour le label d'information."""
         total = len(self.font_names)
         shown = len(self.filtered_fonts)
-        total_pages = self._total_pages()
-
-        # Info label
-        if self.filter_glyphs.get():
+        if self.filter_glyphs.get() and self._background_filter.busy:
+            info_text = f"FontSearch: filtrage en cours... ({shown} / {total} polices affichées)"
+        elif self.filter_glyphs.get():
             info_text = f"FontSearch: {shown} / {total} polices compatibles avec le texte"
         else:
             info_text = f"FontSearch: {total} polices trouvées"
         self.info_label.config(text=info_text)
 
-        # Pagination label
-        self.page_label.config(text=f"Page {self.current_page + 1} / {total_pages}")
-
-        # Activer/désactiver les boutons
-        self.btn_first.config(state="normal" if self.current_page > 0 else "disabled")
-        self.btn_prev.config(state="normal" if self.current_page > 0 else "disabled")
-        self.btn_next.config(state="normal" if self.current_page < total_pages - 1 else "disabled")
-        self.btn_last.config(state="normal" if self.current_page < total_pages - 1 else "disabled")
-
-        # Calculer les indices pour la page courante
-        start_idx = self.current_page * self.ITEMS_PER_PAGE
-        end_idx = start_idx + self.ITEMS_PER_PAGE
-        page_fonts = self.filtered_fonts[start_idx:end_idx]
-
-        # Créer les entrées pour la page courante
-        for i, font_name in enumerate(page_fonts):
-            self._create_font_row(font_name, text, start_idx + i)
-
-        # Remettre le scroll en haut
-        self.canvas.yview_moveto(0)
+    def _refresh_list(self, keep_position: bool = False):
+        """Rafraîchit la liste des polices affichées."""
+        self._refresh_info()
+        # Seules les lignes visibles sont (re)construites
+        self.font_list.set_count(len(self.filtered_fonts), keep_position=keep_position)
 
-    def _render_with_pil(self, font_path: Path, text: str, size: int = 32):
-        """Rend le texte avec PIL."""
+    def _preview_features(self) -> List[str]:
+        """Features OpenType des aperçus, selon les options de ligatures."""
+        features = []
+        
+        if self.contextual_ligatures.get():
+            features.extend(['calt', 'clig', 'liga'])
+        else:
+            features.extend(['-liga', '-clig', '-calt'])
+        
+        if self.historical_ligatures.get():
+            features.extend(['hlig', 'dlig'])
+        else:
+            features.extend(['-hlig', '-dlig'])
+        return features
+
+    def _preview_job(self, font_path: Path, text: str, size: int = 32) -> Tuple[Optional[PreviewKey], Callable]:
+        """Clé de cache et fonction de rendu (exécutée dans un thread) d'un aperçu."""
+        features = self._preview_features()
+        key = preview_key(font_path, text, size, features, style="gui")
+        return key, lambda: self._render_image(font_path, text, size, features)
+
+    def _request_preview(self, row_frame, font_path: Path, text: str, on_done: Callable):
+        """
+        Demande le rendu d'un aperçu PIL dans un thread, via le cache d'aperçus
+        partagé : on_done(image PIL ou None) est appelé dans le thread Tk,
+        immédiatement si l'aperçu est en cache.
+        """
+        key, render = self._preview_job(font_path, text)
+        self._preview_renderer.request(row_frame, key, render, on_done)
+
+    def _prefetch_rows(self, indices: List[int]):
+        """Pré-rend dans le cache les aperçus des lignes voisines de l'écran."""
         if not PIL_AVAILABLE:
-            return None
-
-        try:
-            # Vérifier si c'est Gilbert Color
-            is_gilbert_font = 'gilbert' in font_path.name.lower()
-            
-            if is_gilbert_font:
-                return None  # Utiliser le fallback avec message
+            return
+        sample_text = self.sample_text.get() or self.DEFAULT_TEXT
+        jobs = []
+        for index in indices:
+            font_path = self.font_files.get(self.filtered_fonts[index])
+            if font_path:
+                jobs.append(self._preview_job(font_path, sample_text))
+        self._preview_renderer.prefetch(jobs)
+
+    def _render_image(self, font_path: Path, text: str, size: int, features: List[str]):
+        """Rend le texte dans une image PIL, ou None si l'aperçu est vide."""
+        return render_preview(font_path, text, size, features)
+
+    def _create_row(self, parent):
+        """Crée une ligne vide, réutilisée pour plusieurs polices au fil du défilement."""
+        row_frame = tk.Frame(parent, padx=10, pady=8)
+        row_frame.photo = None  # Référence à l'image pour éviter le garbage collection
 
-            # Charger la police standard avec PIL
-            pil_font = ImageFont.truetype(str(font_path), size)
+        # Nom de la police
+        row_frame.name_label = tk.Label(
+            row_frame,
+            font=("Segoe UI", 10),
+            fg="#666666",
+            anchor="w",
+            width=30
+        )
+        row_frame.name_label.pack(side=tk.LEFT)
 
-            # Calculer la taille nécessaire
-            bbox = pil_font.getbbox(text)
-            if bbox is None:
-                return None
+        # Aperçu : image PIL ou texte dans la police système
+        row_frame.preview_label = tk.Label(row_frame, anchor="w")
+        row_frame.preview_label.pack(side=tk.LEFT, padx=(20, 0))
 
-            width = bbox[2] - bbox[0] + 20
-            height = bbox[3] - bbox[1] + 10
+        # Indicateur de fallback (affiché à la demande)
+        row_frame.hint_label = tk.Label(row_frame, font=("Segoe UI", 8), fg="#999999", anchor="w")
 
-            # Créer l'image avec fond blanc
-            img = Image.new("RGBA", (width, height), (255, 255, 255, 255))
-            draw = ImageDraw.Draw(img)
+        # Add click handlers and make the row look clickable
+        for widget in (row_frame, row_frame.name_label, row_frame.preview_label):
+            widget.bind("<Button-1>", lambda e: self._on_row_click(row_frame))
+        row_frame.name_label.bind("<Enter>", lambda e: row_frame.name_label.configure(fg="blue", cursor="hand2"))
+        row_frame.name_label.bind("<Leave>", lambda e: row_frame.name_label.configure(fg="#666666", cursor=""))
+        row_frame.preview_label.bind("<Enter>", lambda e: row_frame.preview_label.configure(cursor="hand2"))
+        row_frame.preview_label.bind("<Leave>", lambda e: row_frame.preview_label.configure(cursor=""))
 
-            # Préparer les features OpenType pour les ligatures
-            features = []
-            
-            if self.contextual_ligatures.get():
-                features.extend(['calt', 'clig', 'liga'])
-            else:
-                features.extend(['-liga', '-clig', '-calt'])
-            
-            if self.historical_ligatures.get():
-                features.extend(['hlig', 'dlig'])
-            else:
-                features.extend(['-hlig', '-dlig'])
-
-            # Dessiner le texte
-            try:
-                draw.text(
-                    (-bbox[0] + 10, -bbox[1] + 5), 
-                    text, 
-                    font=pil_font, 
-                    fill=(0, 0, 0, 255),
-                    embedded_color=True,
-                    features=features if features else None
-                )
-            except TypeError:
-                draw.text(
-                    (-bbox[0] + 10, -bbox[1] + 5), 
-                    text, 
-                    font=pil_font, 
-                    fill=(0, 0, 0, 255),
-                    embedded_color=True
-                )
+        return row_frame
 
-            # Vérifier si l'image est vide
-            pixels = list(img.getdata())
-            if all(p[0] >= 250 and p[1] >= 250 and p[2] >= 250 for p in pixels):
-                return None
+    def _update_row(self, row_frame, index: int):
+        """Remplit une ligne avec la police d'indice index."""
+        font_name = self.filtered_fonts[index]
+        sample_text = self.sample_text.get() or self.DEFAULT_TEXT
+        bg_color = "#ffffff" if index % 2 == 0 else "#f8f8f8"
 
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            return None
+        row_frame.configure(bg=bg_color)
+        row_frame.name_label.configure(text=font_name, bg=bg_color)
+        row_frame.hint_label.configure(bg=bg_color)
+        row_frame.hint_label.pack_forget()
+        row_frame.photo = None
 
-    def _create_font_row(self, font_name: str, sample_text: str, index: int):
-        """Crée une ligne pour afficher une police."""
-        bg_color = "#ffffff" if index % 2 == 0 else "#f8f8f8"
+        # Aperçu avec la police, rendu en arrière-plan
+        font_path = self.font_files.get(font_name)
+        if PIL_AVAILABLE and font_path:
+            # Emplacement réservé jusqu'à l'arrivée de l'image
+            row_frame.preview_label.configure(image="", text="…", font=("Segoe UI", 10),
+                                              bg=bg_color, fg="#cccccc")
+            self._request_preview(
+                row_frame, font_path, sample_text,
+                lambda img: self._show_preview(row_frame, font_name, sample_text, img))
+            return
 
-        row_frame = tk.Frame(self.scrollable_frame, bg=bg_color, padx=10, pady=8)
-        row_frame.pack(fill=tk.X, padx=2, pady=1)
-        
-        # Add click handler to row frame
-        row_frame.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
+        self._show_system_preview(row_frame, font_name, sample_text)
 
-        # Nom de la police
-        name_label = tk.Label(
-            row_frame,
-            text=font_name,
-            font=("Segoe UI", 10),
-            bg=bg_color,
-            fg="#666666",
-            anchor="w",
-            width=30
-        )
-        name_label.pack(side=tk.LEFT)
-        
-        # Add click handler to name label and make it look clickable
-        name_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-        name_label.bind("<Enter>", lambda e: name_label.configure(fg="blue", cursor="hand2"))
-        name_label.bind("<Leave>", lambda e: name_label.configure(fg="#666666", cursor=""))
+    def _show_preview(self, row_frame, font_name: str, sample_text: str, img):
+        """Affiche l'aperçu rendu, ou l'aperçu système si le rendu a échoué."""
+        if img is not None:
+            row_frame.photo = ImageTk.PhotoImage(img)
+            row_frame.preview_label.configure(image=row_frame.photo, text="")
+        else:
+            self._show_system_preview(row_frame, font_name, sample_text)
 
-        # Aperçu avec la police
+    def _show_system_preview(self, row_frame, font_name: str, sample_text: str):
+        """Aperçu avec une police tkinter, quand PIL n'a pas fonctionné."""
+        bg_color = row_frame.cget("bg")
+        preview_label = row_frame.preview_label
         font_path = self.font_files.get(font_name)
-        preview_created = False
-
-        if PIL_AVAILABLE and font_path:
-            photo = self._render_with_pil(font_path, sample_text)
-            if photo:
-                self._images.append(photo)
-                preview_label = tk.Label(row_frame, image=photo, bg=bg_color, anchor="w")
-                preview_label.pack(side=tk.LEFT, padx=(20, 0))
-                preview_created = True
-                
-                # Add click handler to preview image
-                preview_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                preview_label.bind("<Enter>", lambda e: preview_label.configure(cursor="hand2"))
-                preview_label.bind("<Leave>", lambda e: preview_label.configure(cursor=""))
-
-        # Fallback sur tkinter si PIL n'a pas fonctionné
-        if not preview_created:
-            try:
-                # Vérifier si c'est Gilbert Color
-                is_gilbert_font = 'gilbert' in font_name.lower()
-                
-                if is_gilbert_font:
-                    error_label = tk.Label(
-                        row_frame,
-                        text="(Police SVG complexe - rendu limité)",
-                        font=("Segoe UI", 9, "italic"),
-                        bg=bg_color,
-                        fg="#ff8800"
-                    )
-                    error_label.pack(side=tk.LEFT, padx=(20, 0))
-                    
-                    # Add click handler to error label
-                    error_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                    error_label.bind("<Enter>", lambda e: error_label.configure(cursor="hand2"))
-                    error_label.bind("<Leave>", lambda e: error_label.configure(cursor=""))
-                    return
-
-                # Créer la police tkinter
-                preview_font = tkfont.Font(family=font_name, size=18)
-                
-                display_text = sample_text
-                
-                if self.contextual_ligatures.get():
-                    if sample_text == self.DEFAULT_TEXT:
-                        display_text = "fi fl ff ffi ffl " + sample_text
-                
-                if self.historical_ligatures.get():
-                    if sample_text == self.DEFAULT_TEXT:
-                        display_text = "st ct sp " + display_text
-                
-                preview_label = tk.Label(
-                    row_frame,
-                    text=display_text,
-                    font=preview_font,
-                    bg=bg_color,
-                    anchor="w"
-                )
-                preview_label.pack(side=tk.LEFT, padx=(20, 0))
-                
-                # Add click handler to preview label
-                preview_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                preview_label.bind("<Enter>", lambda e: preview_label.configure(cursor="hand2", bg="#f0f0f0"))
-                preview_label.bind("<Leave>", lambda e: preview_label.configure(cursor="", bg=bg_color))
-
-                # Indicateur de fallback
-                if PIL_AVAILABLE and font_path:
-                    hint_text = "(aperçu système"
-                    if self.contextual_ligatures.get() or self.historical_ligatures.get():
-                        hint_text += ", ligatures limitées"
-                    hint_text += ")"
-                    
-                    hint_label = tk.Label(
-                        row_frame,
-                        text=hint_text,
-                        font=("Segoe UI", 8),
-                        bg=bg_color,
-                        fg="#999999",
-                        anchor="w"
-                    )
-                    hint_label.pack(side=tk.LEFT, padx=(10, 0))
-            except Exception:
-                error_label = tk.Label(
-                    row_frame,
-                    text="(Police compatible mais aperçu indisponible)",
+        try:
+            # Vérifier si c'est Gilbert Color
+            if 'gilbert' in font_name.lower():
+                preview_label.configure(
+                    image="",
+                    text="(Police SVG complexe - rendu limité)",
                     font=("Segoe UI", 9, "italic"),
                     bg=bg_color,
                     fg="#ff8800"
                 )
-                error_label.pack(side=tk.LEFT, padx=(20, 0))
-                
-                # Add click handler to error label
-                error_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                error_label.bind("<Enter>", lambda e: error_label.configure(cursor="hand2"))
-                error_label.bind("<Leave>", lambda e: error_label.configure(cursor=""))
+                return
+
+            display_text = sample_text
 
+            if self.contextual_ligatures.get():
+                if sample_text == self.DEFAULT_TEXT:
+                    display_text = "fi fl ff ffi ffl " + sample_text
+
+            if self.historical_ligatures.get():
+                if sample_text == self.DEFAULT_TEXT:
+                    display_text = "st ct sp " + display_text
+
+            # Police tkinter
+            preview_label.configure(image="", text=display_text, font=(font_name, 18),
+                                    bg=bg_color, fg="#000000")
+
+            # Indicateur de fallback
+            if PIL_AVAILABLE and font_path:
+                hint_text = "(aperçu système"
+                if self.contextual_ligatures.get() or self.historical_ligatures.get():
+                    hint_text += ", ligatures limitées"
+                hint_text += ")"
+                row_frame.hint_label.configure(text=hint_text)
+                row_frame.hint_label.pack(side=tk.LEFT, padx=(10, 0))
+        except Exception:
+            preview_label.configure(
+                image="",
+                text="(Police compatible mais aperçu indisponible)",
+                font=("Segoe UI", 9, "italic"),
+                bg=bg_color,
+                fg="#ff8800"
+            )
+
+    def _on_row_click(self, row_frame):
+        """Sélectionne la police affichée par une ligne."""
+        index = self.font_list.index_of(row_frame)
+        if index is not None:
+            self._on_font_selected(self.filtered_fonts[index])
 
 def main():
     """Point d'entrée principal pour la GUI."""
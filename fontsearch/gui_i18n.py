@@ -21,11 +21,15 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import sys
 import tkinter as tk
-from tkinter import ttk, font as tkfont, messagebox
+from tkinter import ttk, messagebox
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Union, List, Callable, Tuple
 
 from . import find_fonts, FontType, FontInfo
+from .background import BackgroundFilter, PreviewRenderer
+from .virtual_list import VirtualList
+from .previews import PreviewKey, preview_key
+from .fontpool import get_font_pool
 from .i18n import _, set_language, get_available_languages, get_current_language, get_language_name
 
 # Forcer UTF-8 pour la sortie console Windows
@@ -39,7 +43,7 @@ if sys.platform == "win32":
 
 # Optionnel : pour le rendu correct des polices
 try:
-    from PIL import Image, ImageDraw, ImageFont, ImageTk
+    from PIL import Image, ImageDraw, ImageTk
     PIL_AVAILABLE = True
     PhotoImageType = ImageTk.PhotoImage
 except ImportError:
@@ -50,8 +54,7 @@ except ImportError:
 class FontViewerI18nApp:
     """Internationalized GUI for font viewing using FontSearch."""
 
-    ITEMS_PER_PAGE = 20
-    DEBOUNCE_MS = 2000
+    ROW_HEIGHT = 100
 
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -72,10 +75,16 @@ class FontViewerI18nApp:
         self.filtered_fonts = self.font_names.copy()
         
         # Variables d'interface
-        self.current_page = 0
-        self.total_pages = 0
         self._debounce_timer = None
-        self._image_cache = {}  # Cache pour éviter le garbage collection
+        # Filtre texte incrémental, exécuté dans un thread pour ne pas figer l'interface
+        self._background_filter = BackgroundFilter(
+            self.root,
+            on_result=self._on_filter_result,
+            on_progress=self._on_filter_progress,
+            on_error=self._on_filter_error
+        )
+        # Rendu des aperçus dans un pool de threads, livrés ligne par ligne
+        self._preview_renderer = PreviewRenderer(self.root)
         
         # Variables de contrôle
         self.sample_text = tk.StringVar(value=_("sample_text_default"))
@@ -91,9 +100,6 @@ class FontViewerI18nApp:
         
         # Force initial display after UI is fully set up
         self.root.after(100, self._refresh_list)
-        
-        # Ensure canvas is properly configured after window is shown
-        self.root.after(200, self._configure_canvas)
 
     def _update_title(self):
         """Update window title with current language."""
@@ -159,52 +165,29 @@ class FontViewerI18nApp:
         )
         historical_check.pack(side=tk.LEFT)
 
-        # Frame pour la liste des polices avec scrollbar
-        list_frame = ttk.Frame(main_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-
-        # Canvas et scrollbar pour la liste
-        self.canvas = tk.Canvas(list_frame, bg="white")
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Liste virtualisée : seules les lignes visibles ont des widgets
+        self.font_list = VirtualList(
+            main_frame,
+            row_height=self.ROW_HEIGHT,
+            create_row=self._create_row,
+            update_row=self._update_row,
+            release_row=self._preview_renderer.cancel,
+            prefetch_rows=self._prefetch_rows,
+            empty_text=_("no_fonts_message")
         )
-
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.font_list.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
 
         # Bind mouse wheel globally for better responsiveness
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))  # Linux scroll up
-        self.canvas.bind_all("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))  # Linux scroll down
-        
-        self.root.bind("<Configure>", self._on_window_resize)
-        
-        # Force canvas update
-        self.canvas.update_idletasks()
+        self.font_list.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.font_list.bind_all("<Button-4>", lambda e: self.font_list.yview_scroll(-1, "units"))  # Linux scroll up
+        self.font_list.bind_all("<Button-5>", lambda e: self.font_list.yview_scroll(1, "units"))  # Linux scroll down
 
-        # Force canvas update
-        self.canvas.update_idletasks()
-
-        # Frame de navigation
+        # Ligne d'état
         nav_frame = ttk.Frame(main_frame)
         nav_frame.pack(fill=tk.X)
 
-        # Boutons de navigation
-        ttk.Button(nav_frame, text=_("navigation_first"), command=self._first_page).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(nav_frame, text=_("navigation_previous"), command=self._prev_page).pack(side=tk.LEFT, padx=(0, 5))
-        
         self.page_label = ttk.Label(nav_frame, text="")
-        self.page_label.pack(side=tk.LEFT, padx=20)
-        
-        ttk.Button(nav_frame, text=_("navigation_next"), command=self._next_page).pack(side=tk.RIGHT, padx=(5, 0))
-        ttk.Button(nav_frame, text=_("navigation_last"), command=self._last_page).pack(side=tk.RIGHT, padx=(5, 0))
+        self.page_label.pack(side=tk.LEFT)
 
         # Tooltips
         self._create_tooltips(text_entry, glyph_check, contextual_check, historical_check, language_combo)
@@ -250,7 +233,8 @@ class FontViewerI18nApp:
                 # Update title
                 self._update_title()
                 # Refresh display if UI is ready
-                if hasattr(self, 'scrollable_frame'):
+                if hasattr(self, 'font_list'):
+                    self.font_list.set_empty_text(_("no_fonts_message"))
                     self._refresh_list()
 
     def _refresh_ui_text(self):
@@ -264,14 +248,16 @@ class FontViewerI18nApp:
         if self._debounce_timer is not None:
             self.root.after_cancel(self._debounce_timer)
         
-        self._debounce_timer = self.root.after(self.DEBOUNCE_MS, self._refresh_list)
+        # Filtrage incrémental : pas de temporisation, les frappes d'un même
+        # passage de la boucle d'événements sont regroupées
+        self._debounce_timer = self.root.after_idle(self._refresh_list)
 
     def _on_filter_change(self):
         """Appelé quand le filtre de compatibilité change."""
         if self._debounce_timer is not None:
             self.root.after_cancel(self._debounce_timer)
         
-        self._debounce_timer = self.root.after(self.DEBOUNCE_MS, self._refresh_list)
+        self._debounce_timer = self.root.after_idle(self._refresh_list)
 
     def _on_ligature_change(self):
         """Appelé quand les options de ligatures changent."""
@@ -285,103 +271,113 @@ class FontViewerI18nApp:
         sample_text = self.sample_text.get().strip()
         
         if self.filter_glyphs.get() and sample_text:
-            # Utiliser FontSearch pour filtrer par texte
-            compatible_fonts = find_fonts(text=sample_text)
-            self.filtered_fonts = [font.name for font in compatible_fonts if font.name in self.font_names]
-        else:
-            self.filtered_fonts = self.font_names.copy()
-        
-        # Calculer la pagination
-        self.total_pages = max(1, (len(self.filtered_fonts) + self.ITEMS_PER_PAGE - 1) // self.ITEMS_PER_PAGE)
-        self.current_page = min(self.current_page, self.total_pages - 1)
+            # Utiliser FontSearch pour filtrer par texte (affinage incrémental, dans
+            # un thread) : la liste est rafraîchie par _on_filter_result
+            self._background_filter.submit(sample_text)
+            return
         
-        self._refresh_display()
+        self._background_filter.cancel()
+        self._show_filtered_fonts(self.font_names.copy())
+    
+    def _on_filter_result(self, text: str, compatible_fonts: List[FontInfo]):
+        """Reçoit le résultat du filtre dans le thread Tk."""
+        self._show_filtered_fonts([font.name for font in compatible_fonts if font.name in self.font_names])
+    
+    def _on_filter_progress(self, checked: int, total: int):
+        """Affiche l'avancement de l'analyse des polices."""
+        if checked < total and hasattr(self, 'page_label'):
+            self.page_label.config(text=_("filter_progress", checked=checked, total=total))
+    
+    def _on_filter_error(self, text: str, error: Exception):
+        """Affiche toutes les polices si le filtrage échoue."""
+        print(f"Erreur FontSearch: {error}")
+        self._show_filtered_fonts(self.font_names.copy())
+    
+    def _show_filtered_fonts(self, font_names: List[str]):
+        """Affiche une nouvelle liste filtrée."""
+        # Même liste (texte modifié sans filtre) : garder la position de défilement
+        keep_position = font_names == self.filtered_fonts
+        self.filtered_fonts = font_names
+        self.font_list.set_count(len(self.filtered_fonts), keep_position=keep_position)
+        self._refresh_status()
 
     def _refresh_display(self):
-        """Rafraîchit l'affichage de la page courante."""
-        # Nettoyer le frame
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        self._image_cache.clear()
-        
-        if not self.filtered_fonts:
-            ttk.Label(self.scrollable_frame, text=_("no_fonts_message"), 
-                     font=("Segoe UI", 12)).pack(pady=20)
+        """Redessine les lignes visibles (options d'aperçu modifiées)."""
+        self._debounce_timer = None
+        self.font_list.refresh()
+
+    def _refresh_status(self):
+        """Met à jour la ligne d'état."""
+        if self.filtered_fonts:
+            self.page_label.config(text=_("fonts_found").format(count=len(self.filtered_fonts)))
+        else:
             self.page_label.config(text="")
-            return
-        
-        # Calculer les indices pour la page courante
-        start_idx = self.current_page * self.ITEMS_PER_PAGE
-        end_idx = min(start_idx + self.ITEMS_PER_PAGE, len(self.filtered_fonts))
-        
-        # Afficher les polices de la page courante
-        sample_text = self.sample_text.get() or _("sample_text_default")
+
+    def _create_row(self, parent):
+        """Crée une ligne vide, réutilisée pour plusieurs polices au fil du défilement."""
+        font_frame = tk.Frame(parent, bg="white", padx=5, pady=2)
+        font_frame.photo = None  # Référence à l'image pour éviter le garbage collection
         
-        for i, font_name in enumerate(self.filtered_fonts[start_idx:end_idx]):
-            self._create_font_row(font_name, sample_text, i)
+        # Nom de la police
+        font_frame.name_label = tk.Label(font_frame, font=("Segoe UI", 10, "bold"), bg="white", anchor=tk.W)
+        font_frame.name_label.pack(anchor=tk.W)
         
-        # Mettre à jour le label de pagination
-        if len(self.filtered_fonts) > self.ITEMS_PER_PAGE:
-            page_text = _("page_info").format(current=self.current_page + 1, total=self.total_pages)
-        else:
-            page_text = _("fonts_found").format(count=len(self.filtered_fonts))
+        # Aperçu : image PIL ou texte dans la police système
+        font_frame.preview_label = tk.Label(font_frame, bg="white", anchor=tk.W, justify=tk.LEFT)
+        font_frame.preview_label.pack(fill=tk.X, pady=(2, 0))
         
-        self.page_label.config(text=page_text)
+        # Indication d'aperçu système (affichée à la demande)
+        font_frame.hint_label = tk.Label(font_frame, font=("Segoe UI", 8), fg="gray", bg="white", anchor=tk.W)
         
-        # Remettre le scroll en haut
-        self.canvas.yview_moveto(0)
+        # Add click handlers and make the row look clickable
+        for widget in (font_frame, font_frame.name_label, font_frame.preview_label):
+            widget.bind("<Button-1>", lambda e: self._on_row_click(font_frame))
+        font_frame.name_label.bind("<Enter>", lambda e: font_frame.name_label.configure(foreground="blue", cursor="hand2"))
+        font_frame.name_label.bind("<Leave>", lambda e: font_frame.name_label.configure(foreground="black", cursor=""))
+        font_frame.preview_label.bind("<Enter>", lambda e: font_frame.preview_label.configure(cursor="hand2"))
+        font_frame.preview_label.bind("<Leave>", lambda e: font_frame.preview_label.configure(cursor=""))
         
-        # Force canvas update
-        self.canvas.update_idletasks()
-        self.root.update_idletasks()
+        return font_frame
 
-    def _create_font_row(self, font_name: str, sample_text: str, row_index: int):
-        """Crée une ligne pour une police."""
+    def _update_row(self, font_frame, index: int):
+        """Remplit une ligne avec la police d'indice index."""
+        font_name = self.filtered_fonts[index]
         font_path = self.font_files.get(font_name)
+        sample_text = self.sample_text.get() or _("sample_text_default")
         
-        # Frame pour cette police
-        font_frame = ttk.Frame(self.scrollable_frame)
-        font_frame.pack(fill=tk.X, padx=5, pady=2)
-        
-        # Add click handler to frame
-        font_frame.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-        
-        # Nom de la police
-        name_label = ttk.Label(font_frame, text=font_name, font=("Segoe UI", 10, "bold"))
-        name_label.pack(anchor=tk.W)
-        
-        # Add click handler to name label and make it look clickable
-        name_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-        name_label.bind("<Enter>", lambda e: name_label.configure(foreground="blue", cursor="hand2"))
-        name_label.bind("<Leave>", lambda e: name_label.configure(foreground="black", cursor=""))
+        font_frame.name_label.configure(text=font_name)
+        font_frame.hint_label.pack_forget()
+        font_frame.photo = None
         
-        # Aperçu avec PIL si disponible
+        # Aperçu avec PIL si disponible, rendu en arrière-plan
         if PIL_AVAILABLE and font_path:
-            try:
-                preview_image = self._render_with_pil(font_path, sample_text)
-                if preview_image:
-                    self._image_cache[f"{font_name}_{row_index}"] = preview_image
-                    
-                    preview_label = ttk.Label(font_frame, image=preview_image)
-                    preview_label.pack(anchor=tk.W, pady=(2, 0))
-                    
-                    # Add click handler to preview image
-                    preview_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                    preview_label.bind("<Enter>", lambda e: preview_label.configure(cursor="hand2"))
-                    preview_label.bind("<Leave>", lambda e: preview_label.configure(cursor=""))
-                else:
-                    # Fallback vers aperçu système
-                    self._create_system_preview(font_frame, font_name, sample_text)
-            except Exception:
-                # Fallback vers aperçu système
-                self._create_system_preview(font_frame, font_name, sample_text)
+            # Emplacement réservé jusqu'à l'arrivée de l'image
+            font_frame.preview_label.configure(image="", text="…", font=("Segoe UI", 10), foreground="#cccccc")
+            self._request_preview(
+                font_frame, font_path, sample_text,
+                lambda img: self._show_preview(font_frame, font_name, sample_text, img))
+            return
+        
+        # Fallback vers aperçu système
+        self._show_system_preview(font_frame, font_name, sample_text)
+
+    def _show_preview(self, font_frame, font_name: str, sample_text: str, img):
+        """Affiche l'aperçu rendu, ou l'aperçu système si le rendu a échoué."""
+        if img is not None:
+            font_frame.photo = ImageTk.PhotoImage(img)
+            font_frame.preview_label.configure(image=font_frame.photo, text="")
         else:
-            # Aperçu système
-            self._create_system_preview(font_frame, font_name, sample_text)
+            self._show_system_preview(font_frame, font_name, sample_text)
+
+    def _on_row_click(self, font_frame):
+        """Sélectionne la police affichée par une ligne."""
+        index = self.font_list.index_of(font_frame)
+        if index is not None:
+            self._on_font_selected(self.filtered_fonts[index])
 
-    def _create_system_preview(self, parent_frame, font_name: str, sample_text: str):
-        """Crée un aperçu système pour une police."""
+    def _show_system_preview(self, font_frame, font_name: str, sample_text: str):
+        """Affiche un aperçu système pour une police."""
+        preview_label = font_frame.preview_label
         try:
             # Modifier le texte d'affichage selon les ligatures
             display_text = sample_text
@@ -394,143 +390,128 @@ class FontViewerI18nApp:
                 if sample_text == _("sample_text_default"):
                     display_text = _("ligature_test_historical") + " " + display_text
             
-            # Créer le label avec la police système
+            # Label avec la police système
             try:
-                system_font = tkfont.Font(family=font_name, size=14)
-                preview_label = tk.Label(parent_frame, text=display_text, font=system_font, 
-                                       bg="white", anchor=tk.W, justify=tk.LEFT)
-                preview_label.pack(fill=tk.X, pady=(2, 0))
-                
-                # Add click handler to preview label and make it look clickable
-                preview_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                preview_label.bind("<Enter>", lambda e: preview_label.configure(cursor="hand2", bg="#f0f0f0"))
-                preview_label.bind("<Leave>", lambda e: preview_label.configure(cursor="", bg="white"))
+                preview_label.configure(image="", text=display_text, font=(font_name, 14), foreground="black")
                 
                 # Ajouter une indication
-                if PIL_AVAILABLE and hasattr(self, 'font_files') and font_name in self.font_files:
-                    hint_text = _("font_preview_hint") if hasattr(self, '_') else "System preview"
+                if PIL_AVAILABLE and font_name in self.font_files:
+                    hint_text = _("font_preview_hint")
                     if self.contextual_ligatures.get() or self.historical_ligatures.get():
-                        hint_text += _("ligatures_limited") if hasattr(self, '_') else " (ligatures limited)"
-                    hint_text += _("preview_hint_end") if hasattr(self, '_') else ""
+                        hint_text += _("ligatures_limited")
+                    hint_text += _("preview_hint_end")
                     
-                    hint_label = ttk.Label(parent_frame, text=hint_text, 
-                                         font=("Segoe UI", 8), foreground="gray")
-                    hint_label.pack(anchor=tk.W)
+                    font_frame.hint_label.configure(text=hint_text)
+                    font_frame.hint_label.pack(anchor=tk.W)
                 
             except tk.TclError:
                 # Police non disponible pour tkinter
-                fallback_label = ttk.Label(parent_frame, text=f"{display_text} (système)", 
-                                         font=("Segoe UI", 12))
-                fallback_label.pack(anchor=tk.W, pady=(2, 0))
-                
-                # Add click handler to fallback label
-                fallback_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-                fallback_label.bind("<Enter>", lambda e: fallback_label.configure(cursor="hand2"))
-                fallback_label.bind("<Leave>", lambda e: fallback_label.configure(cursor=""))
+                preview_label.configure(image="", text=f"{display_text} (système)",
+                                        font=("Segoe UI", 12), foreground="black")
                 
         except Exception:
             # Fallback ultime
-            error_text = _("error_font_load").format(error="Preview error") if hasattr(self, '_') else "Preview error"
-            error_label = ttk.Label(parent_frame, text=error_text, foreground="red")
-            error_label.pack(anchor=tk.W, pady=(2, 0))
-            
-            # Add click handler to error label
-            error_label.bind("<Button-1>", lambda e: self._on_font_selected(font_name))
-            error_label.bind("<Enter>", lambda e: error_label.configure(cursor="hand2"))
-            error_label.bind("<Leave>", lambda e: error_label.configure(cursor=""))
+            error_text = _("error_font_load").format(error="Preview error")
+            preview_label.configure(image="", text=error_text, font=("Segoe UI", 10), foreground="red")
 
-    def _render_with_pil(self, font_path: Path, text: str, size: int = 32):
-        """Rend le texte avec PIL."""
-        if not PIL_AVAILABLE:
-            return None
+    def _preview_features(self) -> List[str]:
+        """Features OpenType des aperçus, selon les options de ligatures."""
+        features = []
         
+        if self.contextual_ligatures.get():
+            features.extend(['calt', 'clig', 'liga'])
+        else:
+            features.extend(['-liga', '-clig', '-calt'])
+        
+        if self.historical_ligatures.get():
+            features.extend(['hlig', 'dlig'])
+        else:
+            features.extend(['-hlig', '-dlig'])
+        return features
+
+    def _preview_job(self, font_path: Path, text: str, size: int = 32) -> Tuple[Optional[PreviewKey], Callable]:
+        """Clé de cache et fonction de rendu (exécutée dans un thread) d'un aperçu."""
+        features = self._preview_features()
+        key = preview_key(font_path, text, size, features, style="i18n")
+        return key, lambda: self._render_image(font_path, text, size, features)
+
+    def _request_preview(self, font_frame, font_path: Path, text: str, on_done: Callable):
+        """
+        Demande le rendu d'un aperçu PIL dans un thread, via le cache d'aperçus
+        partagé : on_done(image PIL ou None) est appelé dans le thread Tk,
+        immédiatement si l'aperçu est en cache.
+        """
+        key, render = self._preview_job(font_path, text)
+        self._preview_renderer.request(font_frame, key, render, on_done)
+
+    def _prefetch_rows(self, indices: List[int]):
+        """Pré-rend dans le cache les aperçus des lignes voisines de l'écran."""
+        if not PIL_AVAILABLE:
+            return
+        sample_text = self.sample_text.get() or _("sample_text_default")
+        jobs = []
+        for index in indices:
+            font_path = self.font_files.get(self.filtered_fonts[index])
+            if font_path:
+                jobs.append(self._preview_job(font_path, sample_text))
+        self._preview_renderer.prefetch(jobs)
+
+    def _render_image(self, font_path: Path, text: str, size: int, features: List[str]):
+        """Rend le texte dans une image PIL, ou None en cas d'échec."""
         try:
             # Créer une image temporaire pour mesurer
             temp_img = Image.new('RGB', (1, 1), 'white')
             temp_draw = ImageDraw.Draw(temp_img)
             
-            # Charger la police
-            try:
-                pil_font = ImageFont.truetype(str(font_path), size)
-            except (OSError, IOError):
-                return None
-            
-            # Features OpenType pour ligatures
-            features = []
-            
-            if self.contextual_ligatures.get():
-                features.extend(['calt', 'clig', 'liga'])
-            else:
-                features.extend(['-liga', '-clig', '-calt'])
-            
-            if self.historical_ligatures.get():
-                features.extend(['hlig', 'dlig'])
-            else:
-                features.extend(['-hlig', '-dlig'])
-            
-            # Mesurer le texte avec les features
-            try:
-                if hasattr(pil_font, 'getmask') and features:
-                    # Pillow 8.0+ avec support des features OpenType
-                    bbox = temp_draw.textbbox((0, 0), text, font=pil_font, features=features)
-                else:
-                    # Fallback sans features
-                    bbox = temp_draw.textbbox((0, 0), text, font=pil_font)
-                
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                
-            except Exception:
-                # Fallback avec textsize si textbbox échoue
+            # Charger la police, réservée à ce thread pendant le rendu
+            with get_font_pool().use(font_path, size) as pil_font:
+                # Mesurer le texte avec les features
                 try:
-                    text_width, text_height = temp_draw.textsize(text, font=pil_font)
-                except:
+                    if hasattr(pil_font, 'getmask') and features:
+                        # Pillow 8.0+ avec support des features OpenType
+                        bbox = temp_draw.textbbox((0, 0), text, font=pil_font, features=features)
+                    else:
+                        # Fallback sans features
+                        bbox = temp_draw.textbbox((0, 0), text, font=pil_font)
+
+                    text_width = bbox[2] - bbox[0]
+                    text_height = bbox[3] - bbox[1]
+
+                except Exception:
+                    # Fallback avec textsize si textbbox échoue
+                    try:
+                        text_width, text_height = temp_draw.textsize(text, font=pil_font)
+                    except:
+                        return None
+
+                # Créer l'image finale avec marge
+                margin = 10
+                img_width = max(text_width + 2 * margin, 200)
+                img_height = max(text_height + 2 * margin, 40)
+
+                img = Image.new('RGB', (img_width, img_height), 'white')
+                draw = ImageDraw.Draw(img)
+
+                # Dessiner le texte avec les features
+                try:
+                    if hasattr(pil_font, 'getmask') and features:
+                        draw.text((margin, margin), text, font=pil_font, fill='black', features=features)
+                    else:
+                        draw.text((margin, margin), text, font=pil_font, fill='black')
+                except Exception:
                     return None
-            
-            # Créer l'image finale avec marge
-            margin = 10
-            img_width = max(text_width + 2 * margin, 200)
-            img_height = max(text_height + 2 * margin, 40)
-            
-            img = Image.new('RGB', (img_width, img_height), 'white')
-            draw = ImageDraw.Draw(img)
-            
-            # Dessiner le texte avec les features
-            try:
-                if hasattr(pil_font, 'getmask') and features:
-                    draw.text((margin, margin), text, font=pil_font, fill='black', features=features)
-                else:
-                    draw.text((margin, margin), text, font=pil_font, fill='black')
-            except Exception:
-                return None
-            
-            # Redimensionner si trop grand
-            max_width = 600
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-            
-            return ImageTk.PhotoImage(img)
-            
-        except Exception:
-            return None
 
-    def _configure_canvas(self):
-        """Configure canvas after window is fully displayed."""
-        try:
-            # Update canvas scroll region
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            
-            # Set canvas window width
-            canvas_width = self.canvas.winfo_width()
-            if canvas_width > 1:
-                self.canvas.itemconfig(self.canvas_window, width=canvas_width)
-            
-            # Force update
-            self.canvas.update_idletasks()
+                # Redimensionner si trop grand
+                max_width = 600
+                if img.width > max_width:
+                    ratio = max_width / img.width
+                    new_height = int(img.height * ratio)
+                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+
+                return img
+
         except Exception:
-            pass  # Ignore errors during configuration
+            return None
 
     def _on_font_selected(self, font_name: str):
         """Handle font selection and exit gracefully."""
@@ -550,44 +531,12 @@ class FontViewerI18nApp:
 
     def _on_mousewheel(self, event):
         """Gère le scroll avec la molette."""
-        # Check if we have a scrollable canvas
-        if not hasattr(self, 'canvas'):
+        # Check if we have a font list
+        if not hasattr(self, 'font_list'):
             return
         
         # Use the same logic as the basic GUI for consistency
-        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
-    def _on_window_resize(self, event):
-        """Gère le redimensionnement de la fenêtre."""
-        if event.widget == self.root:
-            # Update canvas window width
-            canvas_width = self.canvas.winfo_width()
-            if canvas_width > 1:  # Ensure canvas is properly sized
-                self.canvas.itemconfig(self.canvas_window, width=canvas_width)
-                # Force update
-                self.canvas.update_idletasks()
-
-    def _first_page(self):
-        """Va à la première page."""
-        self.current_page = 0
-        self._refresh_display()
-
-    def _prev_page(self):
-        """Va à la page précédente."""
-        if self.current_page > 0:
-            self.current_page -= 1
-            self._refresh_display()
-
-    def _next_page(self):
-        """Va à la page suivante."""
-        if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            self._refresh_display()
-
-    def _last_page(self):
-        """Va à la dernière page."""
-        self.current_page = self.total_pages - 1
-        self._refresh_display()
+        self.font_list.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
 
 def main():
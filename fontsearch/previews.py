@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+FontSearch - In-memory cache of rendered font previews.
+
+Rendering a preview (loading the font, shaping and rasterizing the text)
+dominates the cost of displaying a font list. Rendered images are kept in
+an LRU cache bounded by the memory their pixels use, keyed by the font file
+(path and modification time), the text, the size, the OpenType features and
+the rendering style of the caller. The cache holds PIL images, not Tk
+PhotoImages, so it is shared by all the GUIs and usable from any thread.
+The shared cache is backed by the on-disk thumbnail store, so previews
+rendered in a previous session are loaded instead of rendered again.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Tuple, Union
+
+from .thumbnails import ThumbnailStore, get_thumbnail_store
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Coût forfaitaire d'une entrée (clé, objets Python), y compris sans image
+ENTRY_OVERHEAD = 256
+
+
+class PreviewKey(NamedTuple):
+    """Identity of a rendered preview."""
+    path: str
+    mtime_ns: int
+    text: str
+    size: int
+    features: Tuple[str, ...]
+    style: str
+
+
+class PreviewCacheInfo(NamedTuple):
+    """Statistics of a PreviewCache."""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+def preview_key(font_path: Union[str, Path], text: str, size: int,
+                features: Iterable[str] = (), style: str = "") -> Optional[PreviewKey]:
+    """
+    Build the cache key of a preview, or None if the font file cannot be
+    read. The modification time makes a key stale as soon as the font file
+    is replaced.
+
+    Args:
+        font_path: Path to the font file.
+        text: Rendered text.
+        size: Font size in pixels.
+        features: OpenType features passed to the renderer.
+        style: Name of the rendering style (margins, colors...) of the caller,
+               so that differently drawn previews do not collide.
+    """
+    try:
+        mtime_ns = os.stat(font_path).st_mtime_ns
+    except OSError:
+        return None
+    return PreviewKey(str(font_path), mtime_ns, text, size, tuple(features), style)
+
+
+def image_bytes(image: Any) -> int:
+    """Approximate memory used by a PIL image (or None)."""
+    if image is None:
+        return ENTRY_OVERHEAD
+    width, height = image.size
+    return width * height * len(image.getbands()) + ENTRY_OVERHEAD
+
+
+class PreviewCache:
+    """
+    Thread-safe LRU cache of rendered previews, bounded in bytes.
+
+    A value of None is a valid entry: it records that a font cannot render
+    the text, so the caller goes straight to its fallback next time.
+
+    Args:
+        max_bytes: Maximum memory used by the cached images.
+        store: Optional on-disk store consulted by get_or_render() before
+               rendering, and filled with the new renders.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 store: Optional[ThumbnailStore] = None):
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries: "OrderedDict[PreviewKey, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def __contains__(self, key: PreviewKey) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def lookup(self, key: PreviewKey) -> Tuple[bool, Any]:
+        """Return (found, image); a found image may be None (blank preview)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[0]
+
+    def put(self, key: PreviewKey, image: Any) -> None:
+        """Store a preview, evicting the least recently used ones if needed."""
+        cost = image_bytes(image)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (image, cost)
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_cost) = self._entries.popitem(last=False)
+                self._bytes -= evicted_cost
+                self._evictions += 1
+
+    def get_or_render(self, key: Optional[PreviewKey], render: Callable[[], Any]) -> Any:
+        """
+        Return the cached preview for key, loading it from the store or
+        rendering it on a miss. With a None key (unreadable font) the
+        preview is rendered without caching.
+        """
+        if key is None:
+            return render()
+        found, image = self.lookup(key)
+        if not found:
+            if self.store is not None:
+                image = self.store.get_or_render(key, render)
+            else:
+                image = render()
+            self.put(key, image)
+        return image
+
+    def clear(self) -> None:
+        """Drop every preview and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> PreviewCacheInfo:
+        """Return hit/miss/eviction statistics and memory use."""
+        with self._lock:
+            return PreviewCacheInfo(self._hits, self._misses, self._evictions,
+                                    len(self._entries), self._bytes, self.max_bytes)
+
+
+_preview_cache = PreviewCache(store=get_thumbnail_store())
+
+
+def get_preview_cache() -> PreviewCache:
+    """Return the preview cache shared by the GUIs."""
+    return _preview_cache
+
+
+def preview_cache_info() -> PreviewCacheInfo:
+    """Return statistics of the shared preview cache."""
+    return _preview_cache.info()
+
+
+def clear_preview_cache() -> None:
+    """Empty the shared preview cache."""
+    _preview_cache.clear()
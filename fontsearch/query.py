@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+FontSearch - In-memory cache of font query results.
+
+find_fonts() results are kept in a bounded LRU cache keyed by the
+normalized query (distinct characters, font types, limit). The cache is
+tied to an inventory generation: when the installed fonts change, every
+entry is dropped at once.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a QueryCache, in the spirit of functools.lru_cache."""
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    maxsize: int
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache whose content is valid for one inventory
+    generation only.
+
+    Args:
+        maxsize: Maximum number of cached queries.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._generation: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def _check_generation(self, generation: Hashable) -> None:
+        if generation != self._generation:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, key: Hashable, generation: Hashable) -> Optional[Any]:
+        """Return the cached value for a key, or None (counted as a miss)."""
+        with self._lock:
+            self._check_generation(generation)
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: Hashable) -> None:
+        """Store a value, evicting the least recently used entries if needed."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_generation(generation)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+            self._hits = self._misses = self._evictions = self._invalidations = 0
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss/eviction statistics."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self._invalidations, len(self._entries), self.maxsize)
@@ -0,0 +1,864 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Headless preview rendering.
+
+Draws font previews with Pillow, and OpenType-SVG glyphs with cairosvg or
+svglib, without tkinter: the advanced GUI and scripts generating specimen
+images share the same code. render_fonts() renders thousands of fonts on
+worker processes through the on-disk thumbnail store, and export_previews()
+writes them as PNG files or packs them into sprite sheets described by a
+JSON manifest, so a web page can load one image instead of thousands.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from .cmap import CmapError
+from .core import FontInfo
+from .coverage import resolve_jobs
+from .fontpool import get_font_pool
+from .previews import PreviewCache, preview_key
+from .segmentation import grapheme_clusters
+from .svgtable import SvgIndex, get_svg_index
+from .thumbnails import get_thumbnail_store
+
+# Optionnel : pour le rendu des polices
+try:
+    from PIL import Image, ImageChops, ImageDraw
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+def is_blank(image, light_threshold: int = 250) -> bool:
+    """
+    True if every pixel of an image drawn on white is near white (red, green
+    and blue all at least light_threshold). The minimum of each channel is
+    computed by Pillow, without building per-pixel Python objects.
+    """
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    return all(low >= light_threshold for low, _ in image.getextrema()[:3])
+
+
+def ink_coverage(image, alpha_threshold: int = 10, light_threshold: int = 240) -> float:
+    """
+    Fraction of the pixels of an image that are drawn: more opaque than
+    alpha_threshold for images with transparency, darker than light_threshold
+    in some channel otherwise. Counted from Pillow histograms.
+    """
+    if image.width == 0 or image.height == 0:
+        return 0.0
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        alpha = image.convert("RGBA").getchannel("A")
+        drawn = sum(alpha.histogram()[alpha_threshold + 1:])
+    else:
+        red, green, blue = image.convert("RGB").split()
+        # Canal le plus sombre de chaque pixel
+        darkest = ImageChops.darker(ImageChops.darker(red, green), blue)
+        drawn = sum(darkest.histogram()[:light_threshold + 1])
+    return drawn / (image.width * image.height)
+
+
+# Optionnel : pour le rendu des polices SVG
+try:
+    from svglib.svglib import svg2rlg
+    from reportlab.graphics import renderPM
+    SVG_RENDER_AVAILABLE = True
+except ImportError:
+    SVG_RENDER_AVAILABLE = False
+
+# Optionnel : CairoSVG, prioritaire pour Noto (OSError si libcairo manque)
+try:
+    import cairosvg
+    CAIRO_AVAILABLE = True
+except (ImportError, OSError):
+    CAIRO_AVAILABLE = False
+
+
+# Mémoire occupée par les glyphes SVG rastérisés
+SVG_GLYPH_CACHE_BYTES = 16 * 1024 * 1024
+
+# Threads de rastérisation des glyphes SVG
+SVG_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class SvgGlyphKey(NamedTuple):
+    """Identity of a rasterized SVG glyph."""
+    path: str
+    mtime_ns: int
+    font_number: int
+    glyph_id: int
+    size: int
+
+
+_svg_glyph_cache = PreviewCache(max_bytes=SVG_GLYPH_CACHE_BYTES)
+_svg_pending: Dict[SvgGlyphKey, Future] = {}  # rastérisations en cours
+_svg_lock = threading.Lock()
+_svg_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _svg_font_kind(font_path: Path) -> str:
+    """Famille de police dont les documents SVG demandent un préprocessing."""
+    name = str(font_path).lower()
+    for kind in ('noto', 'emojione', 'gilbert'):
+        if kind in name:
+            return kind
+    return ''
+
+
+def _rasterize_svg(svg_text: str, kind: str, size: int):
+    """Rastérise un document SVG de glyphe avec CairoSVG prioritaire pour Noto."""
+    try:
+        # Type de police pour appliquer le bon préprocessing
+        is_noto_font = kind == 'noto'
+        is_emojione_font = kind == 'emojione'
+        is_gilbert_font = kind == 'gilbert'
+        
+        # PRIORITÉ CAIROSVG pour Noto et polices emoji
+        if CAIRO_AVAILABLE:
+            try:
+                # Préprocesser le SVG selon le type de police
+                if is_noto_font:
+                    processed_svg = _preprocess_noto_svg(svg_text)
+                elif is_emojione_font:
+                    processed_svg = _preprocess_emojione_svg(svg_text)
+                elif is_gilbert_font:
+                    processed_svg = _preprocess_gilbert_svg(svg_text)
+                else:
+                    processed_svg = svg_text
+                
+                # Configuration optimisée pour CairoSVG
+                png_data = cairosvg.svg2png(
+                    bytestring=processed_svg.encode('utf-8'),
+                    output_width=size,
+                    output_height=size,
+                    background_color=None
+                )
+                
+                pil_image = Image.open(io.BytesIO(png_data))
+                pil_image.load()
+                
+                # Vérifier la qualité du rendu CairoSVG
+                coverage = ink_coverage(pil_image) * 100
+                
+                if coverage > 0.1:
+                    return _center_glyph_image(pil_image, size)
+                
+            except Exception:
+                pass
+        
+        # Fallback sur svglib
+        if not CAIRO_AVAILABLE or not is_noto_font:
+            drawing = svg2rlg(io.BytesIO(svg_text.encode('utf-8')))
+            
+            if not drawing:
+                return None
+                
+            # Obtenir les dimensions et rendre
+            width = drawing.width
+            height = drawing.height
+            bounds = drawing.getBounds()
+
+            if width <= 0 or height <= 0:
+                if bounds:
+                    width = bounds[2] - bounds[0]
+                    height = bounds[3] - bounds[1]
+
+            if height > 0:
+                scale_factor = size / height
+            else:
+                scale_factor = 1.0
+
+            if bounds:
+                content_width = bounds[2] - bounds[0]
+                content_height = bounds[3] - bounds[1]
+            else:
+                content_width = width
+                content_height = height
+
+            if content_height > 0:
+                scale_factor = size / content_height
+            else:
+                scale_factor = 1.0
+
+            final_width = int(content_width * scale_factor) if content_width > 0 else size
+            final_height = int(content_height * scale_factor) if content_height > 0 else size
+
+            max_dimension = size * 2
+            
+            if final_width > max_dimension or final_height > max_dimension:
+                ratio = min(max_dimension / final_width, max_dimension / final_height)
+                final_width = int(final_width * ratio)
+                final_height = int(final_height * ratio)
+                scale_factor *= ratio
+
+            from reportlab.graphics.shapes import Drawing as RLDrawing, Group
+
+            canvas = RLDrawing(final_width, final_height)
+            g = Group()
+            g.add(drawing)
+            g.scale(scale_factor, scale_factor)
+            if bounds:
+                g.translate(-bounds[0], -bounds[1])
+            canvas.add(g)
+
+            png_data = renderPM.drawToString(canvas, fmt='PNG')
+            pil_image = Image.open(io.BytesIO(png_data))
+            pil_image.load()
+
+            return _center_glyph_image(pil_image, size)
+
+        return None
+
+    except Exception:
+        return None
+
+
+def _rasterize_glyph(index: SvgIndex, key: SvgGlyphKey):
+    """Lit et rastérise le document SVG d'un glyphe (thread du pool)."""
+    try:
+        svg_doc_data = index.read(key.glyph_id)
+        if svg_doc_data is None:
+            image = None
+        else:
+            image = _rasterize_svg(svg_doc_data.decode('utf-8'),
+                                   _svg_font_kind(index.font_path), key.size)
+    except Exception:
+        image = None
+    with _svg_lock:
+        _svg_glyph_cache.put(key, image)
+        _svg_pending.pop(key, None)
+    return image
+
+
+def _reset_svg_pool() -> None:
+    """
+    Après un fork (processus de render_fonts), le pool hérité n'a plus de
+    threads et les verrous peuvent être restés pris : repartir de zéro.
+    """
+    global _svg_executor, _svg_pending, _svg_lock, _svg_glyph_cache
+    _svg_executor = None
+    _svg_pending = {}
+    _svg_lock = threading.Lock()
+    _svg_glyph_cache = PreviewCache(max_bytes=SVG_GLYPH_CACHE_BYTES)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_svg_pool)
+
+
+def _get_svg_executor() -> ThreadPoolExecutor:
+    global _svg_executor
+    with _svg_lock:
+        if _svg_executor is None:
+            _svg_executor = ThreadPoolExecutor(max_workers=SVG_WORKERS,
+                                               thread_name_prefix="fontsearch-svg")
+        return _svg_executor
+
+
+def rasterize_svg_glyphs(index: SvgIndex, glyph_ids: Iterable[int], size: int) -> Dict[int, Any]:
+    """
+    Rasterize SVG glyphs of a font into size x size images.
+
+    Glyphs already rasterized at this size come from an in-memory LRU
+    keyed by (font file, glyph ID, size). The others are read, preprocessed
+    and rasterized in parallel on a small thread pool; a glyph requested by
+    several threads at once is rasterized only once.
+
+    Returns:
+        {glyph ID: image}, the image being None when the glyph has no SVG
+        document or cannot be rasterized.
+    """
+    executor = _get_svg_executor()
+    images, futures = {}, {}
+    with _svg_lock:
+        for glyph_id in set(glyph_ids):
+            key = SvgGlyphKey(str(index.font_path), index.mtime_ns, index.font_number,
+                              glyph_id, size)
+            found, image = _svg_glyph_cache.lookup(key)
+            if found:
+                images[glyph_id] = image
+                continue
+            future = _svg_pending.get(key)
+            if future is None:
+                future = _svg_pending[key] = executor.submit(_rasterize_glyph, index, key)
+            futures[glyph_id] = future
+    for glyph_id, future in futures.items():
+        images[glyph_id] = future.result()
+    return images
+
+
+def render_svg_glyph(font_path: Path, text: str, size: int = 32):
+    """Rend le glyphe SVG du premier caractère d'un texte, ou None."""
+    if not SVG_RENDER_AVAILABLE or not text:
+        return None
+    index = get_svg_index(font_path)
+    if index is None:
+        return None
+    try:
+        glyph_id = index.glyph_ids([ord(text[0])]).get(ord(text[0]))
+    except (OSError, CmapError):
+        return None
+    if not glyph_id:
+        return None
+    return rasterize_svg_glyphs(index, [glyph_id], size)[glyph_id]
+
+
+def _render_plain_cell(font_path: Path, cluster: str, size: int):
+    """Dessine avec Pillow un graphème sans glyphe SVG, sur fond transparent."""
+    try:
+        with get_font_pool().use(font_path, size) as pil_font:
+            width = max(1, int(pil_font.getlength(cluster)))
+            cell = Image.new('RGBA', (width, size), (255, 255, 255, 0))
+            ImageDraw.Draw(cell).text((0, 0), cluster, font=pil_font, fill=(0, 0, 0, 255))
+        return cell
+    except Exception:
+        return Image.new('RGBA', (max(1, size // 3), size), (255, 255, 255, 0))
+
+
+def render_svg_text(font_path: Path, text: str, size: int = 32):
+    """
+    Draw a text with the SVG glyphs of a color font, one size x size cell
+    per grapheme cluster, on a transparent background.
+
+    The glyphs of all the characters are rasterized together (see
+    rasterize_svg_glyphs()), so a whole sample text takes about as long as
+    its slowest glyph. Characters without an SVG glyph are drawn by Pillow.
+    Clusters are drawn with the glyph of their first character: ZWJ
+    sequences and flags need shaping, which this renderer does not do.
+
+    Returns:
+        The image, or None when no character of the text has an SVG glyph.
+    """
+    if not SVG_RENDER_AVAILABLE or not text:
+        return None
+    font_path = Path(font_path)
+    index = get_svg_index(font_path)
+    if index is None:
+        return None
+    clusters = [text[start:end] for start, end in grapheme_clusters(text)]
+    try:
+        glyph_ids = index.glyph_ids(ord(cluster[0]) for cluster in clusters)
+    except (OSError, CmapError):
+        return None
+    svg_glyphs = [glyph_id for glyph_id in glyph_ids.values() if index.find(glyph_id)]
+    tiles = rasterize_svg_glyphs(index, svg_glyphs, size)
+    if all(tile is None for tile in tiles.values()):
+        return None
+
+    cells = []
+    for cluster in clusters:
+        tile = tiles.get(glyph_ids.get(ord(cluster[0])))
+        if tile is None:
+            tile = _render_plain_cell(font_path, cluster, size)
+        cells.append(tile.convert('RGBA'))
+
+    image = Image.new('RGBA', (sum(cell.width for cell in cells), size), (255, 255, 255, 0))
+    x = 0
+    for cell in cells:
+        image.paste(cell, (x, 0), cell)
+        x += cell.width
+    return image
+
+
+def _center_glyph_image(img, target_size: int):
+    """Centre un glyphe dans un canvas de taille donnée."""
+    if img.size == (target_size, target_size):
+        if img.mode == 'RGBA':
+            bbox = img.getbbox()
+            if bbox:
+                content_width = bbox[2] - bbox[0]
+                content_height = bbox[3] - bbox[1]
+                
+                if content_width < target_size * 0.8 or content_height < target_size * 0.8:
+                    content_img = img.crop(bbox)
+                    canvas = Image.new('RGBA', (target_size, target_size), (255, 255, 255, 0))
+                    x = (target_size - content_width) // 2
+                    y = (target_size - content_height) // 2
+                    canvas.paste(content_img, (x, y), content_img)
+                    return canvas
+        return img
+    
+    if img.mode == 'RGBA':
+        canvas = Image.new('RGBA', (target_size, target_size), (255, 255, 255, 0))
+    else:
+        canvas = Image.new('RGB', (target_size, target_size), (255, 255, 255))
+    
+    orig_width, orig_height = img.size
+    
+    if orig_width > target_size or orig_height > target_size:
+        ratio = min(target_size / orig_width, target_size / orig_height)
+        new_width = int(orig_width * ratio)
+        new_height = int(orig_height * ratio)
+        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        orig_width, orig_height = new_width, new_height
+    
+    x = (target_size - orig_width) // 2
+    y = (target_size - orig_height) // 2
+    
+    if img.mode == 'RGBA':
+        canvas.paste(img, (x, y), img)
+    else:
+        canvas.paste(img, (x, y))
+    
+    return canvas
+
+
+def _preprocess_noto_svg(svg_text: str) -> str:
+    """Préprocesse les SVG Noto pour corriger les problèmes de coordonnées."""
+    transform_pattern = r'<g transform="translate\([^)]+\)\s*translate\([^)]+\)\s*scale\([^)]+\)">'
+    
+    if re.search(transform_pattern, svg_text):
+        content_match = re.search(r'<g transform="[^"]*">(.*?)</g>\s*</svg>', svg_text, re.DOTALL)
+        
+        if content_match:
+            inner_content = content_match.group(1)
+            
+            new_svg = f'''<?xml version='1.0' encoding='UTF-8'?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:ns1="http://www.w3.org/1999/xlink" 
+     viewBox="0 0 128 128" width="128" height="128">
+<g transform="scale(0.8) translate(10, 10)">
+{inner_content}
+</g>
+</svg>'''
+            return new_svg
+    
+    if 'viewBox=' not in svg_text:
+        svg_text = svg_text.replace('<svg ', '<svg viewBox="0 0 128 128" ')
+    
+    return svg_text
+
+
+def _preprocess_emojione_svg(svg_text: str) -> str:
+    """Préprocesse les SVG EmojiOne pour corriger les problèmes de positionnement."""
+    emojione_pattern = r'<g transform="translate\([^)]+\)\s*translate\([^)]+\)\s*scale\([^)]+\)">'
+    
+    if re.search(emojione_pattern, svg_text):
+        content_match = re.search(r'<g transform="[^"]*">(.*?)</g>\s*</svg>', svg_text, re.DOTALL)
+        
+        if content_match:
+            inner_content = content_match.group(1)
+            
+            new_svg = f'''<?xml version='1.0' encoding='UTF-8'?>
+<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64" width="64" height="64">
+<g transform="scale(0.9) translate(16, 40)">
+{inner_content}
+</g>
+</svg>'''
+            return new_svg
+    
+    if 'viewBox=' not in svg_text:
+        svg_text = svg_text.replace('<svg ', '<svg viewBox="0 0 64 64" ')
+    
+    return svg_text
+
+
+def _preprocess_gilbert_svg(svg_text: str) -> str:
+    """Préprocesse les SVG Gilbert Color pour corriger les problèmes de rendu."""
+    if 'viewBox=' not in svg_text:
+        svg_text = svg_text.replace('<svg ', '<svg viewBox="0 0 1000 1000" ')
+    
+    gradient_pattern = r'<defs>.*?</defs>'
+    if re.search(gradient_pattern, svg_text, re.DOTALL):
+        svg_text = re.sub(r'fill="url\(#[^)]+\)"', 'fill="#FF6B35"', svg_text)
+        svg_text = re.sub(r'stroke="url\(#[^)]+\)"', 'stroke="#333333"', svg_text)
+        svg_text = re.sub(gradient_pattern, '', svg_text, flags=re.DOTALL)
+    
+    return svg_text
+
+
+DEFAULT_TEXT = "AaBbCc 0123 àéïöü ÆŒß"
+DEFAULT_SIZE = 32
+
+# Polices envoyées ensemble à un processus de rendu
+CHUNK_SIZE = 16
+PARALLEL_MIN_FONTS = 2 * CHUNK_SIZE
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def preview_style(svg: bool) -> str:
+    """Style tag of the previews drawn by render_preview() (see preview_key)."""
+    return "advanced-svg" if svg else "advanced"
+
+
+def render_preview(font_path: Union[str, Path], text: str, size: int = DEFAULT_SIZE,
+                   features: Sequence[str] = (), svg: bool = False):
+    """
+    Render text with a font into a PIL image (RGBA, black on white).
+
+    Args:
+        font_path: Path to the font file.
+        text: Text to draw.
+        size: Font size in pixels.
+        features: OpenType features (e.g. "liga", "-calt"); needs libraqm.
+        svg: Draw the text with the glyphs of the OpenType-SVG table of
+             color fonts, when there is one (see render_svg_text()).
+
+    Returns:
+        The image, or None if the font cannot be loaded or draws nothing.
+    """
+    if not PIL_AVAILABLE or not text:
+        return None
+    font_path = Path(font_path)
+    try:
+        # Gilbert Color n'a pas de rendu PIL exploitable
+        if 'gilbert' in font_path.name.lower():
+            return None
+
+        # Essayer le rendu SVG si activé
+        if svg and get_svg_index(font_path) is not None:
+            svg_image = render_svg_text(font_path, text, size)
+            if svg_image:
+                return svg_image
+
+        # Rendu PIL standard, police réservée à ce thread pendant le rendu
+        with get_font_pool().use(font_path, size) as pil_font:
+            bbox = pil_font.getbbox(text)
+            # Boîte vide : rien à dessiner, inutile de créer l'image
+            if bbox is None or bbox[2] <= bbox[0] or bbox[3] <= bbox[1]:
+                return None
+
+            width = bbox[2] - bbox[0] + 20
+            height = bbox[3] - bbox[1] + 10
+
+            img = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+            draw = ImageDraw.Draw(img)
+
+            try:
+                draw.text(
+                    (-bbox[0] + 10, -bbox[1] + 5),
+                    text,
+                    font=pil_font,
+                    fill=(0, 0, 0, 255),
+                    embedded_color=True,
+                    features=list(features) if features else None
+                )
+            except TypeError:
+                draw.text(
+                    (-bbox[0] + 10, -bbox[1] + 5),
+                    text,
+                    font=pil_font,
+                    fill=(0, 0, 0, 255),
+                    embedded_color=True
+                )
+
+            # Vérifier si l'image est vide
+            if is_blank(img):
+                return None
+
+            return img
+    except Exception:
+        return None
+
+
+class RenderedPreview(NamedTuple):
+    """A font file and its preview (None when nothing could be drawn)."""
+    path: Path
+    image: Any
+
+
+def _render_stored(path: str, text: str, size: int, features: Sequence[str], svg: bool):
+    """Render one preview, or load it from the thumbnail store."""
+    key = preview_key(path, text, size, features, style=preview_style(svg))
+    render = functools.partial(render_preview, path, text, size, features, svg)
+    if key is None:
+        return render()
+    return get_thumbnail_store().get_or_render(key, render)
+
+
+def _render_chunk(paths: List[str], text: str, size: int, features: Sequence[str],
+                  svg: bool) -> List[Any]:
+    """Worker entry point: render the previews of a chunk of fonts."""
+    return [_render_stored(path, text, size, features, svg) for path in paths]
+
+
+def render_fonts(fonts: Iterable[Union[FontInfo, str, Path]], text: str = DEFAULT_TEXT,
+                 size: int = DEFAULT_SIZE, features: Sequence[str] = (), svg: bool = False,
+                 jobs: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Iterator[RenderedPreview]:
+    """
+    Render the preview of many fonts, yielded in the order given.
+
+    Previews go through the on-disk thumbnail store, so fonts rendered by an
+    earlier run (or shown in the advanced GUI) are not rendered again.
+
+    Args:
+        fonts: FontInfo objects or font paths.
+        text, size, features, svg: See render_preview().
+        jobs: Number of worker processes. None or 1 renders in this process,
+              0 uses one worker per CPU.
+        progress: Called as progress(done, total) as previews are produced.
+    """
+    paths = [str(font.path if isinstance(font, FontInfo) else font) for font in fonts]
+    features = tuple(features)
+    total = len(paths)
+    done = 0
+
+    workers = resolve_jobs(jobs)
+    if workers <= 1 or total < PARALLEL_MIN_FONTS:
+        for path in paths:
+            image = _render_stored(path, text, size, features, svg)
+            done += 1
+            if progress is not None:
+                progress(done, total)
+            yield RenderedPreview(Path(path), image)
+        return
+
+    chunks = iter([paths[i:i + CHUNK_SIZE] for i in range(0, total, CHUNK_SIZE)])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Quelques lots d'avance par processus : la mémoire reste bornée
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(_render_chunk, chunk, text, size, features, svg)))
+            if len(pending) >= 2 * workers:
+                break
+        try:
+            while pending:
+                chunk, future = pending.popleft()
+                images = future.result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.append((next_chunk, executor.submit(
+                        _render_chunk, next_chunk, text, size, features, svg)))
+                for path, image in zip(chunk, images):
+                    done += 1
+                    if progress is not None:
+                        progress(done, total)
+                    yield RenderedPreview(Path(path), image)
+        except BaseException:
+            for _, future in pending:
+                future.cancel()
+            raise
+
+
+class SpriteSheetWriter:
+    """
+    Pack images into sprite sheets, shelf by shelf, saving each sheet as
+    soon as it is full so that memory use does not grow with the number of
+    images.
+
+    Args:
+        out_dir: Directory of the sheets.
+        prefix: Sheet files are named <prefix>-<n>.png.
+        width: Width of a sheet in pixels.
+        height: Maximum height of a sheet in pixels. Images larger than a
+                sheet are scaled down to fit.
+        padding: Empty pixels between images.
+    """
+
+    def __init__(self, out_dir: Union[str, Path], prefix: str = "sprites",
+                 width: int = 2048, height: int = 4096, padding: int = 2):
+        self.out_dir = Path(out_dir)
+        self.prefix = prefix
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.sheets: List[str] = []  # fichiers écrits
+        self._sheet = None
+        self._x = self._y = self._shelf_height = 0
+        self._used_height = 0
+
+    def add(self, image) -> Dict[str, Any]:
+        """Place an image; return its sheet file name and rectangle."""
+        if image.width > self.width or image.height > self.height:
+            # L'image doit tenir dans une feuille vide
+            ratio = min(self.width / image.width, self.height / image.height)
+            image = image.resize((max(1, int(image.width * ratio)), max(1, int(image.height * ratio))),
+                                 Image.Resampling.LANCZOS)
+        width, height = image.size
+
+        if self._sheet is not None and self._x + width > self.width:
+            # Étagère suivante
+            self._x = 0
+            self._y += self._shelf_height + self.padding
+            self._shelf_height = 0
+        if self._sheet is None or self._y + height > self.height:
+            self._save()
+            self._sheet = Image.new("RGBA", (self.width, self.height), (0, 0, 0, 0))
+            self._x = self._y = self._shelf_height = self._used_height = 0
+
+        self._sheet.paste(image.convert("RGBA"), (self._x, self._y))
+        entry = {"sheet": f"{self.prefix}-{len(self.sheets)}.png",
+                 "x": self._x, "y": self._y, "width": width, "height": height}
+        self._x += width + self.padding
+        self._shelf_height = max(self._shelf_height, height)
+        self._used_height = max(self._used_height, self._y + height)
+        return entry
+
+    def close(self) -> None:
+        """Save the last sheet."""
+        self._save()
+
+    def _save(self) -> None:
+        if self._sheet is None:
+            return
+        # La feuille est rognée à la hauteur utilisée
+        used = self._sheet.crop((0, 0, self.width, self._used_height))
+        name = f"{self.prefix}-{len(self.sheets)}.png"
+        used.save(self.out_dir / name, format="PNG", optimize=True)
+        self.sheets.append(name)
+        self._sheet = None
+
+
+def preview_file_name(name: str, path: Union[str, Path]) -> str:
+    """File name of a font preview: the font name, made unique by its path."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "font"
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:8]
+    return f"{slug[:80]}-{digest}.png"
+
+
+def export_previews(fonts: Iterable[Union[FontInfo, str, Path]], out_dir: Union[str, Path],
+                    text: str = DEFAULT_TEXT, size: int = DEFAULT_SIZE,
+                    features: Sequence[str] = (), svg: bool = False,
+                    jobs: Optional[int] = None, sprites: bool = False,
+                    sheet_width: int = 2048, sheet_height: int = 4096,
+                    progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Render the previews of fonts into a directory, with a manifest.json.
+
+    Without sprites each preview is written to its own PNG file; with
+    sprites they are packed into <out_dir>/sprites-<n>.png sheets. Every
+    manifest entry gives the font name and path and either its "file" or its
+    "sheet" and x/y/width/height rectangle. Fonts that draw nothing are
+    listed under "missing".
+
+    Args:
+        fonts: FontInfo objects or font paths.
+        out_dir: Output directory, created if needed.
+        text, size, features, svg: See render_preview().
+        jobs: Worker processes (see render_fonts()).
+        sprites: Pack the previews into sprite sheets.
+        sheet_width, sheet_height: Maximum size of a sprite sheet in pixels.
+        progress: Called as progress(done, total).
+
+    Returns:
+        The manifest, as written to manifest.json.
+    """
+    if not PIL_AVAILABLE:
+        raise ImportError("Pillow is required to render previews")
+
+    fonts = list(fonts)
+    names = {str(font.path): font.name for font in fonts if isinstance(font, FontInfo)}
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    writer = SpriteSheetWriter(out_dir, width=sheet_width, height=sheet_height) if sprites else None
+
+    entries, missing = [], []
+    for path, image in render_fonts(fonts, text, size, features, svg, jobs, progress):
+        name = names.get(str(path), path.stem)
+        if image is None:
+            missing.append({"name": name, "path": str(path)})
+            continue
+        entry = {"name": name, "path": str(path)}
+        if writer is not None:
+            entry.update(writer.add(image))
+        else:
+            entry["file"] = preview_file_name(name, path)
+            entry["width"], entry["height"] = image.size
+            image.save(out_dir / entry["file"], format="PNG")
+        entries.append(entry)
+    if writer is not None:
+        writer.close()
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "text": text,
+        "size": size,
+        "features": list(features),
+        "svg": svg,
+        "sheets": writer.sheets if writer is not None else [],
+        "fonts": entries,
+        "missing": missing,
+    }
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of 'fontsearch render'."""
+    from .cli import parse_font_types
+    from .core import find_fonts
+
+    parser = argparse.ArgumentParser(
+        prog="fontsearch render",
+        description="Render font previews into PNG files or sprite sheets with a JSON manifest",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  fontsearch render --out previews                      # One PNG per installed font
+  fontsearch render --out specimens --sprites --size 48  # Sprite sheets for a web page
+  fontsearch render --out emoji --text "😀" --supported-only --svg
+        """
+    )
+    parser.add_argument('--out', '-o', required=True, metavar='DIR',
+                        help='Output directory (created if needed)')
+    parser.add_argument('--text', '-t', default=DEFAULT_TEXT,
+                        help='Sample text to render')
+    parser.add_argument('--size', '-s', type=int, default=DEFAULT_SIZE,
+                        help='Font size in pixels')
+    parser.add_argument('--features',
+                        help='Comma-separated OpenType features (e.g. liga,-calt)')
+    parser.add_argument('--svg', action='store_true',
+                        help='Render OpenType-SVG color glyphs when available')
+    parser.add_argument('--types',
+                        help='Comma-separated font types to include (TTF,OTF,TTC,WOFF,WOFF2)')
+    parser.add_argument('--supported-only', action='store_true',
+                        help='Only render fonts supporting every character of the text')
+    parser.add_argument('--max', '-m', type=int,
+                        help='Maximum number of fonts to render')
+    parser.add_argument('--sprites', action='store_true',
+                        help='Pack the previews into sprite sheets')
+    parser.add_argument('--sheet-width', type=int, default=2048,
+                        help='Width of a sprite sheet in pixels')
+    parser.add_argument('--sheet-height', type=int, default=4096,
+                        help='Maximum height of a sprite sheet in pixels')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help='Worker processes (0 = one per CPU, 1 = no worker)')
+    args = parser.parse_args(argv)
+
+    try:
+        types = parse_font_types(args.types) if args.types else None
+        features = [f.strip() for f in args.features.split(',') if f.strip()] if args.features else []
+        fonts = find_fonts(text=args.text if args.supported_only else None, types=types,
+                           max_results=args.max, jobs=args.jobs)
+        manifest = export_previews(fonts, args.out, text=args.text, size=args.size,
+                                   features=features, svg=args.svg, jobs=args.jobs,
+                                   sprites=args.sprites, sheet_width=args.sheet_width,
+                                   sheet_height=args.sheet_height)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    where = f"{len(manifest['sheets'])} sprite sheets" if args.sprites else "PNG files"
+    print(f"{len(manifest['fonts'])} previews written to {args.out} ({where}), "
+          f"{len(manifest['missing'])} fonts without preview")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Incremental font directory scanning.
+
+A snapshot records (size, mtime_ns, inode) for every font file found under
+the font directories. Diffing two snapshots tells which files were added,
+changed or removed, so only those need to be parsed again and downstream
+caches can evict exactly the entries that went stale.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional, List, Dict, Iterable, NamedTuple
+from dataclasses import dataclass, field
+
+# Extensions picked up when walking font directories
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc", ".otc", ".woff", ".woff2", ".pfb", ".pfa", ".otb")
+
+
+class FileSignature(NamedTuple):
+    """Identity of a font file on disk: a change in any field means a rescan."""
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+@dataclass
+class ScanDiff:
+    """Difference between two snapshots of the font directories."""
+    added: List[Path] = field(default_factory=list)
+    changed: List[Path] = field(default_factory=list)
+    removed: List[Path] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def stale(self) -> List[Path]:
+        """Files whose previously parsed data must be discarded."""
+        return self.changed + self.removed
+
+
+def file_signature(path: str) -> Optional[FileSignature]:
+    """Return the signature of a file, or None if it cannot be stat-ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return FileSignature(st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def snapshot_font_dirs(
+    font_dirs: Iterable[Path],
+    extensions: Iterable[str] = FONT_EXTENSIONS,
+    extra_files: Iterable[str] = ()
+) -> Dict[str, FileSignature]:
+    """
+    Walk the font directories and return {path: FileSignature}.
+
+    Args:
+        font_dirs: Directories to walk recursively.
+        extensions: File extensions (lowercase, with dot) to record.
+        extra_files: Additional files to stat even if they live outside
+                     font_dirs (e.g. fonts reported by fontconfig).
+    """
+    extensions = tuple(extensions)
+    snapshot = {}
+
+    for font_dir in font_dirs:
+        for dirpath, _dirnames, filenames in os.walk(str(font_dir)):
+            for filename in filenames:
+                if filename.lower().endswith(extensions):
+                    path = os.path.join(dirpath, filename)
+                    signature = file_signature(path)
+                    if signature is not None:
+                        snapshot[path] = signature
+
+    for path in extra_files:
+        if path not in snapshot:
+            signature = file_signature(path)
+            if signature is not None:
+                snapshot[path] = signature
+
+    return snapshot
+
+
+def diff_snapshots(
+    old: Dict[str, FileSignature],
+    new: Dict[str, FileSignature]
+) -> ScanDiff:
+    """Compare two snapshots and return the added, changed and removed files."""
+    diff = ScanDiff()
+    for path, signature in new.items():
+        previous = old.get(path)
+        if previous is None:
+            diff.added.append(Path(path))
+        elif previous != signature:
+            diff.changed.append(Path(path))
+    for path in old:
+        if path not in new:
+            diff.removed.append(Path(path))
+    return diff
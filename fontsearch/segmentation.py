@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Grapheme cluster segmentation (standard library only).
+
+Implements the extended grapheme cluster rules of Unicode UAX #29 closely
+enough for font itemization: CR LF, Hangul syllable sequences, combining
+marks and other extenders, spacing marks, prepended marks, emoji ZWJ
+sequences and regional indicator (flag) pairs are kept together.
+Extended_Pictographic is approximated by the emoji and symbol blocks, since
+unicodedata does not expose emoji properties.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import unicodedata
+from typing import Dict, Iterator, Tuple
+
+# Grapheme_Cluster_Break values used by the rules below
+OTHER, CR, LF, CONTROL, EXTEND, ZWJ, REGIONAL, PREPEND, SPACING_MARK, L, V, T, LV, LVT = range(14)
+
+PREPEND_CODEPOINTS = frozenset((0x06DD, 0x070F, 0x0890, 0x0891, 0x08E2, 0x110BD, 0x110CD))
+
+PICTOGRAPHIC_RANGES = (
+    (0x00A9, 0x00A9), (0x00AE, 0x00AE), (0x203C, 0x203C), (0x2049, 0x2049),
+    (0x2122, 0x2122), (0x2139, 0x2139), (0x2194, 0x21AA), (0x2300, 0x23FF),
+    (0x24C2, 0x24C2), (0x25AA, 0x25FE), (0x2600, 0x27BF), (0x2934, 0x2935),
+    (0x2B00, 0x2BFF), (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297),
+    (0x3299, 0x3299), (0x1F000, 0x1F0FF), (0x1F10D, 0x1F1AD), (0x1F201, 0x1F2FF),
+    (0x1F300, 0x1F3FA), (0x1F400, 0x1FAFF), (0x1FC00, 0x1FFFD),
+)
+
+_break_classes: Dict[int, int] = {}
+
+
+def _classify(cp: int) -> int:
+    if cp < 0x7F:
+        if cp == 0x0D:
+            return CR
+        if cp == 0x0A:
+            return LF
+        return CONTROL if cp < 0x20 else OTHER
+    if cp == 0x200D:
+        return ZWJ
+    if 0x1F1E6 <= cp <= 0x1F1FF:
+        return REGIONAL
+    if 0x1F3FB <= cp <= 0x1F3FF or 0xE0020 <= cp <= 0xE007F or cp == 0x200C:
+        # Modificateurs de teinte, tags des drapeaux régionaux, ZWNJ
+        return EXTEND
+    if 0x0600 <= cp <= 0x0605 or cp in PREPEND_CODEPOINTS:
+        return PREPEND
+    if 0x1100 <= cp <= 0x115F or 0xA960 <= cp <= 0xA97C:
+        return L
+    if 0x1160 <= cp <= 0x11A7 or 0xD7B0 <= cp <= 0xD7C6:
+        return V
+    if 0x11A8 <= cp <= 0x11FF or 0xD7CB <= cp <= 0xD7FB:
+        return T
+    if 0xAC00 <= cp <= 0xD7A3:
+        return LV if (cp - 0xAC00) % 28 == 0 else LVT
+
+    category = unicodedata.category(chr(cp))
+    if category in ("Mn", "Me"):
+        return EXTEND
+    if category == "Mc":
+        return SPACING_MARK
+    if category in ("Cc", "Cf", "Zl", "Zp"):
+        return CONTROL
+    return OTHER
+
+
+def break_class(cp: int) -> int:
+    """Return the (memoized) Grapheme_Cluster_Break class of a codepoint."""
+    cls = _break_classes.get(cp)
+    if cls is None:
+        cls = _break_classes[cp] = _classify(cp)
+    return cls
+
+
+def is_pictographic(cp: int) -> bool:
+    """Approximate the Extended_Pictographic property."""
+    if cp < 0xA9:
+        return False
+    for start, end in PICTOGRAPHIC_RANGES:
+        if cp < start:
+            return False
+        if cp <= end:
+            return True
+    return False
+
+
+def grapheme_clusters(text: str) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) string offsets of the extended grapheme clusters of
+    a text.
+
+    Examples:
+        >>> text = "Cafe\u0301 👍🏽🇫🇷"
+        >>> [text[s:e] for s, e in grapheme_clusters(text)]
+        ['C', 'a', 'f', 'é', ' ', '👍🏽', '🇫🇷']
+    """
+    if not text:
+        return
+
+    start = 0
+    prev = break_class(ord(text[0]))
+    pictographic_run = is_pictographic(ord(text[0]))  # ExtPict Extend*
+    zwj_joins = False  # ExtPict Extend* ZWJ juste avant
+    regional_count = 1 if prev == REGIONAL else 0
+
+    for i in range(1, len(text)):
+        cp = ord(text[i])
+        cls = break_class(cp)
+
+        if prev == CR and cls == LF:
+            joined = True
+        elif prev in (CONTROL, CR, LF) or cls in (CONTROL, CR, LF):
+            joined = False
+        elif prev == L and cls in (L, V, LV, LVT):
+            joined = True
+        elif prev in (LV, V) and cls in (V, T):
+            joined = True
+        elif prev in (LVT, T) and cls == T:
+            joined = True
+        elif cls in (EXTEND, ZWJ, SPACING_MARK) or prev == PREPEND:
+            joined = True
+        elif prev == ZWJ and zwj_joins and is_pictographic(cp):
+            joined = True
+        elif prev == REGIONAL and cls == REGIONAL:
+            joined = regional_count % 2 == 1
+        else:
+            joined = False
+
+        if not joined:
+            yield start, i
+            start = i
+
+        zwj_joins = cls == ZWJ and pictographic_run
+        if is_pictographic(cp):
+            pictographic_run = True
+        elif cls != EXTEND:
+            pictographic_run = False
+        regional_count = regional_count + 1 if cls == REGIONAL else 0
+        prev = cls
+
+    yield start, len(text)
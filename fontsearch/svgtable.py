@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Indexed access to OpenType-SVG glyph documents (standard library only).
+
+Color fonts such as Noto Color Emoji store one SVG document per glyph (or
+per range of glyphs) in their 'SVG ' table, which can weigh tens of MB.
+Decompiling the whole table to draw one glyph is wasteful: the table starts
+with a directory of glyph ID ranges and document offsets. That directory is
+read once per font file version, through mmap, and kept in memory; drawing
+a glyph then reads and decompresses only its own document.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import bisect
+import gzip
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .cmap import CmapError, read_glyph_ids, read_table_directory
+
+# Nombre de polices dont l'index est gardé en mémoire
+MAX_INDEXES = 256
+
+
+class SvgTableError(CmapError):
+    """The 'SVG ' table of a font cannot be parsed."""
+
+
+class SvgDocument(NamedTuple):
+    """Location of the SVG document drawing a range of glyphs."""
+    start_glyph: int
+    end_glyph: int
+    offset: int  # depuis le début du fichier
+    length: int
+
+
+def parse_svg_documents(data, font_number: int = 0) -> Optional[List[SvgDocument]]:
+    """
+    Return the document list of the 'SVG ' table sorted by glyph ID, or None
+    when the font has no such table.
+
+    Args:
+        data: Buffer holding the whole font file (bytes or mmap).
+        font_number: Index of the font inside a collection.
+    """
+    tables = read_table_directory(data, font_number)
+    if b"SVG " not in tables:
+        return None
+    table_offset, table_length = tables[b"SVG "]
+
+    try:
+        _version, list_offset = struct.unpack_from(">HI", data, table_offset)
+        list_at = table_offset + list_offset
+        num_entries = struct.unpack_from(">H", data, list_at)[0]
+        records = data[list_at + 2:list_at + 2 + 12 * num_entries]
+        documents = [SvgDocument(start, end, list_at + offset, length)
+                     for start, end, offset, length in struct.iter_unpack(">HHII", records)]
+    except struct.error as e:
+        raise SvgTableError(f"Truncated SVG table: {e}")
+    if len(documents) != num_entries:
+        raise SvgTableError("Truncated SVG document list")
+    documents.sort()
+    return documents
+
+
+class SvgIndex:
+    """
+    Glyph ID -> SVG document lookup for one font file.
+
+    The glyph IDs of the characters drawn are looked up in the cmap on first
+    use and remembered with the index.
+    """
+
+    def __init__(self, font_path: Union[str, Path], documents: List[SvgDocument],
+                 font_number: int = 0, mtime_ns: int = 0):
+        self.font_path = Path(font_path)
+        self.font_number = font_number
+        self.mtime_ns = mtime_ns  # version du fichier indexé
+        self.documents = documents
+        self._starts = [document.start_glyph for document in documents]
+        self._glyphs: Dict[int, int] = {}  # codepoint -> glyphe (0 : absent)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def find(self, glyph_id: int) -> Optional[SvgDocument]:
+        """Return the document drawing a glyph, or None."""
+        i = bisect.bisect_right(self._starts, glyph_id) - 1
+        if i >= 0 and self.documents[i].end_glyph >= glyph_id:
+            return self.documents[i]
+        return None
+
+    def glyph_ids(self, codepoints: Iterable[int]) -> Dict[int, int]:
+        """Return {codepoint: glyph ID} for the codepoints mapped by the font."""
+        codepoints = list(codepoints)
+        missing = [cp for cp in codepoints if cp not in self._glyphs]
+        if missing:
+            found = read_glyph_ids(self.font_path, missing, self.font_number)
+            for cp in missing:
+                self._glyphs[cp] = found.get(cp, 0)
+        return {cp: self._glyphs[cp] for cp in codepoints if self._glyphs[cp]}
+
+    def read(self, glyph_id: int) -> Optional[bytes]:
+        """
+        Return the SVG document drawing a glyph, decompressed, or None if the
+        glyph has no SVG document. Only that document is read from the file.
+        """
+        document = self.find(glyph_id)
+        if document is None:
+            return None
+        with open(self.font_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                svg = data[document.offset:document.offset + document.length]
+            finally:
+                data.close()
+        if len(svg) != document.length:
+            raise SvgTableError("Truncated SVG document")
+        # Les documents peuvent être compressés avec gzip
+        if svg.startswith(b"\x1f\x8b"):
+            svg = gzip.decompress(svg)
+        return svg
+
+
+def build_svg_index(font_path: Union[str, Path], font_number: int = 0) -> Optional[SvgIndex]:
+    """
+    Read the SVG document directory of a font file via mmap.
+
+    Returns None when the font has no 'SVG ' table. Raises CmapError if the
+    file is not a readable sfnt font and OSError if it cannot be opened.
+    """
+    with open(font_path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise CmapError("Empty file")
+        try:
+            documents = parse_svg_documents(data, font_number)
+        finally:
+            data.close()
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+    if documents is None:
+        return None
+    return SvgIndex(font_path, documents, font_number, mtime_ns)
+
+
+_indexes: "OrderedDict[Tuple[str, int, int], Optional[SvgIndex]]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_svg_index(font_path: Union[str, Path], font_number: int = 0) -> Optional[SvgIndex]:
+    """
+    Return the SVG document index of a font, or None if the font has no
+    'SVG ' table or cannot be read. Indexes are built once per version of
+    the font file (path and modification time) and kept in an LRU.
+    """
+    path = str(font_path)
+    try:
+        key = (path, os.stat(path).st_mtime_ns, font_number)
+    except OSError:
+        return None
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    try:
+        index = build_svg_index(path, font_number)
+    except (OSError, CmapError):
+        index = None
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def read_svg_glyph(font_path: Union[str, Path], char: str, font_number: int = 0) -> Optional[bytes]:
+    """
+    Return the decompressed SVG document drawing a character, or None if
+    the font has no SVG glyph for it.
+    """
+    index = get_svg_index(font_path, font_number)
+    if index is None or not char:
+        return None
+    try:
+        glyph_id = index.glyph_ids([ord(char)]).get(ord(char))
+        if not glyph_id:
+            return None
+        return index.read(glyph_id)
+    except (OSError, CmapError, EOFError):
+        return None
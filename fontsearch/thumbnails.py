@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+FontSearch - On-disk store of rendered preview thumbnails.
+
+The in-memory preview cache is lost when the program exits, so opening the
+GUI on a large font library rendered every visible preview again at each
+launch. Rendered previews are also written as PNG files in the cache
+directory, named by a hash of their identity (font path and modification
+time, text, size, OpenType features, rendering style and renderer version).
+The store is capped in bytes; the least recently used files are evicted.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .cache import cache_enabled, get_cache_dir
+
+try:
+    import PIL
+    from PIL import Image, features as pil_features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Bump when the previews drawn by the GUIs change; older thumbnails are ignored.
+THUMBNAIL_VERSION = 2
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Après une éviction, le store redescend à cette fraction du plafond
+LOW_WATERMARK = 0.9
+
+# Taille minimale comptée par vignette (bloc disque occupé par le fichier)
+MIN_ENTRY_BYTES = 512
+
+
+class ThumbnailStoreInfo(NamedTuple):
+    """Statistics of a ThumbnailStore."""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+def renderer_version() -> str:
+    """
+    Version of the rendering stack, part of every thumbnail name: a new
+    Pillow, the availability of libraqm (complex text layout) or of an SVG
+    rasterizer (svglib, cairosvg) changes the rendered images.
+    """
+    if not PIL_AVAILABLE:
+        return f"{THUMBNAIL_VERSION}"
+    raqm = pil_features.check("raqm")
+    svg = "+".join(name for name in ("svglib", "cairosvg")
+                   if importlib.util.find_spec(name) is not None) or "nosvg"
+    return f"{THUMBNAIL_VERSION}/{PIL.__version__}/{'raqm' if raqm else 'basic'}/{svg}"
+
+
+class ThumbnailStore:
+    """
+    Content-addressed store of preview images on disk, bounded in bytes.
+
+    Keys are tuples such as fontsearch.previews.PreviewKey. Only images
+    are stored: a None preview may come from a passing failure (too many
+    open files, a font being replaced), so it is kept in the in-memory
+    cache only and rendered again in the next session. Files are written
+    atomically and their modification time is refreshed when read, which
+    gives the LRU order used for eviction. Failures to read or write (full
+    disk, read-only cache) only turn into cache misses.
+
+    Args:
+        directory: Directory of the thumbnails (default: "thumbnails" in the
+                   FontSearch cache directory, see get_cache_dir()).
+        max_bytes: Maximum disk space used by the thumbnails.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self._version = renderer_version()
+        self._lock = threading.Lock()
+        # Occupation du répertoire, calculée au premier ajout
+        self._scanned: Optional[Path] = None
+        self._bytes = self._entries = 0
+        self._hits = self._misses = self._evictions = 0
+
+    @property
+    def directory(self) -> Path:
+        """Directory of the thumbnails."""
+        if self._directory is not None:
+            return self._directory
+        return get_cache_dir() / "thumbnails"
+
+    @property
+    def enabled(self) -> bool:
+        """False without Pillow or when caching is disabled (FONTSEARCH_NO_CACHE)."""
+        return PIL_AVAILABLE and cache_enabled()
+
+    def path_for(self, key: Sequence) -> Path:
+        """Return the file holding the thumbnail of a key."""
+        identity = json.dumps([self._version, *key], ensure_ascii=False)
+        digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.png"
+
+    def get(self, key: Sequence) -> Tuple[bool, Any]:
+        """Return (found, image) for a key."""
+        if not self.enabled:
+            return False, None
+        path = self.path_for(key)
+        try:
+            with Image.open(path) as opened:
+                opened.load()
+                image = opened.copy()
+            # Marque l'usage pour l'ordre LRU
+            os.utime(path)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            with self._lock:
+                self._misses += 1
+            return False, None
+        with self._lock:
+            self._hits += 1
+        return True, image
+
+    def put(self, key: Sequence, image: Any) -> bool:
+        """
+        Store a thumbnail, evicting the oldest ones beyond max_bytes. None
+        (no preview) is not stored and False is returned.
+        """
+        if not self.enabled or image is None:
+            return False
+        path = self.path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".thumb.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    image.save(f, format="PNG", compress_level=1)
+                size = os.path.getsize(tmp_path)
+                # Vignette déjà présente (rendus concurrents) : remplacée, pas ajoutée
+                try:
+                    previous = max(os.path.getsize(path), MIN_ENTRY_BYTES)
+                except OSError:
+                    previous = None
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, ValueError):
+            return False
+
+        with self._lock:
+            if self._scanned != self.directory:
+                self._scan()
+            elif previous is None:
+                self._bytes += max(size, MIN_ENTRY_BYTES)
+                self._entries += 1
+            else:
+                self._bytes += max(size, MIN_ENTRY_BYTES) - previous
+            if self._bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def get_or_render(self, key: Sequence, render: Callable[[], Any]) -> Any:
+        """Return the stored thumbnail for key, rendering and storing it on a miss."""
+        found, image = self.get(key)
+        if not found:
+            image = render()
+            self.put(key, image)
+        return image
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        """List (mtime, size, path) of the thumbnail files."""
+        files = []
+        try:
+            subdirs = list(os.scandir(self.directory))
+        except OSError:
+            return files
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+            try:
+                for entry in os.scandir(subdir.path):
+                    if entry.name.endswith(".png") and not entry.name.startswith("."):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, max(stat.st_size, MIN_ENTRY_BYTES), entry.path))
+            except OSError:
+                continue
+        return files
+
+    def _scan(self) -> None:
+        self._scanned = self.directory
+        files = self._files()
+        self._entries = len(files)
+        self._bytes = sum(size for _, size, _ in files)
+
+    def _evict(self) -> None:
+        """Delete the least recently used thumbnails (lock held)."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        entries = len(files)
+        target = self.max_bytes * LOW_WATERMARK
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            entries -= 1
+            self._evictions += 1
+        self._bytes, self._entries = total, entries
+
+    def clear(self) -> None:
+        """Delete every thumbnail and reset the statistics."""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._scanned = self.directory
+            self._bytes = self._entries = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> ThumbnailStoreInfo:
+        """Return hit/miss/eviction statistics and disk use."""
+        with self._lock:
+            if self._scanned != self.directory:
+                self._scan()
+            return ThumbnailStoreInfo(self._hits, self._misses, self._evictions,
+                                      self._entries, self._bytes, self.max_bytes)
+
+
+_thumbnail_store: Optional[ThumbnailStore] = None
+_thumbnail_store_lock = threading.Lock()
+
+
+def get_thumbnail_store() -> ThumbnailStore:
+    """Return the thumbnail store shared by the GUIs and the API."""
+    global _thumbnail_store
+    with _thumbnail_store_lock:
+        if _thumbnail_store is None:
+            _thumbnail_store = ThumbnailStore()
+        return _thumbnail_store
+
+
+def thumbnail_store_info() -> ThumbnailStoreInfo:
+    """Return statistics of the shared thumbnail store."""
+    return get_thumbnail_store().info()
+
+
+def clear_thumbnail_store() -> None:
+    """Delete every thumbnail of the shared store."""
+    get_thumbnail_store().clear()
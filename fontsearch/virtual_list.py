@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+FontSearch - Virtualized list widget for the Tk interfaces.
+
+A font list can hold tens of thousands of entries, but only a dozen rows
+are visible at a time. VirtualList creates widgets for the visible rows
+only and recycles them while scrolling, so the cost of a scroll does not
+depend on the number of fonts and no pagination is needed.
+
+Copyright (C) 2024 Michel Weinachter
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def visible_rows(offset: int, viewport_height: int, row_height: int, count: int) -> range:
+    """
+    Return the indices of the rows intersecting the viewport.
+
+    Args:
+        offset: Scroll position, in pixels from the top of the list.
+        viewport_height: Height of the visible area in pixels.
+        row_height: Height of one row in pixels.
+        count: Number of rows in the list.
+    """
+    if count <= 0 or viewport_height <= 0:
+        return range(0)
+    first = max(0, offset // row_height)
+    last = min(count, -(-(offset + viewport_height) // row_height))
+    return range(min(first, last), last)
+
+
+def adjacent_rows(visible: range, count: int, pages: int = 1) -> List[int]:
+    """
+    Return the indices of the rows within a number of viewports below, then
+    above, the visible rows, each side ordered from the nearest row.
+
+    Args:
+        visible: Indices of the visible rows.
+        count: Number of rows in the list.
+        pages: How many viewports to cover on each side.
+    """
+    if not visible or pages <= 0:
+        return []
+    span = len(visible) * pages
+    below = range(visible.stop, min(count, visible.stop + span))
+    above = range(visible.start - 1, max(-1, visible.start - span - 1), -1)
+    return list(below) + list(above)
+
+
+class VirtualList(ttk.Frame):
+    """
+    Scrollable list of fixed-height rows backed by a small pool of widgets.
+
+    Row widgets are created on demand by create_row(parent) and filled by
+    update_row(row, index). When the list scrolls, rows that stay visible
+    are only moved; rows scrolled out are reused for the rows scrolled in,
+    so a scroll by one row costs a single update_row call. The pool never
+    grows beyond the number of rows that fit in the viewport.
+
+    The scrolling interface (yview, yview_scroll, yview_moveto) mirrors the
+    one of tk.Canvas, so the list can replace a scrolled canvas.
+
+    With prefetch_rows, the list reports once idle the rows of the next and
+    previous viewports, so their content can be prepared before they are
+    scrolled in.
+
+    Args:
+        parent: Parent tkinter widget.
+        row_height: Height of every row in pixels.
+        create_row: Builds an empty row widget, child of the given parent.
+        update_row: Fills a row widget with the item at the given index.
+        release_row: Optional, called with a row widget scrolled out of view
+                     (e.g. to cancel work started by update_row).
+        prefetch_rows: Optional, called when idle with the indices of the rows
+                       around the visible ones, nearest first (see adjacent_rows).
+        prefetch_pages: Number of viewports reported on each side.
+        background: Background color of the list.
+        empty_text: Text shown when the list has no rows.
+        **kwargs: Additional ttk.Frame arguments.
+    """
+
+    def __init__(self, parent, row_height: int,
+                 create_row: Callable[[tk.Widget], tk.Widget],
+                 update_row: Callable[[tk.Widget, int], None],
+                 release_row: Optional[Callable[[tk.Widget], None]] = None,
+                 prefetch_rows: Optional[Callable[[List[int]], None]] = None,
+                 prefetch_pages: int = 1,
+                 background: str = "white",
+                 empty_text: str = "",
+                 **kwargs):
+        super().__init__(parent, **kwargs)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.update_row = update_row
+        self.release_row = release_row
+        self.prefetch_rows = prefetch_rows
+        self.prefetch_pages = prefetch_pages
+
+        self.count = 0
+        self.offset = 0
+        self._rows: Dict[int, tk.Widget] = {}  # index -> ligne affichée
+        self._indices: Dict[tk.Widget, int] = {}  # ligne affichée -> index
+        self._free: List[tk.Widget] = []
+        self._prefetch_id = None
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.viewport = tk.Frame(self, bg=background, highlightthickness=0)
+        self.viewport.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.viewport.bind("<Configure>", self._on_configure)
+
+        self.empty_label = tk.Label(self.viewport, text=empty_text, bg=background,
+                                    font=("Segoe UI", 10))
+
+    @property
+    def pool_size(self) -> int:
+        """Number of row widgets created so far."""
+        return len(self._rows) + len(self._free)
+
+    def set_count(self, count: int, keep_position: bool = False) -> None:
+        """
+        Replace the content of the list by count rows. Every visible row is
+        filled again; the list goes back to the top unless keep_position.
+        """
+        self.count = count
+        if not keep_position:
+            self.offset = 0
+        self._layout(refill=True)
+
+    def refresh(self) -> None:
+        """Fill the visible rows again, e.g. after a change of preview options."""
+        self._layout(refill=True)
+
+    def set_empty_text(self, text: str) -> None:
+        """Change the text shown when the list has no rows."""
+        self.empty_label.config(text=text)
+
+    def index_of(self, row: tk.Widget) -> Optional[int]:
+        """Return the index of the item displayed by a row widget."""
+        return self._indices.get(row)
+
+    def visible_range(self) -> range:
+        """Indices of the rows currently visible."""
+        return visible_rows(self.offset, self.viewport.winfo_height(), self.row_height, self.count)
+
+    def see(self, index: int) -> None:
+        """Scroll the minimum needed to make a row visible."""
+        top = index * self.row_height
+        height = self.viewport.winfo_height()
+        if top < self.offset:
+            self._scroll_to(top)
+        elif top + self.row_height > self.offset + height:
+            self._scroll_to(top + self.row_height - height)
+
+    def destroy(self) -> None:
+        if self._prefetch_id is not None:
+            self.after_cancel(self._prefetch_id)
+            self._prefetch_id = None
+        super().destroy()
+
+    # Interface de défilement compatible avec tk.Canvas
+
+    def yview(self, *args) -> Optional[Tuple[float, float]]:
+        """Scrollbar protocol: query the view, or 'moveto'/'scroll' it."""
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self.yview_moveto(float(args[1]))
+        elif args[0] == "scroll":
+            self.yview_scroll(int(args[1]), args[2])
+        return None
+
+    def yview_moveto(self, fraction: float) -> None:
+        """Show the list from a fraction of its total height."""
+        self._scroll_to(int(fraction * self.count * self.row_height))
+
+    def yview_scroll(self, number: int, what: str) -> None:
+        """Scroll by a number of rows ('units') or viewport heights ('pages')."""
+        if what == "pages":
+            step = max(self.row_height, self.viewport.winfo_height() - self.row_height)
+        else:
+            step = self.row_height
+        self._scroll_to(self.offset + number * step)
+
+    def _scroll_to(self, offset: int) -> None:
+        max_offset = max(0, self.count * self.row_height - self.viewport.winfo_height())
+        offset = min(max(0, offset), max_offset)
+        if offset != self.offset:
+            self.offset = offset
+            self._layout()
+
+    def _on_configure(self, event) -> None:
+        # Une fenêtre agrandie en bas de liste ne doit pas laisser de vide
+        max_offset = max(0, self.count * self.row_height - event.height)
+        self.offset = min(self.offset, max_offset)
+        self._layout()
+
+    def _fractions(self) -> Tuple[float, float]:
+        total = self.count * self.row_height
+        height = self.viewport.winfo_height()
+        if total <= height or total == 0:
+            return 0.0, 1.0
+        return self.offset / total, min(1.0, (self.offset + height) / total)
+
+    def _layout(self, refill: bool = False) -> None:
+        """
+        Place a row widget on each visible index, recycling the others. With
+        refill, rows that stay visible are filled again too.
+        """
+        visible = self.visible_range()
+
+        # Libérer les lignes sorties de la zone visible
+        for index in [i for i in self._rows if i not in visible]:
+            row = self._rows.pop(index)
+            del self._indices[row]
+            row.place_forget()
+            self._free.append(row)
+            if self.release_row is not None:
+                self.release_row(row)
+
+        for index in visible:
+            row = self._rows.get(index)
+            if row is None:
+                row = self._free.pop() if self._free else self.create_row(self.viewport)
+                self._rows[index] = row
+                self._indices[row] = index
+                self.update_row(row, index)
+            elif refill:
+                self.update_row(row, index)
+            row.place(x=0, y=index * self.row_height - self.offset,
+                      relwidth=1.0, height=self.row_height)
+
+        if self.count == 0 and self.empty_label.cget("text"):
+            self.empty_label.place(relx=0.5, y=20, anchor="n")
+        else:
+            self.empty_label.place_forget()
+
+        self.scrollbar.set(*self._fractions())
+
+        # Une seule anticipation par rafale de défilement, une fois l'affichage fait
+        if self.prefetch_rows is not None and self._prefetch_id is None:
+            self._prefetch_id = self.after_idle(self._prefetch)
+
+    def _prefetch(self) -> None:
+        self._prefetch_id = None
+        self.prefetch_rows(adjacent_rows(self.visible_range(), self.count, self.prefetch_pages))
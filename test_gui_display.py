@@ -38,16 +38,17 @@ def test_gui_initialization():
             return False
         
         # Check that UI components exist
-        if hasattr(app, 'scrollable_frame'):
-            print("✅ Scrollable frame created")
+        font_list = getattr(app, 'font_list', None)
+        if font_list is not None and hasattr(font_list, 'viewport'):
+            print("✅ Virtual font list created")
         else:
-            print("❌ Scrollable frame missing")
+            print("❌ Virtual font list missing")
             return False
         
-        if hasattr(app, 'canvas'):
-            print("✅ Canvas created")
+        if hasattr(font_list, 'scrollbar'):
+            print("✅ Scrollbar created")
         else:
-            print("❌ Canvas missing")
+            print("❌ Scrollbar missing")
             return False
         
         # Simulate the delayed refresh that should happen
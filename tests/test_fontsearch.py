@@ -3,7 +3,10 @@
 Simple tests for FontSearch module without external dependencies.
 """
 
+import os
 import sys
+import shutil
+import tempfile
 from pathlib import Path
 
 # Add current directory to path
@@ -85,6 +88,673 @@ def test_find_fonts():
     print(f"✅ find_fonts random order: Found {len(random_fonts)} fonts")
 
 
+def test_iter_fonts():
+    """Test the streaming iter_fonts generator."""
+    print("🧪 Testing iter_fonts...")
+    
+    import types as pytypes
+    
+    stream = fontsearch.iter_fonts(text="A")
+    assert isinstance(stream, pytypes.GeneratorType), "iter_fonts should be a generator"
+    
+    all_fonts = fontsearch.find_fonts(text="A")
+    assert list(stream) == all_fonts, "Streaming should match find_fonts"
+    
+    first = list(fontsearch.iter_fonts(text="A", max_results=2))
+    assert first == all_fonts[:2], "max_results should keep the first matches"
+    
+    ttf = list(fontsearch.iter_fonts(types=[FontType.TTF], max_results=3))
+    assert len(ttf) <= 3 and all(font.font_type == FontType.TTF for font in ttf)
+    print(f"✅ iter_fonts: streamed {len(all_fonts)} fonts")
+
+
+def test_random_sampling():
+    """Test seeded random sampling with max_results."""
+    print("🧪 Testing random sampling...")
+    
+    all_fonts = fontsearch.find_fonts(text="A")
+    sample = fontsearch.find_fonts(text="A", random_order=True, max_results=3, seed=7)
+    assert len(sample) == min(3, len(all_fonts)), "Sample should respect max_results"
+    assert len(set(font.path for font in sample)) == len(sample), "Sample should not repeat fonts"
+    assert all(font in all_fonts for font in sample), "Sample should only hold matching fonts"
+    
+    again = list(fontsearch.iter_fonts(text="A", random_order=True, max_results=3, seed=7))
+    assert again == sample, "Same seed should give the same sample"
+    
+    shuffled = fontsearch.find_fonts(text="A", random_order=True, seed=7)
+    assert sorted(f.path for f in shuffled) == sorted(f.path for f in all_fonts)
+    print(f"✅ Random sampling: {[font.name for font in sample]}")
+
+
+def test_find_fonts_batch():
+    """Test answering several text queries in one pass."""
+    print("🧪 Testing find_fonts_batch...")
+    
+    texts = ["A", "äöü ß", "Привет", "\U0010FFFD", "A"]
+    results = fontsearch.find_fonts_batch(texts)
+    assert list(results) == ["A", "äöü ß", "Привет", "\U0010FFFD"], "Duplicate texts should be answered once"
+    
+    for text, fonts in results.items():
+        assert fonts == fontsearch.find_fonts(text=text), f"Batch result differs for {text!r}"
+    
+    limited = fontsearch.find_fonts_batch(texts, types=[FontType.OTF], max_results=1)
+    assert all(len(fonts) <= 1 for fonts in limited.values())
+    assert all(font.font_type == FontType.OTF for fonts in limited.values() for font in fonts)
+    print(f"✅ find_fonts_batch: {len(results)} queries answered")
+
+
+def test_coverage_ranking():
+    """Test coverage-ratio scoring and ranking."""
+    print("🧪 Testing coverage ranking...")
+    
+    text = "Hello Привет \U0010FFFD"
+    fonts = fontsearch.find_fonts(text=text, sort="coverage")
+    assert fonts, "Ranking should keep partially covering fonts"
+    scores = [font.coverage for font in fonts]
+    assert scores == sorted(scores, reverse=True), "Fonts should be ranked by coverage"
+    for font in fonts:
+        assert abs(font.coverage - fontsearch.text_coverage(font, text)) < 1e-9
+        assert 0 < font.coverage < 1
+    
+    assert fontsearch.find_fonts(text=text, min_coverage=1.0) == fontsearch.find_fonts(text=text)
+    threshold = fonts[0].coverage
+    assert all(f.coverage >= threshold for f in fontsearch.find_fonts(text=text, min_coverage=threshold))
+    assert fontsearch.text_coverage(fonts[0], "") == 1.0
+    
+    try:
+        fontsearch.find_fonts(text=text, sort="name")
+        assert False, "Unknown sort orders should be rejected"
+    except ValueError:
+        pass
+    print(f"✅ Coverage ranking: best {fonts[0].name} at {fonts[0].coverage:.0%}")
+
+
+def test_plan_fallback():
+    """Test the greedy fallback chain planner."""
+    print("🧪 Testing plan_fallback...")
+    
+    from fontsearch.core import _is_ignorable
+    
+    text = "Hello Привет ∑ \u200d\U0010FFFD"
+    chain = fontsearch.plan_fallback(text)
+    names = [font.name for font in chain]
+    assert len(names) == len(set(names)), "A font should appear once in the chain"
+    
+    # Tout caractère couvert par une police installée l'est par la chaîne
+    wanted = {char for char in text if not _is_ignorable(ord(char))}
+    coverable = {char for char in wanted if fontsearch.find_fonts(text=char)}
+    covered = {char for char in wanted if any(fontsearch.text_coverage(font, char) == 1.0 for font in chain)}
+    assert covered == coverable, "Fallback chain should cover every coverable character"
+    assert abs(sum(font.coverage for font in chain) - len(coverable) / len(wanted)) < 1e-9
+    
+    if chain:
+        last = chain[-1].name
+        preferred = fontsearch.plan_fallback(text, preferred=["No Such Font", last])
+        assert preferred[0].name == last, "Preferred fonts should come first"
+    
+    assert fontsearch.plan_fallback("") == []
+    print(f"✅ plan_fallback: {' -> '.join(names) or 'no fonts'}")
+
+
+def test_grapheme_clusters():
+    """Test grapheme cluster segmentation."""
+    print("🧪 Testing grapheme clusters...")
+    
+    from fontsearch.segmentation import grapheme_clusters
+    
+    def split(text):
+        return [text[start:end] for start, end in grapheme_clusters(text)]
+    
+    assert split("") == []
+    assert split("abc") == ["a", "b", "c"]
+    assert split("a\r\nb") == ["a", "\r\n", "b"]
+    assert split("e\u0301x") == ["e\u0301", "x"], "Combining marks stay with their base"
+    assert split("👍🏽!") == ["👍🏽", "!"], "Skin tone modifiers stay with the emoji"
+    assert split("👨\u200d👩\u200d👧x") == ["👨\u200d👩\u200d👧", "x"], "ZWJ sequences are one cluster"
+    assert split("🇫🇷🇩🇪🇮") == ["🇫🇷", "🇩🇪", "🇮"], "Regional indicators pair up"
+    assert split("\u1100\u1161\u11a8") == ["\u1100\u1161\u11a8"], "Hangul jamo form one syllable"
+    assert split("a\u200db") == ["a\u200d", "b"], "ZWJ only joins pictographs"
+    print("✅ Grapheme clusters")
+
+
+def test_itemize():
+    """Test splitting text into runs by covering font."""
+    print("🧪 Testing itemize...")
+    
+    try:
+        import fontTools
+    except ImportError:
+        print("⚠️  fonttools not available - skipping itemize tests")
+        return
+    
+    cyrillic = fontsearch.find_fonts(text="Привет\u0301")
+    if not cyrillic:
+        print("⚠️  No Cyrillic font installed - skipping itemize tests")
+        return
+    
+    tmp_dir = Path(tempfile.mkdtemp())
+    try:
+        latin = tmp_dir / "latin.ttf"
+        _build_test_font(latin, {ord(c): f"g{ord(c)}" for c in " !Hiex"})
+        fonts = [latin, cyrillic[0]]
+        
+        text = "Hi Привет! e\u0301x 🇫🇷"
+        runs = fontsearch.itemize(text, fonts)
+        assert runs[0].start == 0 and runs[-1].end == len(text), "Runs should cover the whole text"
+        assert all(a.end == b.start for a, b in zip(runs, runs[1:])), "Runs should be contiguous"
+        assert all(a.font != b.font for a, b in zip(runs, runs[1:])), "Adjacent runs should differ"
+        
+        pieces = [(text[run.start:run.end], run.font.path if run.font else None) for run in runs]
+        assert pieces[0] == ("Hi ", latin)
+        assert pieces[1] == ("Привет", cyrillic[0].path)
+        assert pieces[2] == ("! ", latin)
+        assert pieces[3][0].startswith("e\u0301"), "A cluster should never be split"
+        assert pieces[3][1] == cyrillic[0].path, "The combining mark needs the second font"
+        
+        assert fontsearch.itemize("", fonts) == []
+        assert fontsearch.itemize("Hie", fonts) == [fontsearch.TextRun(0, 3, fontsearch.FontInfo("latin", latin))]
+    finally:
+        shutil.rmtree(tmp_dir)
+    print(f"✅ itemize: {len(runs)} runs")
+
+
+def test_query_cache():
+    """Test the LRU cache of find_fonts results."""
+    print("🧪 Testing query cache...")
+    
+    from fontsearch.query import QueryCache
+    
+    fontsearch.clear_query_cache()
+    first = fontsearch.find_fonts(text="abc")
+    first.clear()  # Modifier le résultat ne doit pas toucher au cache
+    again = fontsearch.find_fonts(text="cbaa")
+    info = fontsearch.query_cache_info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1), f"Unexpected stats: {info}"
+    assert again == fontsearch.find_fonts(text="abc") and again, "Cached result should be intact"
+    
+    cache = QueryCache(maxsize=2)
+    for key in "abc":
+        cache.put(key, [key], generation=1)
+    assert cache.get("a", 1) is None and cache.get("c", 1) == ["c"]
+    assert cache.info().evictions == 1
+    assert cache.get("c", 2) is None, "A new inventory generation should drop every entry"
+    assert cache.info().invalidations == 1 and cache.info().size == 0
+    
+    fontsearch.clear_query_cache()
+    assert fontsearch.query_cache_info().hits == 0
+    print(f"✅ Query cache: {info}")
+
+
+def test_text_filter():
+    """Test incremental text filter refinement."""
+    print("🧪 Testing TextFilter...")
+    
+    text_filter = fontsearch.TextFilter()
+    for text in ["", "a", "ab", "abЖ", "ab", "ab✓", "abЖ\U0010FFFD", "Жa"]:
+        assert text_filter.update(text) == fontsearch.find_fonts(text=text), f"Mismatch for {text!r}"
+    assert text_filter.hits == 2, "Empty text and backspace should reuse known results"
+    assert text_filter.refinements == 6
+    
+    ttf_filter = fontsearch.TextFilter(types=[FontType.OTF])
+    assert ttf_filter.update("a") == fontsearch.find_fonts(text="a", types=[FontType.OTF])
+    
+    # Un nouvel inventaire efface l'historique
+    from fontsearch import core
+    core._inventory_generation = "stale"
+    assert text_filter.update("a") == fontsearch.find_fonts(text="a")
+    assert (text_filter.hits, text_filter.refinements) == (0, 1), "History should be rebuilt"
+    assert text_filter._generation == core.inventory_generation()
+    print(f"✅ TextFilter: {text_filter.hits} hits, {text_filter.refinements} refinements")
+
+
+class _FakeTkWidget:
+    """Minimal stand-in for a Tk widget: after() callbacks run when pumped."""
+    
+    def __init__(self):
+        self._callbacks = {}
+        self._next_id = 0
+    
+    def after(self, ms, callback):
+        self._next_id += 1
+        self._callbacks[self._next_id] = callback
+        return self._next_id
+    
+    def after_cancel(self, timer_id):
+        self._callbacks.pop(timer_id, None)
+    
+    def pump(self, timeout=10.0):
+        import time
+        deadline = time.monotonic() + timeout
+        while self._callbacks and time.monotonic() < deadline:
+            time.sleep(0.01)
+            for timer_id in list(self._callbacks):
+                self._callbacks.pop(timer_id)()
+
+
+def test_background_filter():
+    """Test filtering on a worker thread with results delivered via after()."""
+    print("🧪 Testing BackgroundFilter...")
+    
+    from fontsearch.background import BackgroundFilter
+    
+    widget = _FakeTkWidget()
+    results, progress = [], []
+    background = BackgroundFilter(
+        widget,
+        on_result=lambda text, fonts: results.append((text, fonts)),
+        on_progress=lambda checked, total: progress.append((checked, total))
+    )
+    try:
+        background.submit("a")
+        background.submit("aЖ")  # Remplace la requête précédente
+        assert background.busy
+        widget.pump()
+        assert not background.busy
+        assert results[-1] == ("aЖ", fontsearch.find_fonts(text="aЖ")), "Latest query should win"
+        assert all(text == "aЖ" for text, _ in results), "Stale results should be dropped"
+        assert progress and progress[-1][0] == progress[-1][1], "Progress should reach the total"
+        
+        background.submit("b")
+        background.cancel()
+        widget.pump()
+        assert results[-1][0] == "aЖ", "Cancelled queries should not be delivered"
+    finally:
+        background.close()
+    print(f"✅ BackgroundFilter: {len(results[-1][1])} fonts, progress {progress[-1]}")
+
+
+def test_preview_renderer():
+    """Test threaded preview rendering with per-row cancellation."""
+    print("🧪 Testing PreviewRenderer...")
+    
+    from fontsearch.background import PreviewRenderer
+    from fontsearch.previews import PreviewCache, preview_key
+    
+    class FakeImage(str):
+        size = (10, 10)
+        
+        def getbands(self):
+            return ("L",)
+    
+    font_path = fontsearch.find_fonts()[0].path
+    widget = _FakeTkWidget()
+    cache = PreviewCache()
+    renderer = PreviewRenderer(widget, workers=2, cache=cache)
+    delivered = {}
+    
+    def request(row, text):
+        key = preview_key(font_path, text, 32, style="test")
+        renderer.request(row, key, lambda: FakeImage(f"image {text}"),
+                         lambda image: delivered.setdefault(row, []).append(image))
+    
+    try:
+        for row in range(6):
+            request(row, f"text {row}")
+        request(0, "new text")  # Ligne recyclée : l'ancienne demande est annulée
+        renderer.cancel(5)      # Ligne sortie de la vue
+        widget.pump()
+        
+        assert renderer.pending == 0
+        assert delivered[0] == ["image new text"], "Superseded previews should not be delivered"
+        assert 5 not in delivered, "Cancelled previews should not be delivered"
+        assert all(delivered[row] == [f"image text {row}"] for row in range(1, 5))
+        
+        # Aperçu en cache : livré immédiatement, sans passer par un thread
+        request(1, "text 1")
+        assert delivered[1] == ["image text 1", "image text 1"]
+        assert renderer.pending == 0
+    finally:
+        renderer.close()
+    print(f"✅ PreviewRenderer: {len(delivered)} rows filled, cache {cache.info()}")
+
+
+def test_preview_prefetch():
+    """Test that prefetched previews fill the cache within the memory budget."""
+    print("🧪 Testing preview prefetch...")
+    
+    import time
+    from fontsearch.background import PreviewRenderer
+    from fontsearch.previews import PreviewCache, image_bytes, preview_key
+    
+    class FakeImage(str):
+        size = (10, 10)
+        
+        def getbands(self):
+            return ("L",)
+    
+    font_path = fontsearch.find_fonts()[0].path
+    cache = PreviewCache()
+    cache.put(preview_key(font_path, "text 0", 32, style="test"), FakeImage("cached"))
+    # Budget de deux aperçus : le lot s'arrête après le deuxième rendu
+    renderer = PreviewRenderer(_FakeTkWidget(), workers=1, cache=cache,
+                               prefetch_bytes=2 * image_bytes(FakeImage()) - 1)
+    rendered = []
+    
+    def job(text):
+        def render():
+            rendered.append(text)
+            return FakeImage(text)
+        return preview_key(font_path, text, 32, style="test"), render
+    
+    def wait_for_entries(count):
+        deadline = time.monotonic() + 5
+        while cache.info().entries < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+    
+    try:
+        renderer.prefetch([job(f"text {i}") for i in range(6)])
+        wait_for_entries(3)
+        assert rendered == ["text 1", "text 2"], f"Unexpected prefetch renders: {rendered}"
+        assert renderer.pending == 0, "Prefetched previews are not delivered to rows"
+        
+        # Un nouveau lot remplace le précédent, avec un budget neuf
+        renderer.prefetch([job("text 3")])
+        wait_for_entries(4)
+        assert rendered == ["text 1", "text 2", "text 3"]
+    finally:
+        renderer.close()
+    print(f"✅ Preview prefetch: {len(rendered)} previews rendered ahead, cache {cache.info()}")
+
+
+def test_virtual_list():
+    """Test that the virtualized font list only builds the visible rows."""
+    print("🧪 Testing VirtualList...")
+    
+    from fontsearch.virtual_list import adjacent_rows, visible_rows
+    
+    assert visible_rows(0, 300, 60, 10000) == range(0, 5)
+    assert visible_rows(30, 300, 60, 10000) == range(0, 6), "Partially visible rows count"
+    assert visible_rows(599700, 300, 60, 10000) == range(9995, 10000)
+    assert visible_rows(0, 300, 60, 3) == range(0, 3)
+    assert visible_rows(0, 300, 60, 0) == range(0)
+    assert visible_rows(0, 1, 60, 10) == range(0, 1)
+    
+    # Écrans voisins : suivant puis précédent, du plus proche au plus loin
+    assert adjacent_rows(range(10, 13), 100) == [13, 14, 15, 9, 8, 7]
+    assert adjacent_rows(range(0, 3), 4) == [3]
+    assert adjacent_rows(range(2, 4), 4, pages=2) == [1, 0]
+    assert adjacent_rows(range(0), 10) == []
+    
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("⚠️  No display available - skipping VirtualList widget checks")
+        return
+    
+    from fontsearch.virtual_list import VirtualList
+    
+    try:
+        filled = []
+        font_list = VirtualList(
+            root, row_height=50,
+            create_row=lambda parent: tk.Frame(parent),
+            update_row=lambda row, index: filled.append(index)
+        )
+        font_list.pack(fill=tk.BOTH, expand=True)
+        root.geometry("400x300")
+        font_list.set_count(10000)
+        root.update()
+        
+        visible = font_list.visible_range()
+        assert len(visible) > 0
+        assert font_list.pool_size == len(visible), "Only visible rows should have widgets"
+        
+        filled.clear()
+        font_list.yview_scroll(1, "units")
+        assert filled == [visible.stop], "Scrolling by one row should fill one row"
+        
+        font_list.yview_moveto(1.0)
+        assert font_list.visible_range().stop == 10000
+        assert font_list.pool_size <= len(visible) + 1, "Rows should be recycled"
+    finally:
+        root.destroy()
+    print(f"✅ VirtualList: {font_list.pool_size} row widgets for 10000 fonts")
+
+
+def test_preview_cache():
+    """Test the byte-bounded preview cache."""
+    print("🧪 Testing preview cache...")
+    
+    from fontsearch.previews import PreviewCache, preview_key, image_bytes
+    
+    class FakeImage:
+        def __init__(self, width, height):
+            self.size = (width, height)
+        
+        def getbands(self):
+            return ("R", "G", "B", "A")
+    
+    fonts = fontsearch.find_fonts()
+    assert fonts, "No fonts installed"
+    font_path = fonts[0].path
+    
+    key = preview_key(font_path, "Abc", 32, ["liga"], style="test")
+    assert key == preview_key(font_path, "Abc", 32, ("liga",), style="test")
+    assert key != preview_key(font_path, "Abc", 32, ["-liga"], style="test")
+    assert key != preview_key(font_path, "Abc", 32, ["liga"], style="other")
+    assert preview_key(font_path.with_name("missing.ttf"), "Abc", 32) is None
+    
+    cost = image_bytes(FakeImage(100, 10))
+    cache = PreviewCache(max_bytes=3 * cost)
+    renders = []
+    
+    def render(width):
+        renders.append(width)
+        return FakeImage(width, 10)
+    
+    keys = [preview_key(font_path, str(i), 32) for i in range(4)]
+    for k in keys[:3]:
+        cache.get_or_render(k, lambda: render(100))
+    cache.get_or_render(keys[0], lambda: render(100))  # keys[0] redevient récent
+    assert len(renders) == 3, "Cached previews should not be re-rendered"
+    
+    cache.get_or_render(keys[3], lambda: render(100))
+    assert keys[0] in cache and keys[1] not in cache, "Least recently used should go first"
+    info = cache.info()
+    assert info.bytes <= info.max_bytes and info.evictions == 1
+    
+    cache.get_or_render(keys[2], lambda: render(250))  # Déjà en cache : pas de rendu
+    cache.put(keys[2], FakeImage(250, 10))
+    assert cache.info().bytes <= cache.max_bytes, "Bytes, not entries, bound the cache"
+    
+    # Un aperçu vide (None) est mis en cache lui aussi
+    assert cache.get_or_render(keys[1], lambda: None) is None
+    assert cache.lookup(keys[1]) == (True, None)
+    print(f"✅ Preview cache: {cache.info()}")
+
+
+def test_thumbnail_store():
+    """Test the on-disk thumbnail store and its LRU eviction."""
+    print("🧪 Testing thumbnail store...")
+    
+    import time
+    from fontsearch.thumbnails import ThumbnailStore, MIN_ENTRY_BYTES, PIL_AVAILABLE
+    from fontsearch.previews import PreviewCache, preview_key
+    if not PIL_AVAILABLE:
+        print("⚠️  Pillow not available - skipping thumbnail store tests")
+        return
+    from PIL import Image
+    
+    font_path = fontsearch.find_fonts()[0].path
+    keys = [preview_key(font_path, f"text {i}", 32, ["liga"], style="test") for i in range(4)]
+    image = Image.new("RGB", (40, 20), "white")
+    image.paste((0, 0, 0), (5, 5, 15, 15))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ThumbnailStore(Path(tmp))
+        assert store.get(keys[0]) == (False, None)
+        assert store.put(keys[0], image)
+        assert not store.put(keys[1], None), "Missing previews are not written to disk"
+        assert store.get(keys[1]) == (False, None)
+        assert store.put(keys[1], image)
+        
+        found, loaded = store.get(keys[0])
+        assert found and loaded.tobytes() == image.tobytes(), "Thumbnails should round-trip"
+        before = store.info()
+        assert store.put(keys[0], image), "Rewriting a key replaces its file"
+        assert store.info()[3:5] == before[3:5], "Replaced thumbnails are not counted twice"
+        assert store.path_for(keys[0]) != store.path_for(keys[2])
+        
+        # Nouvelle session : le cache mémoire est vide, le disque évite le rendu
+        renders = []
+        cache = PreviewCache(store=store)
+        loaded = cache.get_or_render(keys[0], lambda: renders.append(0))
+        assert not renders and loaded.size == image.size
+        cache.get_or_render(keys[2], lambda: renders.append(2) or image)
+        assert renders == [2] and store.get(keys[2])[0]
+        
+        # Éviction LRU : keys[0] relu récemment survit, keys[2] plus ancien part
+        unit = max(store.path_for(keys[0]).stat().st_size, MIN_ENTRY_BYTES)
+        for age, key in ((300, keys[2]), (200, keys[1]), (100, keys[0])):
+            stamp = time.time() - age
+            os.utime(store.path_for(key), (stamp, stamp))
+        store.get(keys[0])
+        store.max_bytes = 3 * unit + unit // 2
+        store.put(keys[3], image)
+        assert not store.path_for(keys[2]).exists(), "Least recently used should go first"
+        assert store.path_for(keys[0]).exists() and store.path_for(keys[3]).exists()
+        info = store.info()
+        assert info.bytes <= info.max_bytes and info.evictions >= 1
+        
+        store.clear()
+        assert store.info().entries == 0 and store.get(keys[0]) == (False, None)
+    print(f"✅ Thumbnail store: {info}")
+
+
+def test_render_export():
+    """Test headless rendering and the sprite-sheet export."""
+    print("🧪 Testing headless rendering...")
+    
+    import json
+    from fontsearch.render import (PIL_AVAILABLE, SpriteSheetWriter, export_previews,
+                                   render_fonts, render_preview)
+    if not PIL_AVAILABLE:
+        print("⚠️  Pillow not available - skipping rendering tests")
+        return
+    from PIL import Image
+    
+    # Rangement en étagères : aucune image ne déborde ni n'en chevauche une autre
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = SpriteSheetWriter(tmp, width=100, height=50, padding=2)
+        placed = [writer.add(Image.new("RGBA", (w, 20), "black")) for w in (60, 30, 50, 90, 40, 150)]
+        placed.append(writer.add(Image.new("RGBA", (10, 120), "black")))
+        writer.close()
+        assert writer.sheets == ["sprites-0.png", "sprites-1.png", "sprites-2.png", "sprites-3.png"]
+        assert placed[1]["x"] == 62 and placed[2]["y"] == 22, "Images fill a shelf, then the next"
+        assert placed[5]["width"] == 100, "Images wider than a sheet are scaled down"
+        assert (placed[6]["width"], placed[6]["height"]) == (4, 50), "So are images taller than a sheet"
+        for i, a in enumerate(placed):
+            assert a["x"] + a["width"] <= 100 and a["y"] + a["height"] <= 50
+            for b in placed[i + 1:]:
+                if a["sheet"] == b["sheet"]:
+                    assert (a["x"] + a["width"] <= b["x"] or b["x"] + b["width"] <= a["x"] or
+                            a["y"] + a["height"] <= b["y"] or b["y"] + b["height"] <= a["y"])
+        with Image.open(Path(tmp) / "sprites-0.png") as sheet:
+            assert sheet.height == 42, "Sheets are cropped"
+    
+    fonts = fontsearch.find_fonts(types=[FontType.TTF])[:3]
+    image = render_preview(fonts[0].path, "Abc", 24)
+    if image is None:
+        print("⚠️  Pillow cannot render fonts here - skipping export tests")
+        return
+    assert render_preview(fonts[0].path, "") is None
+    
+    old_dir = os.environ.get("FONTSEARCH_CACHE_DIR")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["FONTSEARCH_CACHE_DIR"] = str(Path(tmp) / "cache")
+        try:
+            rendered = list(render_fonts(fonts, "Abc", 24))
+            assert [r.path for r in rendered] == [f.path for f in fonts], "Order is preserved"
+            
+            manifest = export_previews(fonts, Path(tmp) / "files", text="Abc", size=24)
+            for entry in manifest["fonts"]:
+                assert (Path(tmp) / "files" / entry["file"]).exists()
+            
+            manifest = export_previews(fonts, Path(tmp) / "sheets", text="Abc", size=24, sprites=True)
+            assert len(manifest["fonts"]) + len(manifest["missing"]) == len(fonts)
+            with open(Path(tmp) / "sheets" / "manifest.json", encoding="utf-8") as f:
+                assert json.load(f) == manifest
+            entry = manifest["fonts"][0]
+            with Image.open(Path(tmp) / "sheets" / manifest["sheets"][0]) as sheet:
+                sprite = sheet.crop((entry["x"], entry["y"], entry["x"] + entry["width"],
+                                     entry["y"] + entry["height"]))
+                assert sprite.getbbox(), "Sprite should not be empty"
+        finally:
+            if old_dir is None:
+                del os.environ["FONTSEARCH_CACHE_DIR"]
+            else:
+                os.environ["FONTSEARCH_CACHE_DIR"] = old_dir
+    print(f"✅ Headless rendering: {len(manifest['fonts'])} previews in {manifest['sheets']}")
+
+
+def test_blank_detection():
+    """Test blank image detection and ink coverage without pixel lists."""
+    print("🧪 Testing blank detection...")
+    
+    from fontsearch.render import PIL_AVAILABLE, ink_coverage, is_blank
+    if not PIL_AVAILABLE:
+        print("⚠️  Pillow not available - skipping blank detection tests")
+        return
+    from PIL import Image
+    
+    image = Image.new("RGBA", (200, 50), (255, 255, 255, 255))
+    assert is_blank(image)
+    image.putpixel((3, 4), (250, 255, 255, 255))
+    assert is_blank(image), "Near-white pixels do not count"
+    image.putpixel((5, 6), (255, 255, 249, 255))
+    assert not is_blank(image), "A single darker channel is ink"
+    assert not is_blank(image.convert("L").point(lambda v: 0 if v < 255 else 255))
+    
+    transparent = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
+    assert ink_coverage(transparent) == 0.0
+    transparent.paste((255, 0, 0, 255), (0, 0, 10, 2))
+    assert ink_coverage(transparent) == 0.2, "Opaque pixels are ink on transparent images"
+    
+    opaque = Image.new("RGB", (10, 10), "white")
+    opaque.paste((250, 250, 250), (0, 0, 10, 5))
+    opaque.paste((0, 0, 0), (0, 0, 1, 1))
+    assert ink_coverage(opaque) == 0.01, "Only pixels darker than the threshold are ink"
+    assert ink_coverage(opaque.convert("L")) == 0.01
+    assert ink_coverage(Image.new("RGB", (0, 5))) == 0.0
+    print("✅ Blank detection works correctly")
+
+
+def test_font_pool():
+    """Test the LRU pool of loaded Pillow fonts."""
+    print("🧪 Testing font pool...")
+    
+    from fontsearch.fontpool import FontPool, PIL_AVAILABLE
+    if not PIL_AVAILABLE:
+        print("⚠️  Pillow not available - skipping font pool tests")
+        return
+    
+    fonts = [info.path for info in fontsearch.find_fonts(types=[fontsearch.FontType.TTF])]
+    assert fonts, "No TrueType fonts installed"
+    pool = FontPool(max_fonts=2)
+    
+    font = pool.get(fonts[0], 32)
+    assert pool.get(str(fonts[0]), 32) is font, "Loaded fonts should be reused"
+    assert pool.get(fonts[0], 24) is not font, "Sizes are pooled separately"
+    assert font.size == 32
+    
+    pool.get(fonts[0], 12)
+    info = pool.info()
+    assert info.size == 2 and info.evictions == 1, "Pool should be bounded"
+    assert pool.get(fonts[0], 32) is not font, "Least recently used font should be evicted"
+    
+    with pool.use(fonts[0], 12) as pooled:
+        assert pooled is pool.get(fonts[0], 12)
+    
+    try:
+        pool.get(fonts[0].with_name("missing.ttf"), 12)
+        assert False, "Missing font files should raise OSError"
+    except OSError:
+        pass
+    print(f"✅ Font pool: {pool.info()}")
+
+
 def test_text_filtering():
     """Test text filtering (if fonttools available)."""
     print("🧪 Testing text filtering...")
@@ -107,6 +777,372 @@ def test_text_filtering():
     print(f"✅ Text filtering (emoji): Found {len(emoji_fonts)} fonts")
 
 
+def test_coverage_index():
+    """Test the codepoint coverage index."""
+    print("🧪 Testing coverage index...")
+    
+    from fontsearch.coverage import codepoints_to_bounds, bounds_contain, CoverageIndex
+    
+    bounds = codepoints_to_bounds([65, 66, 67, 0x1F337, 69])
+    assert bounds == [65, 68, 69, 70, 0x1F337, 0x1F338]
+    assert all(bounds_contain(bounds, cp) for cp in (65, 67, 69, 0x1F337))
+    assert not any(bounds_contain(bounds, cp) for cp in (0, 64, 68, 70, 0x1F336))
+    
+    path = next(iter(fontsearch.get_font_files().values()))
+    index = CoverageIndex(cache_name="test-coverage.json")
+    assert index.supports(path, [ord("A")]), "Installed fonts should cover 'A'"
+    assert not index.supports(path, [0x0378]), "U+0378 is unassigned"
+    
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        print("⚠️  fonttools not available - skipping cmap comparison")
+        return
+    
+    for path in fontsearch.get_font_files().values():
+        font = TTFont(str(path), fontNumber=0)
+        notdef = font.getGlyphOrder()[0]
+        cmap = {cp for cp, name in font.getBestCmap().items() if name != notdef}
+        font.close()
+        for cp in range(0, 0x3000):
+            assert index.supports(path, [cp]) == (cp in cmap), f"Mismatch for U+{cp:04X} in {path}"
+    print("✅ Coverage index matches the font cmap")
+
+
+def _build_test_font(path, cmap, uvs=None, svg_docs=None):
+    """
+    Build a minimal TrueType font with the given cmap (requires fonttools),
+    and an 'SVG ' table from (svg, start glyph, end glyph, compressed) tuples.
+    """
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    
+    glyphs = [".notdef"] + sorted(set(cmap.values()))
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyphs)
+    builder.setupCharacterMap(cmap, uvs=uvs)
+    builder.setupGlyf({name: TTGlyphPen(None).glyph() for name in glyphs})
+    builder.setupHorizontalMetrics({name: (500, 0) for name in glyphs})
+    builder.setupHorizontalHeader()
+    builder.setupNameTable({"familyName": "FontSearch Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    if svg_docs:
+        from fontTools.ttLib import newTable
+        from fontTools.ttLib.tables.S_V_G_ import SVGDocument
+        table = newTable("SVG ")
+        table.docList = [SVGDocument(*doc) for doc in svg_docs]
+        builder.font["SVG "] = table
+    builder.save(str(path))
+
+
+def test_native_cmap():
+    """Test the standard-library cmap reader on generated fonts."""
+    print("🧪 Testing native cmap reader...")
+    
+    from fontsearch.cmap import read_cmap_ranges, CmapError
+    
+    try:
+        from fontTools.ttLib import TTFont, TTCollection
+    except ImportError:
+        print("⚠️  fonttools not available - skipping generated fonts")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # Format 4 + 12 (supplementary planes) + 14 (variation sequences)
+        ttf = Path(tmp) / "test.ttf"
+        _build_test_font(ttf, {0x41: "a", 0x42: "b", 0x1F337: "a", 0x1F338: "b"},
+                         uvs=[(0x2764, 0xFE0F, None)])
+        assert read_cmap_ranges(ttf) == [(0x41, 0x43), (0xFE0F, 0xFE10), (0x1F337, 0x1F339)]
+        
+        # Collections: read the requested font
+        other = Path(tmp) / "other.ttf"
+        _build_test_font(other, {0x3042: "a"})
+        ttc = Path(tmp) / "test.ttc"
+        collection = TTCollection()
+        collection.fonts = [TTFont(str(other)), TTFont(str(ttf))]
+        collection.save(str(ttc))
+        assert read_cmap_ranges(ttc) == [(0x3042, 0x3043)]
+        assert read_cmap_ranges(ttc, 1) == read_cmap_ranges(ttf)
+        
+        not_a_font = Path(tmp) / "broken.ttf"
+        not_a_font.write_bytes(b"not a font")
+        try:
+            read_cmap_ranges(not_a_font)
+            assert False, "Invalid fonts should raise CmapError"
+        except CmapError:
+            pass
+    print("✅ Native cmap reader works correctly")
+
+
+def test_svg_index():
+    """Test glyph lookups and the indexed SVG document reader."""
+    print("🧪 Testing SVG document index...")
+    
+    from fontsearch.cmap import read_glyph_ids
+    from fontsearch.svgtable import build_svg_index, get_svg_index, read_svg_glyph
+    
+    try:
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        print("⚠️  fonttools not available - skipping generated fonts")
+        return
+    
+    # Les identifiants de glyphes lus sans fontTools sont les mêmes
+    for path in list(fontsearch.get_font_files().values())[:3]:
+        font = TTFont(str(path), fontNumber=0)
+        cmap = font.getBestCmap()
+        codepoints = list(cmap)[::7] + [0x10FFFF, 0x378]
+        expected = {cp: font.getGlyphID(cmap[cp]) for cp in codepoints if cp in cmap}
+        font.close()
+        assert read_glyph_ids(path, codepoints) == {cp: g for cp, g in expected.items() if g}
+    
+    smile = '<svg xmlns="http://www.w3.org/2000/svg" id="glyph1"><circle r="5"/></svg>'
+    hearts = '<svg xmlns="http://www.w3.org/2000/svg"><g id="glyph2"/><g id="glyph3"/></svg>'
+    with tempfile.TemporaryDirectory() as tmp:
+        ttf = Path(tmp) / "color.ttf"
+        _build_test_font(ttf, {0x41: "a", 0x1F600: "b", 0x2764: "c", 0x42: "d"},
+                         svg_docs=[(smile, 1, 1, False), (hearts, 2, 3, True)])
+        glyph_ids = read_glyph_ids(ttf, [0x41, 0x1F600, 0x2764, 0x42, 0x43])
+        assert glyph_ids == {0x41: 1, 0x1F600: 2, 0x2764: 3, 0x42: 4}
+        
+        index = build_svg_index(ttf)
+        assert len(index) == 2
+        assert index.find(0) is None and index.find(4) is None
+        assert index.find(2) == index.find(3)
+        assert index.read(1).decode() == smile
+        assert index.read(3).decode() == hearts, "Compressed documents are inflated"
+        
+        assert read_svg_glyph(ttf, "A").decode() == smile
+        assert read_svg_glyph(ttf, "😀").decode() == hearts
+        assert read_svg_glyph(ttf, "B") is None, "Glyphs without SVG have no document"
+        assert read_svg_glyph(ttf, "C") is None
+        assert get_svg_index(ttf) is get_svg_index(ttf), "Indexes are built once"
+        
+        plain = Path(tmp) / "plain.ttf"
+        _build_test_font(plain, {0x41: "a"})
+        assert build_svg_index(plain) is None and get_svg_index(plain) is None
+        assert get_svg_index(Path(tmp) / "missing.ttf") is None
+    print("✅ SVG document index works correctly")
+
+
+def _svg_pool_in_child():
+    """Run a task on the SVG rasterization pool of a worker process."""
+    from fontsearch import render
+    return render._get_svg_executor().submit(int, 2).result(timeout=5)
+
+
+def test_svg_glyph_cache():
+    """Test the cache and the thread pool of rasterized SVG glyphs."""
+    print("🧪 Testing SVG glyph rasterization cache...")
+    
+    import threading
+    import time
+    from fontsearch import render
+    from fontsearch.svgtable import get_svg_index
+    
+    try:
+        from PIL import Image
+        import fontTools  # noqa: F401
+    except ImportError:
+        print("⚠️  PIL or fonttools not available - skipping SVG glyph cache test")
+        return
+    
+    rasterized = []
+    
+    def fake_rasterize(svg_text, kind, size):
+        # Rastériseur factice : carré rouge, lent pour que les requêtes se chevauchent
+        rasterized.append((svg_text, size))
+        time.sleep(0.05)
+        return Image.new("RGBA", (size, size), (255, 0, 0, 255))
+    
+    original = render._rasterize_svg, render.SVG_RENDER_AVAILABLE
+    render._rasterize_svg, render.SVG_RENDER_AVAILABLE = fake_rasterize, True
+    render._svg_glyph_cache.clear()
+    try:
+        smile = '<svg xmlns="http://www.w3.org/2000/svg" id="glyph1"/>'
+        hearts = '<svg xmlns="http://www.w3.org/2000/svg"><g id="glyph2"/><g id="glyph3"/></svg>'
+        with tempfile.TemporaryDirectory() as tmp:
+            ttf = Path(tmp) / "color.ttf"
+            _build_test_font(ttf, {0x41: "a", 0x1F600: "b", 0x2764: "c", 0x42: "d"},
+                             svg_docs=[(smile, 1, 1, False), (hearts, 2, 3, True)])
+            
+            # Tous les caractères du texte, chaque glyphe rastérisé une fois
+            image = render.render_svg_text(ttf, "A😀AB❤", 16)
+            assert image.height == 16 and image.width >= 4 * 16
+            assert sorted(svg for svg, _ in rasterized) == sorted([smile, hearts, hearts])
+            assert image.getpixel((8, 8)) == (255, 0, 0, 255)
+            assert image.getpixel((40, 8)) == (255, 0, 0, 255)
+            
+            # Deuxième rendu : tout vient du cache
+            del rasterized[:]
+            assert render.render_svg_text(ttf, "A😀AB❤", 16).size == image.size
+            assert render.render_svg_glyph(ttf, "😀", 16).size == (16, 16)
+            assert rasterized == []
+            
+            # Requêtes simultanées du même glyphe à une autre taille
+            index = get_svg_index(ttf)
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(
+                render.rasterize_svg_glyphs(index, [1, 2], 24))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(results) == 4 and len(rasterized) == 2, "Glyphs are rasterized once"
+            assert all(result[1].size == (24, 24) for result in results)
+            
+            assert render.render_svg_text(ttf, "B", 16) is None, "No SVG glyph in the text"
+            assert render.rasterize_svg_glyphs(index, [4], 16) == {4: None}
+            
+            # Un processus forké (render_fonts) a son propre pool de threads
+            if hasattr(os, "register_at_fork"):
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                context = multiprocessing.get_context("fork")
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    assert executor.submit(_svg_pool_in_child).result(timeout=30) == 2
+    finally:
+        render._rasterize_svg, render.SVG_RENDER_AVAILABLE = original
+        render._svg_glyph_cache.clear()
+    print("✅ SVG glyph rasterization cache works correctly")
+
+
+def test_codepoint_index():
+    """Test that the inverted index agrees with per-font coverage."""
+    print("🧪 Testing inverted codepoint index...")
+    
+    from fontsearch.coverage import (CodepointIndex, get_coverage_index,
+                                     ids_to_bits, bits_to_ids)
+    
+    assert list(bits_to_ids(ids_to_bits([0, 3, 9, 64], 100))) == [0, 3, 9, 64]
+    assert list(bits_to_ids(0)) == []
+    
+    paths = list(fontsearch.get_font_files().values())
+    coverage = get_coverage_index()
+    index = CodepointIndex(paths, coverage)
+    for text in ["A", "AЖ€", "🌷", "fi ffl", "\u0378"]:
+        expected = [i for i, path in enumerate(paths)
+                    if coverage.supports(path, [ord(c) for c in text])]
+        found = list(bits_to_ids(index.query(ord(c) for c in text)))
+        assert found == expected, f"Mismatch for {text!r}: {found} != {expected}"
+    print("✅ Inverted index matches per-font coverage")
+
+
+def test_parallel_indexing():
+    """Test that parallel coverage indexing matches the serial path."""
+    print("🧪 Testing parallel indexing...")
+    
+    from fontsearch.coverage import CoverageIndex, chunk_by_size, PARALLEL_MIN_FONTS
+    from fontsearch.scan import FileSignature
+    
+    files = [(f"f{size}", FileSignature(size, 0, 0)) for size in (1, 50, 2, 100, 3)]
+    chunks = chunk_by_size(files, 4)
+    assert chunks[0] == ["f100"], "Largest font should be scheduled first, alone"
+    assert sorted(sum(chunks, [])) == sorted(key for key, _ in files)
+    
+    sources = list(fontsearch.get_font_files().values())
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(PARALLEL_MIN_FONTS * 2):
+            source = sources[i % len(sources)]
+            copy = Path(tmp) / f"font{i}{source.suffix}"
+            shutil.copy(source, copy)
+            paths.append(copy)
+        
+        serial = CoverageIndex(cache_name="test-serial.json")
+        serial.build(paths)
+        parallel = CoverageIndex(cache_name="test-parallel.json")
+        parallel.build(paths, jobs=2)
+        for path in paths:
+            assert serial.get(path) == parallel.get(path), f"Mismatch for {path}"
+    print("✅ Parallel indexing matches the serial path")
+
+
+def test_inventory_cache():
+    """Test the on-disk font inventory cache."""
+    print("🧪 Testing inventory cache...")
+    
+    from fontsearch import cache, core
+    
+    old_dir = os.environ.get("FONTSEARCH_CACHE_DIR")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["FONTSEARCH_CACHE_DIR"] = tmp
+        try:
+            fresh = fontsearch.get_font_files(refresh=True)
+            assert (Path(tmp) / "inventory.json").exists(), "Inventory should be cached"
+            
+            warm = fontsearch.get_font_files()
+            assert warm == fresh, "Warm cache should match a fresh scan"
+            assert list(warm) == list(fresh), "Cache should preserve font order"
+            
+            # Outdated cache versions are ignored
+            cache.save_cache("inventory.json", {"fonts": {}})
+            data = cache.load_cache("inventory.json")
+            assert data is not None and data["version"] == cache.CACHE_VERSION
+            (Path(tmp) / "inventory.json").write_text('{"version": -1}')
+            assert cache.load_cache("inventory.json") is None
+            
+            # Sans cache disque, l'inventaire et sa génération restent en mémoire
+            os.environ["FONTSEARCH_NO_CACHE"] = "1"
+            assert fontsearch.get_font_files() == fresh
+            generation = core.inventory_generation()
+            fontsearch.clear_query_cache()
+            fontsearch.find_fonts(text="a")
+            fontsearch.find_fonts(text="a")
+            assert core.inventory_generation() == generation
+            assert fontsearch.query_cache_info().hits == 1, "Queries should stay cached"
+        finally:
+            os.environ.pop("FONTSEARCH_NO_CACHE", None)
+            if old_dir is None:
+                del os.environ["FONTSEARCH_CACHE_DIR"]
+            else:
+                os.environ["FONTSEARCH_CACHE_DIR"] = old_dir
+    print("✅ Inventory cache works correctly")
+
+
+def test_incremental_rescan():
+    """Test that rescans report added, changed and removed font files."""
+    print("🧪 Testing incremental rescan...")
+    
+    from fontsearch import core
+    
+    original_get_font_dirs = core.get_font_dirs
+    old_dir = os.environ.get("FONTSEARCH_CACHE_DIR")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["FONTSEARCH_CACHE_DIR"] = str(Path(tmp) / "cache")
+        font_dir = Path(tmp) / "fonts"
+        font_dir.mkdir()
+        core.get_font_dirs = lambda: original_get_font_dirs() + [font_dir]
+        try:
+            source = next(iter(core.get_font_files(refresh=True).values()))
+            fonts, diff = core.scan_font_inventory()
+            assert not diff, "Unchanged directories should give an empty diff"
+            
+            copy = font_dir / "FontSearchTestCopy.ttf"
+            shutil.copy(source, copy)
+            fonts, diff = core.scan_font_inventory()
+            assert diff.added == [copy], f"Copy should be added: {diff}"
+            assert copy in fonts.values(), "New font should be in the inventory"
+            
+            # Réécriture sur place : la date du dossier ne change pas
+            copy.write_bytes(source.read_bytes() + b"\0")
+            fonts, diff = core.scan_font_inventory()
+            assert diff.changed == [copy], f"Copy should be changed: {diff}"
+            
+            copy.unlink()
+            fonts, diff = core.scan_font_inventory()
+            assert diff.removed == [copy], f"Copy should be removed: {diff}"
+            assert copy not in fonts.values(), "Removed font should be evicted"
+        finally:
+            core.get_font_dirs = original_get_font_dirs
+            if old_dir is None:
+                del os.environ["FONTSEARCH_CACHE_DIR"]
+            else:
+                os.environ["FONTSEARCH_CACHE_DIR"] = old_dir
+    print("✅ Incremental rescan works correctly")
+
+
 def test_cli_import():
     """Test that CLI module can be imported."""
     print("🧪 Testing CLI import...")
@@ -129,7 +1165,33 @@ def run_all_tests():
         test_font_type_enum,
         test_font_info,
         test_find_fonts,
+        test_iter_fonts,
+        test_random_sampling,
+        test_find_fonts_batch,
+        test_coverage_ranking,
+        test_plan_fallback,
+        test_grapheme_clusters,
+        test_itemize,
+        test_query_cache,
+        test_text_filter,
+        test_background_filter,
+        test_virtual_list,
+        test_preview_cache,
+        test_thumbnail_store,
+        test_font_pool,
+        test_blank_detection,
+        test_render_export,
+        test_preview_renderer,
+        test_preview_prefetch,
         test_text_filtering,
+        test_coverage_index,
+        test_native_cmap,
+        test_svg_index,
+        test_svg_glyph_cache,
+        test_codepoint_index,
+        test_parallel_indexing,
+        test_inventory_cache,
+        test_incremental_rescan,
         test_cli_import
     ]
     